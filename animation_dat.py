@@ -0,0 +1,407 @@
+# J Tech Pixel Uploader Animation DAT Format
+# Versioned multi-frame container for LED animations. A fixed header gives
+# the matrix geometry and frame count; a per-frame offset index at the end
+# of the file lets a reader find any frame with one lookup. Frames after a
+# keyframe can be stored as XOR or replacement spans against the previous
+# frame, so animations where little changes per frame take a fraction of
+# the raw size in the filesystem image.
+#
+# Layout (all integers little-endian):
+#   header   32 bytes, see HEADER
+#   frames   encoded frame data, back to back
+#   index    frame_count entries of INDEX_ENTRY (offset, length, kind)
+#
+# Delta frames are a sequence of spans: varint skip (bytes unchanged since
+# the end of the previous span), varint count, then count bytes that are
+# XORed into (KIND_XOR) or copied over (KIND_DELTA) the previous frame.
+
+import os
+import struct
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+import config
+
+MAGIC = b"JTAN"
+VERSION = 1
+
+# magic, version, header_size, width, height, channels, encoding, flags,
+# frame_count, frame_size, frame_delay_ms, keyframe_interval, index_offset
+HEADER = struct.Struct("<4sHHHHBBHIIHHI")
+INDEX_ENTRY = struct.Struct("<IIB3x")
+
+# File-wide encodings
+ENCODING_RAW = 0
+ENCODING_XOR = 1
+ENCODING_DELTA = 2
+ENCODINGS = {"raw": ENCODING_RAW, "xor": ENCODING_XOR, "delta": ENCODING_DELTA}
+ENCODING_NAMES = {value: name for name, value in ENCODINGS.items()}
+
+# Per-frame kinds stored in the index
+KIND_KEY = 0
+KIND_XOR = 1
+KIND_DELTA = 2
+
+# Unchanged gaps shorter than this are folded into the surrounding span,
+# since starting a new span costs at least two bytes of varints
+SPAN_MERGE_GAP = 3
+
+
+class AnimationDatError(ValueError):
+    """Raised for files that aren't usable animation DAT containers"""
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise AnimationDatError("Truncated delta frame")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _frame_array(frame, frame_size: int) -> np.ndarray:
+    array = np.frombuffer(frame, dtype=np.uint8) if not isinstance(frame, np.ndarray) \
+        else np.ascontiguousarray(frame, dtype=np.uint8).reshape(-1)
+    if array.size != frame_size:
+        raise AnimationDatError(f"Frame is {array.size} bytes, expected {frame_size}")
+    return array
+
+
+def changed_spans(previous: np.ndarray, current: np.ndarray) -> List[Tuple[int, int]]:
+    """(start, end) byte ranges where current differs from previous"""
+    changed = np.flatnonzero(previous != current)
+    if changed.size == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(changed) > SPAN_MERGE_GAP)
+    starts = changed[np.concatenate(([0], breaks + 1))]
+    ends = changed[np.concatenate((breaks, [changed.size - 1]))] + 1
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def encode_delta(previous: np.ndarray, current: np.ndarray, kind: int) -> bytes:
+    """Spans turning previous into current, as XOR values or replacement bytes"""
+    payload = current ^ previous if kind == KIND_XOR else current
+    out = bytearray()
+    position = 0
+    for start, end in changed_spans(previous, current):
+        out += _varint(start - position)
+        out += _varint(end - start)
+        out += payload[start:end].tobytes()
+        position = end
+    return bytes(out)
+
+
+def apply_delta(previous: np.ndarray, data: bytes, kind: int) -> np.ndarray:
+    """Rebuild a frame from the previous frame and its delta spans"""
+    frame = previous.copy()
+    position = 0
+    pos = 0
+    while pos < len(data):
+        skip, pos = _read_varint(data, pos)
+        count, pos = _read_varint(data, pos)
+        start = position + skip
+        end = start + count
+        if end > frame.size or pos + count > len(data):
+            raise AnimationDatError("Delta span extends past the end of the frame")
+        span = np.frombuffer(data, dtype=np.uint8, count=count, offset=pos)
+        if kind == KIND_XOR:
+            frame[start:end] ^= span
+        else:
+            frame[start:end] = span
+        pos += count
+        position = end
+    return frame
+
+
+def is_animation_dat(file_path: str) -> bool:
+    """True if the file starts with the animation container magic"""
+    try:
+        with open(file_path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+class AnimationWriter:
+    """
+    Streams frames into an animation DAT file
+    Only the previous frame and the index are held in memory; the file is
+    written under a temporary name and moved into place by close()
+    """
+
+    def __init__(self, file_path: str, width: int, height: int, channels: int = 3,
+                 encoding: Optional[str] = None, frame_delay_ms: Optional[int] = None,
+                 keyframe_interval: Optional[int] = None, layout=None):
+        settings = config.ANIMATION_DAT_CONFIG
+        encoding = encoding or settings["encoding"]
+        if encoding not in ENCODINGS:
+            raise AnimationDatError(f"Unknown encoding: {encoding}")
+        # Frames added in row-major RGB are stored in the layout's wiring order
+        if layout is not None:
+            if (layout.width, layout.height) != (width, height):
+                raise AnimationDatError("Layout size doesn't match the animation")
+            channels = layout.out_channels
+        self.layout = layout
+        if not (0 < width <= 0xFFFF and 0 < height <= 0xFFFF and channels in (3, 4)):
+            raise AnimationDatError(f"Invalid geometry: {width}x{height}x{channels}")
+        self.file_path = file_path
+        self.width = width
+        self.height = height
+        self.channels = channels
+        self.encoding = ENCODINGS[encoding]
+        self.frame_delay_ms = frame_delay_ms if frame_delay_ms is not None else settings["frame_delay_ms"]
+        self.keyframe_interval = max(1, keyframe_interval or settings["keyframe_interval"])
+        self.frame_size = width * height * channels
+        self.index = []
+        self.previous = None
+        self.raw_bytes = 0
+        self.temp_path = file_path + ".tmp"
+        self.file = open(self.temp_path, "wb")
+        self.file.write(b"\x00" * HEADER.size)
+        self.offset = HEADER.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+        elif self.file is not None:
+            self.close()
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.index)
+
+    def add_frame(self, frame) -> int:
+        """Append one frame (bytes or uint8 array); returns its index"""
+        if self.layout is not None:
+            frame = self.layout.apply_frames(_frame_array(frame, self.width * self.height * 3))[0]
+        current = _frame_array(frame, self.frame_size)
+        kind = KIND_KEY
+        data = current.tobytes()
+        keyframe_due = self.frame_count % self.keyframe_interval == 0
+        if self.encoding != ENCODING_RAW and self.previous is not None and not keyframe_due:
+            delta_kind = KIND_XOR if self.encoding == ENCODING_XOR else KIND_DELTA
+            delta = encode_delta(self.previous, current, delta_kind)
+            if len(delta) < len(data):
+                kind, data = delta_kind, delta
+        self.file.write(data)
+        self.index.append((self.offset, len(data), kind))
+        self.offset += len(data)
+        self.raw_bytes += self.frame_size
+        self.previous = current.copy()
+        return self.frame_count - 1
+
+    def close(self) -> Dict[str, int]:
+        """Write the index and header and move the file into place; returns size stats"""
+        if self.file is None:
+            raise AnimationDatError("Animation already closed")
+        if not self.index:
+            self.abort()
+            raise AnimationDatError("Animation has no frames")
+        index_offset = self.offset
+        self.file.write(b"".join(INDEX_ENTRY.pack(*entry) for entry in self.index))
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, HEADER.size, self.width, self.height, self.channels,
+                                    self.encoding, 0, self.frame_count, self.frame_size,
+                                    self.frame_delay_ms, self.keyframe_interval, index_offset))
+        self.file.close()
+        self.file = None
+        os.replace(self.temp_path, self.file_path)
+        return {"frames": self.frame_count, "raw_bytes": self.raw_bytes,
+                "file_bytes": index_offset + INDEX_ENTRY.size * self.frame_count}
+
+    def abort(self):
+        """Discard the partly written file"""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+
+class AnimationReader:
+    """
+    Random access to the frames of an animation DAT file
+    frame(i) reads one index entry, then decodes forward from the nearest
+    keyframe (at most keyframe_interval frames); sequential reads reuse the
+    previous frame and decode one frame each
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.file = open(file_path, "rb")
+        try:
+            self._read_header()
+        except Exception:
+            self.file.close()
+            raise
+        self._cached = None  # (index, frame array)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.file.close()
+
+    def _read_header(self):
+        header = self.file.read(HEADER.size)
+        if len(header) < HEADER.size or header[:4] != MAGIC:
+            raise AnimationDatError("Not an animation DAT file")
+        (_, self.version, header_size, self.width, self.height, self.channels, self.encoding, self.flags,
+         self.frame_count, self.frame_size, self.frame_delay_ms, self.keyframe_interval,
+         self.index_offset) = HEADER.unpack(header)
+        if self.version > VERSION:
+            raise AnimationDatError(f"Unsupported animation version {self.version}")
+        if self.encoding not in ENCODING_NAMES:
+            raise AnimationDatError(f"Unknown encoding {self.encoding}")
+        if self.frame_size != self.width * self.height * self.channels or self.frame_size == 0:
+            raise AnimationDatError("Frame size doesn't match the matrix geometry")
+        if self.frame_count == 0:
+            raise AnimationDatError("Animation has no frames")
+        self.file_size = os.fstat(self.file.fileno()).st_size
+        if not header_size <= self.index_offset <= self.file_size - INDEX_ENTRY.size * self.frame_count:
+            raise AnimationDatError("Frame index extends past end of file")
+        self.data_offset = header_size
+
+    @property
+    def encoding_name(self) -> str:
+        return ENCODING_NAMES[self.encoding]
+
+    def entry(self, index: int) -> Tuple[int, int, int]:
+        """(offset, length, kind) of a frame, read straight from the index"""
+        if not 0 <= index < self.frame_count:
+            raise IndexError(f"Frame {index} out of range (0-{self.frame_count - 1})")
+        self.file.seek(self.index_offset + index * INDEX_ENTRY.size)
+        offset, length, kind = INDEX_ENTRY.unpack(self.file.read(INDEX_ENTRY.size))
+        if offset < self.data_offset or offset + length > self.index_offset:
+            raise AnimationDatError(f"Frame {index} data lies outside the frame area")
+        if index == 0 and kind != KIND_KEY:
+            raise AnimationDatError("First frame must be a keyframe")
+        return offset, length, kind
+
+    def _decode(self, index: int, previous: Optional[np.ndarray]) -> np.ndarray:
+        offset, length, kind = self.entry(index)
+        self.file.seek(offset)
+        return self._decode_data(index, kind, self.file.read(length), previous)
+
+    def _decode_data(self, index: int, kind: int, data: bytes, previous: Optional[np.ndarray]) -> np.ndarray:
+        if kind == KIND_KEY:
+            if len(data) != self.frame_size:
+                raise AnimationDatError(f"Keyframe {index} is {len(data)} bytes, expected {self.frame_size}")
+            return np.frombuffer(data, dtype=np.uint8).copy()
+        if kind not in (KIND_XOR, KIND_DELTA):
+            raise AnimationDatError(f"Unknown frame kind {kind} at frame {index}")
+        return apply_delta(previous, data, kind)
+
+    def frame_array(self, index: int) -> np.ndarray:
+        """Decoded frame as a flat uint8 array"""
+        if self._cached and self._cached[0] == index:
+            return self._cached[1]
+        if self._cached and self._cached[0] == index - 1:
+            start, frame = index, self._cached[1]
+        else:
+            start = index
+            while self.entry(start)[2] != KIND_KEY:
+                start -= 1
+            frame = None
+        for position in range(start, index + 1):
+            frame = self._decode(position, frame)
+        self._cached = (index, frame)
+        return frame
+
+    def frame(self, index: int) -> bytes:
+        """Decoded RGB(W) bytes of one frame"""
+        return self.frame_array(index).tobytes()
+
+    def frames(self) -> Iterator[bytes]:
+        for index in range(self.frame_count):
+            yield self.frame(index)
+
+    def iter_sequential(self, on_data: Optional[Callable[[bytes], None]] = None) -> Iterator[np.ndarray]:
+        """
+        Decode every frame in one forward read of the file
+        on_data sees the header, frame and index bytes in file order (for
+        hashing), so the file is read exactly once; only the index and the
+        previous frame are held in memory
+        """
+        on_data = on_data or (lambda data: None)
+        self.file.seek(self.index_offset)
+        index_data = self.file.read(INDEX_ENTRY.size * self.frame_count)
+        self.file.seek(0)
+        on_data(self.file.read(self.data_offset))
+        position = self.data_offset
+        frame = None
+        for index, (offset, length, kind) in enumerate(INDEX_ENTRY.iter_unpack(index_data)):
+            if offset != position:
+                raise AnimationDatError(f"Frame {index} is not stored in sequence")
+            if index == 0 and kind != KIND_KEY:
+                raise AnimationDatError("First frame must be a keyframe")
+            data = self.file.read(length)
+            if offset + length > self.index_offset or len(data) < length:
+                raise AnimationDatError(f"Frame {index} data lies outside the frame area")
+            on_data(data)
+            frame = self._decode_data(index, kind, data, frame)
+            position += length
+            yield frame
+        if position != self.index_offset:
+            raise AnimationDatError("Unexpected data between the frames and the index")
+        if self.index_offset + len(index_data) != self.file_size:
+            raise AnimationDatError("Unexpected data after the frame index")
+        on_data(index_data)
+
+    def verify(self):
+        """Decode every frame, raising AnimationDatError on the first bad one"""
+        for _ in self.iter_sequential():
+            pass
+
+    def info(self) -> Dict:
+        return {
+            "format": "animation",
+            "version": self.version,
+            "width": self.width,
+            "height": self.height,
+            "channels": self.channels,
+            "frame_count": self.frame_count,
+            "frame_size": self.frame_size,
+            "frame_delay_ms": self.frame_delay_ms,
+            "keyframe_interval": self.keyframe_interval,
+            "encoding": self.encoding_name,
+            "file_size": self.file_size,
+            "raw_size": self.frame_size * self.frame_count
+        }
+
+
+def write_animation(file_path: str, frames: Iterable, width: int, height: int, **options) -> Dict[str, int]:
+    """Write an iterable of frames to an animation DAT file; returns size stats"""
+    with AnimationWriter(file_path, width, height, **options) as writer:
+        for frame in frames:
+            writer.add_frame(frame)
+        stats = writer.close()
+    return stats
+
+
+def read_animation_info(file_path: str) -> Dict:
+    """Header fields of an animation DAT file"""
+    with AnimationReader(file_path) as reader:
+        return reader.info()
@@ -0,0 +1,138 @@
+# J Tech Pixel Uploader Artifact Cache
+# Content-addressed store for processed upload files (HEX -> BIN conversions,
+# filesystem images). Artifacts are keyed by the source digest plus converter,
+# converter version and parameters, so an unchanged source is never rebuilt.
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+import config
+
+DIGEST_CHUNK_SIZE = 1024 * 1024
+
+
+class ArtifactCache:
+    """Directory of derived files with LRU eviction by total size"""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        settings = config.ARTIFACT_CACHE_CONFIG
+        self.cache_dir = cache_dir or os.path.join(config.get_config_dir(), settings["dir_name"])
+        self.max_bytes = max_bytes if max_bytes is not None else settings["max_size_mb"] * 1024 * 1024
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        # (path, size, mtime) -> digest so unchanged sources aren't rehashed
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+
+    def source_digest(self, path: str) -> str:
+        """SHA-256 of a source file, memoized on size and mtime"""
+        stat = os.stat(path)
+        stamp = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        digest = self._digests.get(stamp)
+        if digest is None:
+            sha = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(DIGEST_CHUNK_SIZE), b""):
+                    sha.update(chunk)
+            digest = sha.hexdigest()
+            self._digests[stamp] = digest
+        return digest
+
+    def make_key(self, source_path: str, converter: str, version: str, params: Optional[Dict] = None) -> str:
+        """Cache key for a source file processed with a converter and parameters"""
+        material = json.dumps({
+            "source": self.source_digest(source_path),
+            "converter": converter,
+            "version": version,
+            "params": params or {}
+        }, sort_keys=True)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.cache_dir, key + suffix)
+
+    def lookup(self, key: str, suffix: str = "") -> Optional[str]:
+        """Get the cached artifact path, marking it recently used"""
+        path = self._path(key, suffix)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def store(self, key: str, build: Callable[[str], Tuple[bool, str, str]],
+              suffix: str = "") -> Tuple[bool, str, str]:
+        """Run build(temp_path) and atomically publish its output under key"""
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".build_", suffix=suffix)
+        os.close(fd)
+        try:
+            success, output_path, message = build(temp_path)
+            if not success:
+                return False, "", message
+            path = self._path(key, suffix)
+            # os.replace is atomic, so concurrent jobs see either nothing or the whole file
+            os.replace(output_path, path)
+            self.evict(keep=path)
+            return True, path, message
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def get_or_build(self, source_path: str, converter: str, version: str, params: Optional[Dict],
+                     build: Callable[[str], Tuple[bool, str, str]],
+                     suffix: str = "") -> Tuple[bool, str, str, bool]:
+        """
+        Return a cached artifact or build it
+        Returns: (success, artifact_path, message, cache_hit)
+        """
+        key = self.make_key(source_path, converter, version, params)
+        path = self.lookup(key, suffix)
+        if path:
+            with self.lock:
+                self.hits += 1
+            return True, path, "Reused cached artifact", True
+
+        with self.lock:
+            self.misses += 1
+        success, path, message = self.store(key, build, suffix)
+        return success, path, message, False
+
+    def total_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.startswith("."):
+                continue  # In-progress builds
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def evict(self, keep: Optional[str] = None):
+        """Delete least recently used artifacts until the cache fits its size cap"""
+        with self.lock:
+            entries = sorted(self._entries(), key=lambda entry: entry[2])
+            total = sum(size for _, size, _ in entries)
+            for path, size, _ in entries:
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass  # Still open by another job (Windows)
+
+    def stats(self) -> str:
+        return f"{self.hits} hit(s), {self.misses} miss(es)"
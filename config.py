@@ -375,13 +375,138 @@ UI_THEMES = {
     }
 }
 
+# Window resize handling
+RESIZE_CONFIG = {
+    "debounce_ms": 150        # Layout is recomputed once the drag has been still this long
+}
+
+# Layout presets by screen size (padding and fonts applied together)
+LAYOUT_PRESETS = {
+    "compact": {
+        "padding": 10,
+        "fonts": {"Title.TLabel": ("Segoe UI", 16, "bold"), "Subtitle.TLabel": ("Segoe UI", 10)},
+        "message": "Compact layout applied for small screen"
+    },
+    "standard": {
+        "padding": 20,
+        "fonts": {"Title.TLabel": ("Segoe UI", 18, "bold"), "Subtitle.TLabel": ("Segoe UI", 12)},
+        "message": "Standard layout applied"
+    },
+    "expanded": {
+        "padding": 30,
+        "fonts": {"Title.TLabel": ("Segoe UI", 20, "bold"), "Subtitle.TLabel": ("Segoe UI", 14)},
+        "message": "Expanded layout applied for large screen"
+    }
+}
+
 # Logging configuration
 LOG_CONFIG = {
-    "max_log_lines": 1000,
+    "max_log_lines": 1000,       # Most recent lines copied by "Copy Log"
+    "flush_interval_ms": 33,     # Queued lines are rendered at ~30 Hz
     "timestamp_format": "%H:%M:%S",
     "date_format": "%Y-%m-%d %H:%M:%S"
 }
 
+# Full-session log history on disk (searchable in the log viewer)
+LOG_STORE_CONFIG = {
+    "dir_name": "logs",
+    "segment_size_mb": 4,
+    "max_segments": 64,       # Oldest segments are dropped beyond this (ring)
+    "max_sessions": 10        # Session directories kept from earlier runs
+}
+
+# Structured per-upload records (JSON lines, see upload_records.py)
+UPLOAD_RECORDS_CONFIG = {
+    "dir_name": "UploadLogs",
+    "segment_size_kb": 1024,  # Segments also rotate at midnight; closed ones are gzipped
+    "flush_every": 1          # Records buffered before a flush
+}
+
+# Flash progress reporting (see progress_parser.py)
+PROGRESS_CONFIG = {
+    "update_interval_ms": 33,  # Progress reaches the UI at most ~30 times a second
+    "eta_smoothing": 0.3       # EMA weight of the newest rate sample
+}
+
+# Per-phase upload timings (see upload_metrics.py)
+METRICS_CONFIG = {
+    "log_summary": True,      # Phase table logged after each upload
+    "exporters": [],          # Any of "prometheus", "csv"
+    "prometheus_file": "upload_metrics.prom",   # Relative paths are in the config dir
+    "csv_file": "upload_phases.csv"
+}
+
+# Skip-if-identical flash cache
+FLASH_CACHE_CONFIG = {
+    "enabled": True,
+    "file_name": "flash_cache.json",
+    "max_entries": 1000,      # Oldest entries are evicted first
+    "max_age_days": 90
+}
+
+# Data Mode filesystem images
+FS_IMAGE_CONFIG = {
+    "filesystem": "littlefs",  # "littlefs" is built in; "spiffs" needs mkspiffs
+    "block_size": 4096,
+    "page_size": 256
+}
+
+# Gang programming with external flash tools
+GANG_CONFIG = {
+    "tool_timeout_s": 300     # A tool still running after this is killed and the attempt fails
+}
+
+# Multi-frame animation DAT files (see animation_dat.py)
+ANIMATION_DAT_CONFIG = {
+    "encoding": "xor",          # "raw", "xor" or "delta" (changed bytes replaced)
+    "keyframe_interval": 30,    # A full frame every N frames bounds seek cost
+    "frame_delay_ms": 100
+}
+
+# Image, GIF and video import into animation .dat files (see media_import.py)
+MEDIA_IMPORT_CONFIG = {
+    "max_fps": 30,            # Faster sources are decimated to this rate
+    "default_frame_ms": 100,  # For still images and frames without a duration
+    "dither_bits": 0          # Ordered dither to this many bits per channel; 0 = off
+}
+
+# Physical LED wiring applied when exporting patterns (see led_layout.py)
+LED_LAYOUT_CONFIG = {
+    "serpentine": False,       # Every other row wired backwards
+    "rotation": 0,             # Clockwise: 0, 90, 180 or 270
+    "flip_x": False,
+    "flip_y": False,
+    "tile_width": None,        # Module size for tiled panels, e.g. 16 x 16
+    "tile_height": None,
+    "tile_serpentine": False,  # Every other row of modules chained backwards
+    "color_order": "RGB"       # "GRB", "RGBW", ...
+}
+
+# .dat validation (see dat_stats.py)
+DAT_VALIDATION_CONFIG = {
+    "chunk_kb": 256,          # Files are streamed in chunks of about this size
+    "matrix_size": None       # e.g. "8x8": split flat files into frames of this matrix
+}
+
+# Processed upload artifacts (converted HEX, filesystem images)
+ARTIFACT_CACHE_CONFIG = {
+    "enabled": True,
+    "dir_name": "artifacts",
+    "max_size_mb": 256        # Least recently used artifacts are evicted first
+}
+
+# External tool discovery results, reused across runs
+TOOL_REGISTRY_CONFIG = {
+    "file_name": "tool_registry.json",
+    "ttl_hours": 24           # PATH or binary changes invalidate entries sooner
+}
+
+# Startup phase timing (imports, dependency check, setup_ui, detect_ports)
+STARTUP_CONFIG = {
+    "log_timings": True,
+    "first_window_budget_ms": 1500   # Logged as a warning when exceeded
+}
+
 # File paths
 def get_config_dir():
     """Get the configuration directory for the application"""
@@ -0,0 +1,234 @@
+# J Tech Pixel Uploader DAT Statistics
+# One streaming pass over a .dat file - a flat RGB/RGBW frame (or back-to-back
+# frames of a known size) or an animation container - that works out the
+# frame geometry, per-channel min/max/mean, all-black frames, brightness and
+# a SHA-256 digest. Data is processed a chunk or a frame at a time with
+# numpy, so memory use doesn't grow with the file size.
+
+import hashlib
+import math
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import animation_dat
+import config
+
+# Black frame indices reported by number; the count covers all of them
+MAX_BLACK_FRAMES_LISTED = 20
+
+# RGB samples from the first frame shown in file info
+SAMPLE_LEDS = 10
+
+
+class DatStatsError(ValueError):
+    """Raised for .dat files whose size doesn't fit their frame geometry"""
+
+
+def matrix_size_name(led_count: int) -> str:
+    """"16x16" for square LED counts, "N LEDs" otherwise"""
+    side = math.isqrt(led_count)
+    if side > 1 and side * side == led_count:
+        return f"{side}x{side}"
+    return f"{led_count} LEDs"
+
+
+def frame_size_candidates(file_size: int, channels: int = 3) -> List[int]:
+    """
+    Frame sizes a flat file of channels-byte LEDs could be split into
+    With DAT_VALIDATION_CONFIG's matrix_size set, only that matrix counts;
+    otherwise every LED_PATTERN_SUPPORT matrix size the file holds a whole
+    number of, plus the whole file when it is one square matrix
+    """
+    if not file_size or file_size % channels:
+        return []
+    configured = config.DAT_VALIDATION_CONFIG.get("matrix_size")
+    if configured:
+        width, height = (int(side) for side in configured.lower().split("x"))
+        size = width * height * channels
+        return [size] if file_size % size == 0 else []
+    sizes = {matrix["leds"] * channels for matrix in config.LED_PATTERN_SUPPORT["matrix_sizes"].values()}
+    candidates = {size for size in sizes if file_size % size == 0}
+    led_count = file_size // channels
+    if math.isqrt(led_count) ** 2 == led_count:
+        candidates.add(file_size)
+    return sorted(candidates)
+
+
+def infer_frame_size(file_size: int, channels: int = 3) -> Optional[int]:
+    """
+    Frame size of a flat file, when only one candidate fits
+    None when no size fits or several do - e.g. 768 bytes is four 8x8 frames
+    or one 16x16 frame - so the file is read as a single frame
+    """
+    candidates = frame_size_candidates(file_size, channels)
+    return candidates[0] if len(candidates) == 1 else None
+
+
+class FrameStatsAccumulator:
+    """
+    Per-channel and per-frame statistics over a stream of pixel bytes
+    add() takes any number of whole pixels; frames may span several calls
+    """
+
+    def __init__(self, frame_size: int, channels: int = 3):
+        if frame_size <= 0 or frame_size % channels:
+            raise DatStatsError(f"Frame size {frame_size} is not a whole number of {channels}-byte LEDs")
+        self.frame_size = frame_size
+        self.channels = channels
+        self.channel_min = np.full(channels, 255, dtype=np.uint8)
+        self.channel_max = np.zeros(channels, dtype=np.uint8)
+        self.channel_sum = np.zeros(channels, dtype=np.uint64)
+        self.bytes_seen = 0
+        self.frame_count = 0
+        self.black_frames = 0
+        self.black_frame_indices: List[int] = []
+        self.peak_frame_sum = 0
+        self._frame_pos = 0   # Bytes of the current frame seen so far
+        self._frame_sum = 0
+
+    def add(self, data) -> None:
+        array = data if isinstance(data, np.ndarray) else np.frombuffer(data, dtype=np.uint8)
+        if array.size == 0:
+            return
+        pixels = array.reshape(-1, self.channels)
+        np.minimum(self.channel_min, pixels.min(axis=0), out=self.channel_min)
+        np.maximum(self.channel_max, pixels.max(axis=0), out=self.channel_max)
+        self.channel_sum += pixels.sum(axis=0, dtype=np.uint64)
+
+        # Sum each frame piece in the chunk: the first piece may finish the
+        # frame in progress, the last may start one that continues later
+        first_cut = (self.frame_size - self._frame_pos) % self.frame_size
+        starts = np.arange(first_cut, array.size, self.frame_size)
+        if starts.size == 0 or starts[0] != 0:
+            starts = np.concatenate(([0], starts))
+        sums = np.add.reduceat(array, starts, dtype=np.uint64).tolist()
+        lengths = np.diff(np.append(starts, array.size)).tolist()
+        for piece_sum, length in zip(sums, lengths):
+            self._frame_sum += piece_sum
+            self._frame_pos += length
+            if self._frame_pos == self.frame_size:
+                self._end_frame()
+        self.bytes_seen += array.size
+
+    def _end_frame(self):
+        if self._frame_sum == 0:
+            if len(self.black_frame_indices) < MAX_BLACK_FRAMES_LISTED:
+                self.black_frame_indices.append(self.frame_count)
+            self.black_frames += 1
+        self.peak_frame_sum = max(self.peak_frame_sum, self._frame_sum)
+        self.frame_count += 1
+        self._frame_pos = 0
+        self._frame_sum = 0
+
+    @property
+    def partial_frame_bytes(self) -> int:
+        return self._frame_pos
+
+    def results(self) -> Dict:
+        pixels = self.bytes_seen // self.channels
+        means = (self.channel_sum / pixels).round(2).tolist() if pixels else [0.0] * self.channels
+        full_scale = 255 * self.frame_size
+        return {
+            "frame_count": self.frame_count,
+            "channel_min": self.channel_min.tolist() if pixels else [0] * self.channels,
+            "channel_max": self.channel_max.tolist(),
+            "channel_mean": means,
+            "black_frames": self.black_frames,
+            "black_frame_indices": list(self.black_frame_indices),
+            # Share of full white, over the whole file and for the brightest frame
+            "brightness": round(float(self.channel_sum.sum()) / (255 * self.bytes_seen) * 100, 2)
+            if self.bytes_seen else 0.0,
+            "peak_frame_brightness": round(self.peak_frame_sum / full_scale * 100, 2)
+        }
+
+
+def _chunk_size(frame_size: int, channels: int = 3) -> int:
+    """Read size: a whole number of frames, or of LEDs for frames larger than a chunk"""
+    target = config.DAT_VALIDATION_CONFIG["chunk_kb"] * 1024
+    if frame_size <= target:
+        return target - target % frame_size
+    return target - target % channels
+
+
+def scan_frame_file(file_path: str, frame_size: Optional[int] = None, channels: int = 3) -> Dict:
+    """
+    Statistics for a flat .dat file of raw RGB (or, with channels=4, RGBW) bytes
+    Without frame_size the whole file is one frame; with it, the file is
+    read as back-to-back frames of that many bytes
+    """
+    file_size = os.path.getsize(file_path)
+    if file_size == 0:
+        raise DatStatsError("File is empty")
+    if file_size % channels:
+        values = "RGBW" if channels == 4 else "RGB"
+        raise DatStatsError(f"Data size ({file_size} bytes) is not a multiple of {channels} ({values} values)")
+    frame_size = frame_size or file_size
+    if file_size % frame_size:
+        raise DatStatsError(f"Data size ({file_size} bytes) is not a whole number of {frame_size}-byte frames")
+
+    accumulator = FrameStatsAccumulator(frame_size, channels)
+    sha = hashlib.sha256()
+    first_frame = b""
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_chunk_size(frame_size, channels)), b""):
+            sha.update(chunk)
+            if len(first_frame) < SAMPLE_LEDS * channels:
+                first_frame += chunk[:SAMPLE_LEDS * channels - len(first_frame)]
+            accumulator.add(chunk)
+
+    led_count = frame_size // channels
+    candidates = frame_size_candidates(file_size, channels) if frame_size == file_size else []
+    stats = {
+        "format": "frame",
+        "file_size": file_size,
+        "data_size": file_size,
+        "channels": channels,
+        "led_count": led_count,
+        "matrix_size": matrix_size_name(led_count),
+        "frame_size": frame_size,
+        "digest": sha.hexdigest(),
+        "rgb_values": [tuple(first_frame[i:i + 3]) for i in range(0, len(first_frame), channels)],
+        # Matrix sizes this single-frame read could equally be split into
+        "ambiguous_frame_sizes": [matrix_size_name(size // channels) for size in candidates]
+        if len(candidates) > 1 else []
+    }
+    stats.update(accumulator.results())
+    return stats
+
+
+def scan_animation_file(file_path: str) -> Dict:
+    """Statistics for an animation container, decoding every frame in one forward read"""
+    sha = hashlib.sha256()
+    with animation_dat.AnimationReader(file_path) as reader:
+        stats = reader.info()
+        channels = reader.channels
+        accumulator = FrameStatsAccumulator(reader.frame_size, channels)
+        rgb_values = []
+        for frame in reader.iter_sequential(sha.update):
+            if not rgb_values:
+                sample = frame[:SAMPLE_LEDS * channels].reshape(-1, channels)[:, :3]
+                rgb_values = [tuple(pixel) for pixel in sample.tolist()]
+            accumulator.add(frame)
+
+    led_count = stats["width"] * stats["height"]
+    stats.update({
+        "data_size": stats["raw_size"],
+        "led_count": led_count,
+        "matrix_size": f"{stats['width']}x{stats['height']}",
+        "digest": sha.hexdigest(),
+        "rgb_values": rgb_values
+    })
+    stats.update(accumulator.results())
+    return stats
+
+
+def scan_dat_file(file_path: str, frame_size: Optional[int] = None, channels: int = 3) -> Dict:
+    """
+    Statistics for any .dat file; channels is the bytes per LED of flat files
+    Raises DatStatsError or AnimationDatError for files that don't hold valid LED data
+    """
+    if animation_dat.is_animation_dat(file_path):
+        return scan_animation_file(file_path)
+    return scan_frame_file(file_path, frame_size, channels)
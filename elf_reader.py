@@ -0,0 +1,154 @@
+# J Tech Pixel Uploader ELF Reader
+# Pure-Python ELF32 reader that pulls PT_LOAD segments (at their physical
+# load addresses) and the entry point straight from the file, replacing the
+# objcopy conversion step. The file is memory-mapped so only the loadable
+# bytes are ever copied into memory. ESP8266 ELFs are laid out for flash in
+# memory the way esptool elf2image does, so no intermediate binary is written.
+
+import functools
+import mmap
+import operator
+import struct
+from typing import List, Tuple
+
+from intel_hex import HexImage
+
+ELF_MAGIC = b"\x7fELF"
+ELFCLASS32 = 1
+ELFDATA2LSB = 1
+ELFDATA2MSB = 2
+PT_LOAD = 1
+
+# Common e_machine values, used for display only
+ELF_MACHINES = {
+    0x08: "MIPS",
+    0x14: "PowerPC",
+    0x28: "ARM",
+    0x53: "AVR",
+    0x5E: "Xtensa",
+    0xF3: "RISC-V",
+}
+
+
+# ESP8266 flash layout (esptool elf2image, image version 1)
+ESP8266_IROM_MAP_START = 0x40200000   # Code executed in place from flash
+ESP8266_IROM_MAP_END = 0x40300000
+ESP_IMAGE_MAGIC = 0xE9
+ESP_CHECKSUM_MAGIC = 0xEF
+# elf2image defaults: QIO, 1MB at 40MHz
+ESP8266_FLASH_MODE = 0
+ESP8266_FLASH_SIZE_FREQ = 0x20
+
+
+class ElfError(ValueError):
+    """Raised for files that aren't usable ELF32 images"""
+
+
+class ElfImage(HexImage):
+    """Loadable segments of an ELF file plus its entry point and machine"""
+
+    def __init__(self, segments: List[Tuple[int, bytes]], entry: int, machine: str):
+        super().__init__(segments, entry)
+        self.entry = entry
+        self.machine = machine
+
+
+def load_elf(file_path: str) -> ElfImage:
+    """Read the PT_LOAD segments of an ELF32 file via mmap"""
+    with open(file_path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise ElfError("File is empty")
+        try:
+            return _parse(mapped)
+        finally:
+            mapped.close()
+
+
+def _parse(mapped) -> ElfImage:
+    if len(mapped) < 52 or mapped[:4] != ELF_MAGIC:
+        raise ElfError("Not an ELF file")
+    if mapped[4] != ELFCLASS32:
+        raise ElfError("Only 32-bit ELF files are supported")
+    if mapped[5] == ELFDATA2LSB:
+        endian = "<"
+    elif mapped[5] == ELFDATA2MSB:
+        endian = ">"
+    else:
+        raise ElfError("Unknown ELF byte order")
+
+    # e_type, e_machine, e_version, e_entry, e_phoff, e_shoff, e_flags,
+    # e_ehsize, e_phentsize, e_phnum
+    (_, machine, _, entry, phoff, _, _, _, phentsize, phnum) = struct.unpack_from(
+        endian + "HHIIIIIHHH", mapped, 16)
+    if phnum and phentsize < 32:
+        raise ElfError("Invalid program header size")
+    if phoff + phnum * phentsize > len(mapped):
+        raise ElfError("Program headers extend past end of file")
+
+    segments = []
+    for index in range(phnum):
+        # p_type, p_offset, p_vaddr, p_paddr, p_filesz, p_memsz, p_flags, p_align
+        p_type, p_offset, _, p_paddr, p_filesz, _, _, _ = struct.unpack_from(
+            endian + "IIIIIIII", mapped, phoff + index * phentsize)
+        # .bss style segments have no file data and nothing to flash
+        if p_type != PT_LOAD or p_filesz == 0:
+            continue
+        if p_offset + p_filesz > len(mapped):
+            raise ElfError(f"Segment {index} extends past end of file")
+        segments.append((p_paddr, mapped[p_offset:p_offset + p_filesz]))
+
+    segments.sort(key=lambda segment: segment[0])
+    for (address, data), (next_address, _) in zip(segments, segments[1:]):
+        if address + len(data) > next_address:
+            raise ElfError(f"Overlapping load segments at 0x{next_address:08X}")
+
+    return ElfImage(segments, entry, ELF_MACHINES.get(machine, f"0x{machine:X}"))
+
+
+def _merge_adjacent(segments: List[Tuple[int, bytes]]) -> List[Tuple[int, bytes]]:
+    """Pad segments to 4 bytes and join the ones that touch, as elf2image does"""
+    merged = []
+    for address, data in segments:
+        data = bytes(data) + b"\x00" * (-len(data) % 4)
+        if merged and merged[-1][0] + len(merged[-1][1]) == address:
+            merged[-1] = (merged[-1][0], merged[-1][1] + data)
+        else:
+            merged.append((address, data))
+    return merged
+
+
+def esp8266_flash_segments(image: ElfImage) -> List[Tuple[int, bytes]]:
+    """
+    (flash offset, data) pairs for an ESP8266 ELF, matching esptool elf2image
+    RAM segments are packed into the ROM loader image at 0x0; the IROM
+    segment is already flash-mapped and goes at its offset from 0x40200000
+    """
+    irom = [(address, data) for address, data in image.segments
+            if ESP8266_IROM_MAP_START <= address < ESP8266_IROM_MAP_END]
+    ram = _merge_adjacent([(address, data) for address, data in image.segments
+                           if not ESP8266_IROM_MAP_START <= address < ESP8266_IROM_MAP_END])
+    if len(irom) > 1:
+        raise ElfError("ELF has more than one IROM segment")
+    if len(ram) > 16:
+        raise ElfError(f"ESP8266 images hold at most 16 RAM segments, ELF has {len(ram)}")
+
+    loader = bytearray(struct.pack("<BBBBI", ESP_IMAGE_MAGIC, len(ram), ESP8266_FLASH_MODE,
+                                   ESP8266_FLASH_SIZE_FREQ, image.entry))
+    checksum = ESP_CHECKSUM_MAGIC
+    for address, data in ram:
+        loader += struct.pack("<II", address, len(data)) + data
+        checksum ^= functools.reduce(operator.xor, data, 0)
+    # The checksum byte sits at the end of a 16-byte block
+    loader += b"\x00" * (15 - len(loader) % 16)
+    loader.append(checksum)
+
+    segments = [(0x0, bytes(loader))]
+    if irom:
+        address, data = irom[0]
+        offset = address - ESP8266_IROM_MAP_START
+        if offset < len(loader):
+            raise ElfError(f"IROM segment at flash 0x{offset:05X} overlaps the {len(loader)}-byte loader image")
+        segments.append((offset, bytes(data)))
+    return segments
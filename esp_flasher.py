@@ -0,0 +1,546 @@
+# J Tech Pixel Uploader ESP Flash Engine
+# Drives esptool's Python API in-process so that one ESPLoader session covers
+# the whole connect -> erase -> write -> verify -> reset sequence.
+
+import hashlib
+import importlib.util
+import time
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Device names used in config.DEVICE_CONFIGS mapped to esptool chip names
+ESPTOOL_CHIPS = {
+    "ESP8266": "esp8266",
+    "ESP32": "esp32",
+    "ESP32-S3": "esp32s3",
+    "ESP32-C6": "esp32c6",
+    "ESP32-H2": "esp32h2",
+}
+
+ROM_BAUD = 115200
+DEFAULT_CONNECT_ATTEMPTS = 7
+FLASH_SECTOR_SIZE = 0x1000
+
+# Share of the overall progress bar owned by each flash phase
+PHASE_PROGRESS_RANGES = {
+    "connect": (0, 10),
+    "stub": (5, 10),
+    "erase": (10, 20),
+    "compare": (10, 20),
+    "write": (20, 90),
+    "verify": (90, 100)
+}
+
+
+class ESPFlashError(Exception):
+    """Raised when an in-process esptool operation fails"""
+
+
+def is_available() -> bool:
+    """Check if esptool can be driven in-process"""
+    return importlib.util.find_spec("esptool") is not None
+
+
+def get_esptool_chip(device: str) -> str:
+    """Get the esptool chip name for a device type ("auto" if unknown)"""
+    return ESPTOOL_CHIPS.get(device, "auto")
+
+
+def overall_progress(phase: str, done: int, total: int) -> float:
+    """Convert a phase progress callback into an overall percentage"""
+    start, end = PHASE_PROGRESS_RANGES.get(phase, (0, 100))
+    fraction = done / total if total else 1.0
+    return start + (end - start) * fraction
+
+
+def _pad_image(data: bytes) -> bytes:
+    """Pad an image with 0xFF to the 4-byte alignment esptool requires"""
+    image = bytes(data)
+    if len(image) % 4:
+        image += b"\xff" * (4 - len(image) % 4)
+    return image
+
+
+def coalesce_segments(segments: List[Tuple[int, bytes]],
+                      sector_size: int = FLASH_SECTOR_SIZE) -> List[Tuple[int, bytes]]:
+    """Merge segments that share a flash sector so one write can't erase another.
+
+    Only the bytes between segments inside a shared sector are filled with
+    0xFF; gaps spanning whole sectors are left unwritten.
+    """
+    merged = []
+    for address, data in sorted(segments, key=lambda segment: segment[0]):
+        if not data:
+            continue
+        if merged:
+            last_address, last_data = merged[-1]
+            last_end = last_address + len(last_data)
+            # Sector holding the last byte of the previous segment
+            last_sector = (last_end - 1) // sector_size
+            if address < last_end:
+                raise ValueError(f"Overlapping segments at 0x{address:08x}")
+            if address // sector_size <= last_sector:
+                last_data += b"\xff" * (address - last_end) + bytes(data)
+                continue
+        merged.append((address, bytearray(data)))
+    return [(address, bytes(data)) for address, data in merged]
+
+
+def _normalize_reset_mode(mode: str) -> str:
+    """Convert CLI style reset names (default-reset) to API names (default_reset)"""
+    return mode.replace("-", "_")
+
+
+def _close_port(esp):
+    """Close an esptool loader's serial port, ignoring errors"""
+    if esp is None:
+        return
+    try:
+        esp._port.close()
+    except Exception:
+        pass
+
+
+class ESPFlashEngine:
+    """In-process esptool session for a single serial port.
+
+    Progress is reported through ``progress_callback(phase, done, total)`` and
+    log lines through ``log_callback(message)`` instead of scraping stdout.
+    """
+
+    def __init__(self, port: str, baud: int = ROM_BAUD, chip: str = "auto",
+                 before: str = "default_reset", after: str = "hard_reset",
+                 progress_callback: Optional[Callable[[str, int, int], None]] = None,
+                 log_callback: Optional[Callable[[str], None]] = None,
+                 connect_attempts: int = DEFAULT_CONNECT_ATTEMPTS,
+                 use_stub: bool = True):
+        self.port = port
+        self.baud = int(baud)
+        self.chip = chip
+        self.before = _normalize_reset_mode(before)
+        self.after = _normalize_reset_mode(after)
+        self.progress_callback = progress_callback
+        self.log_callback = log_callback
+        self.connect_attempts = connect_attempts
+        self.use_stub = use_stub
+        self.esp = None
+        self.flash_size = None
+        self._write_mode = None
+
+    # Context manager support so callers always release the serial port
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def _log(self, message: str):
+        if self.log_callback:
+            self.log_callback(message)
+
+    def _progress(self, phase: str, done: int, total: int):
+        if self.progress_callback:
+            self.progress_callback(phase, done, total)
+
+    def _require_connection(self):
+        if self.esp is None:
+            raise ESPFlashError("Not connected - call connect() first")
+
+    def connect(self) -> str:
+        """Open the port, sync with the bootloader, load the stub and switch baud.
+
+        Returns the chip description.
+        """
+        if self.esp is not None:
+            return self.esp.get_chip_description()
+
+        try:
+            from esptool.cmds import detect_chip, detect_flash_size
+            from esptool.targets import CHIP_DEFS
+            from esptool.util import FatalError, NotImplementedInROMError, flash_size_bytes
+        except ImportError as e:
+            raise ESPFlashError(f"esptool is not installed: {e}")
+
+        initial_baud = min(ROM_BAUD, self.baud)
+        self._log(f"Connecting to {self.port}...")
+        self._progress("connect", 0, 1)
+
+        esp = None
+        try:
+            if self.chip == "auto":
+                esp = detect_chip(self.port, initial_baud, self.before, False, self.connect_attempts)
+            else:
+                esp = CHIP_DEFS[self.chip](self.port, initial_baud, False)
+                esp.connect(self.before, self.connect_attempts)
+
+            description = "Secure Download Mode" if esp.secure_download_mode else esp.get_chip_description()
+            self._log(f"Chip is {esp.CHIP_NAME} ({description})")
+
+            if self.use_stub and not esp.secure_download_mode and not esp.stub_is_disabled:
+                self._log("Uploading stub flasher...")
+                self._progress("stub", 0, 1)
+                esp = esp.run_stub()
+                self._progress("stub", 1, 1)
+
+            if self.baud > initial_baud:
+                try:
+                    esp.change_baud(self.baud)
+                    self._log(f"Changed baud rate to {self.baud}")
+                except NotImplementedInROMError:
+                    self._log(f"ROM doesn't support changing baud rate, keeping {initial_baud}")
+
+            if not esp.IS_STUB:
+                esp.flash_spi_attach(0)
+
+            self.flash_size = detect_flash_size(esp)
+            if self.flash_size is not None:
+                esp.flash_set_parameters(flash_size_bytes(self.flash_size))
+                self._log(f"Flash size: {self.flash_size}")
+        except (FatalError, OSError) as e:
+            # The port is already open once the chip object exists; don't leave it busy
+            _close_port(esp)
+            raise ESPFlashError(f"Failed to connect on {self.port}: {e}")
+        except KeyError:
+            _close_port(esp)
+            raise ESPFlashError(f"Unsupported chip type: {self.chip}")
+
+        self.esp = esp
+        self._progress("connect", 1, 1)
+        return description
+
+    def chip_info(self) -> Dict[str, str]:
+        """Get chip description, features, crystal and MAC address"""
+        self._require_connection()
+        from esptool.util import FatalError
+
+        try:
+            info = {
+                "chip": self.esp.CHIP_NAME,
+                "description": self.esp.get_chip_description(),
+                "features": ", ".join(self.esp.get_chip_features()),
+                "crystal": f"{self.esp.get_crystal_freq()}MHz",
+                "mac": self.read_mac(),
+                "flash_size": self.flash_size or "Unknown",
+                "stub": str(self.esp.IS_STUB),
+            }
+        except FatalError as e:
+            raise ESPFlashError(f"Failed to read chip info: {e}")
+        return info
+
+    def read_mac(self) -> str:
+        """Read the base MAC address as aa:bb:cc:dd:ee:ff"""
+        self._require_connection()
+        mac = self.esp.read_mac()
+        return ":".join(f"{b:02x}" for b in mac)
+
+    def erase_flash(self):
+        """Erase the entire flash chip"""
+        self._require_connection()
+        from esptool.util import FatalError
+
+        self._log("Erasing flash (this may take a while)...")
+        self._progress("erase", 0, 1)
+        start = time.monotonic()
+        try:
+            self.esp.erase_flash()
+        except FatalError as e:
+            raise ESPFlashError(f"Erase failed: {e}")
+        self._progress("erase", 1, 1)
+        self._log(f"Chip erase completed in {time.monotonic() - start:.1f}s")
+
+    def write_flash(self, address: int, data: bytes, compress: bool = True) -> int:
+        """Write data at address, erasing the covered sectors as it goes.
+
+        Returns the number of bytes written to flash.
+        """
+        self._require_connection()
+        image = _pad_image(data)
+        if not image:
+            return 0
+        return self._write_region(address, image, compress, 0, len(image))
+
+    def write_flash_delta(self, address: int, data: bytes, compress: bool = True,
+                          block_size: Optional[int] = None) -> int:
+        """Write only the flash sectors whose on-device MD5 differs from the image.
+
+        Falls back to a full write when the loader can't hash flash or the
+        address isn't sector aligned. Returns the number of bytes written.
+        """
+        self._require_connection()
+        from esptool.util import FatalError, NotImplementedInROMError
+
+        image = _pad_image(data)
+        if not image:
+            return 0
+        esp = self.esp
+        block_size = block_size or esp.FLASH_SECTOR_SIZE
+        if address % esp.FLASH_SECTOR_SIZE or block_size % esp.FLASH_SECTOR_SIZE:
+            self._log("Delta flash needs sector aligned blocks, writing full image")
+            return self.write_flash(address, image, compress)
+
+        # Hash each block on the device and collect runs of changed blocks
+        runs = []
+        total = len(image)
+        self._progress("compare", 0, total)
+        try:
+            for pos in range(0, total, block_size):
+                block = image[pos:pos + block_size]
+                if esp.flash_md5sum(address + pos, len(block)) != hashlib.md5(block).hexdigest():
+                    if runs and runs[-1][1] == pos:
+                        runs[-1][1] = pos + len(block)
+                    else:
+                        runs.append([pos, pos + len(block)])
+                self._progress("compare", pos + len(block), total)
+        except NotImplementedInROMError:
+            self._log("ROM loader can't calculate MD5, writing full image")
+            return self.write_flash(address, image, compress)
+        except FatalError as e:
+            raise ESPFlashError(f"MD5 check failed at 0x{address:08x}: {e}")
+
+        changed = sum(end - start for start, end in runs)
+        blocks = (total + block_size - 1) // block_size
+        changed_blocks = sum((end - start + block_size - 1) // block_size for start, end in runs)
+        self._log(f"Delta flash: {changed_blocks}/{blocks} blocks changed, "
+                  f"skipped {total - changed} of {total} bytes")
+
+        done = 0
+        for start, end in runs:
+            done += self._write_region(address + start, image[start:end], compress, done, changed)
+        if not runs:
+            self._progress("write", 1, 1)
+        return changed
+
+    def check_segments(self, segments: List[Tuple[int, bytes]]):
+        """Raise ESPFlashError if any segment lies outside the detected flash size"""
+        flash_bytes = None
+        if self.flash_size:
+            from esptool.util import FatalError, flash_size_bytes
+            try:
+                flash_bytes = flash_size_bytes(self.flash_size)
+            except FatalError:
+                pass
+        for address, data in segments:
+            end = address + len(data)
+            if address < 0 or (flash_bytes is not None and end > flash_bytes):
+                limit = f"0x{flash_bytes:X} ({self.flash_size})" if flash_bytes is not None else "flash"
+                raise ESPFlashError(f"Segment 0x{address:08X}-0x{end:08X} is outside the {limit} flash")
+
+    def write_segments(self, segments: List[Tuple[int, bytes]], compress: bool = True,
+                       delta: bool = False) -> int:
+        """Write each (address, data) segment separately, leaving gaps untouched.
+
+        Returns the number of bytes written to flash.
+        """
+        self._require_connection()
+        self.check_segments(segments)
+        segments = coalesce_segments(segments, self.esp.FLASH_SECTOR_SIZE)
+        if len(segments) > 1:
+            span = segments[-1][0] + len(segments[-1][1]) - segments[0][0]
+            data_size = sum(len(data) for _, data in segments)
+            self._log(f"Writing {len(segments)} segments ({data_size} bytes, "
+                      f"{span - data_size} gap bytes not written)")
+
+        if delta:
+            return sum(self.write_flash_delta(address, data, compress) for address, data in segments)
+
+        images = [(address, _pad_image(data)) for address, data in segments]
+        total = sum(len(image) for _, image in images)
+        done = 0
+        for address, image in images:
+            done += self._write_region(address, image, compress, done, total)
+        return done
+
+    def _write_region(self, address: int, image: bytes, compress: bool,
+                      progress_base: int, progress_total: int) -> int:
+        """Stream one padded region to flash, reporting progress within a larger job"""
+        from esptool.loader import DEFAULT_TIMEOUT, ERASE_WRITE_TIMEOUT_PER_MB, timeout_per_mb
+        from esptool.util import FatalError
+
+        uncsize = len(image)
+        esp = self.esp
+        # Compressed writes need the flasher stub
+        compress = compress and esp.IS_STUB
+        block_size = esp.FLASH_WRITE_SIZE
+        start = time.monotonic()
+
+        try:
+            if compress:
+                payload = zlib.compress(image, 9)
+                decompress = zlib.decompressobj()
+                esp.flash_defl_begin(uncsize, len(payload), address)
+            else:
+                payload = image
+                esp.flash_begin(uncsize, address)
+
+            self._write_mode = "deflate" if compress else "plain"
+            self._log(f"Writing {uncsize} bytes at 0x{address:08x}...")
+            seq = 0
+            written = 0
+            timeout = DEFAULT_TIMEOUT
+            for pos in range(0, len(payload), block_size):
+                block = payload[pos:pos + block_size]
+                if compress:
+                    block_uncompressed = len(decompress.decompress(block))
+                    written += block_uncompressed
+                    block_timeout = max(DEFAULT_TIMEOUT,
+                                        timeout_per_mb(ERASE_WRITE_TIMEOUT_PER_MB, block_uncompressed))
+                    if not esp.IS_STUB:
+                        timeout = block_timeout
+                    esp.flash_defl_block(block, seq, timeout=timeout)
+                    if esp.IS_STUB:
+                        timeout = block_timeout
+                else:
+                    block = block + b"\xff" * (block_size - len(block))
+                    esp.flash_block(block, seq)
+                    written += len(block)
+                seq += 1
+                self._progress("write", progress_base + min(written, uncsize), progress_total)
+
+            if esp.IS_STUB:
+                # The stub acks blocks before writing them, so wait for the last one
+                esp.read_reg(esp.CHIP_DETECT_MAGIC_REG_ADDR, timeout=timeout)
+        except FatalError as e:
+            raise ESPFlashError(f"Write failed at 0x{address:08x}: {e}")
+
+        elapsed = time.monotonic() - start
+        rate = f" ({uncsize / elapsed * 8 / 1000:.1f} kbit/s)" if elapsed > 0 else ""
+        self._log(f"Wrote {uncsize} bytes at 0x{address:08x} in {elapsed:.1f}s{rate}")
+        return uncsize
+
+    def flash_md5(self, address: int, size: int) -> str:
+        """Calculate the MD5 of a flash region on the device"""
+        self._require_connection()
+        from esptool.util import FatalError
+
+        try:
+            return self.esp.flash_md5sum(address, size)
+        except FatalError as e:
+            raise ESPFlashError(f"MD5 check failed at 0x{address:08x}: {e}")
+
+    def verify_flash(self, address: int, data: bytes) -> bool:
+        """Compare the device MD5 of a region against the local image"""
+        self._require_connection()
+        from esptool.util import FatalError, NotImplementedInROMError
+
+        image = _pad_image(data)
+
+        self._progress("verify", 0, len(image))
+        try:
+            digest = self.esp.flash_md5sum(address, len(image))
+        except NotImplementedInROMError:
+            self._log("ROM loader can't calculate MD5, skipping verification")
+            return True
+        except FatalError as e:
+            raise ESPFlashError(f"MD5 check failed at 0x{address:08x}: {e}")
+        matches = digest == hashlib.md5(image).hexdigest()
+        self._progress("verify", len(image), len(image))
+        if matches:
+            self._log("Hash of data verified.")
+        else:
+            self._log(f"Flash MD5 does not match image at 0x{address:08x}")
+        return matches
+
+    def region_matches(self, address: int, data: bytes) -> bool:
+        """Single on-device MD5 of a region compared with the image (False if unsupported)"""
+        self._require_connection()
+        from esptool.util import FatalError, NotImplementedInROMError
+
+        image = _pad_image(data)
+        try:
+            return self.esp.flash_md5sum(address, len(image)) == hashlib.md5(image).hexdigest()
+        except NotImplementedInROMError:
+            return False
+        except FatalError as e:
+            raise ESPFlashError(f"MD5 check failed at 0x{address:08x}: {e}")
+
+    def matches_cached_image(self, cache, address: int, data: bytes) -> bool:
+        """Check if the flash cache says this chip already holds the image.
+
+        The cache hit is confirmed with one on-device checksum before the
+        write is skipped.
+        """
+        if cache is None:
+            return False
+        self._require_connection()
+        if not cache.lookup(self.read_mac(), address, data):
+            return False
+        if self.region_matches(address, data):
+            self._log(f"Image already flashed at 0x{address:08x} (cache hit, MD5 confirmed), skipping write")
+            return True
+        self._log("Cached image no longer matches flash, rewriting")
+        return False
+
+    def verify_segments(self, segments: List[Tuple[int, bytes]]) -> bool:
+        """Verify every segment by on-device MD5"""
+        return all(self.verify_flash(address, data) for address, data in segments)
+
+    def record_flash(self, cache, address: int, data: bytes):
+        """Remember a successful flash of this image on this chip"""
+        if cache is not None:
+            self._require_connection()
+            cache.record(self.read_mac(), address, data, chip=self.esp.CHIP_NAME)
+
+    def reset(self):
+        """Leave the bootloader according to the configured after-mode"""
+        if self.esp is None:
+            return
+        esp = self.esp
+        if esp.IS_STUB and self._write_mode:
+            # Leave flash mode without letting the ROM loader run user code yet
+            esp.flash_begin(0, 0)
+            if self._write_mode == "deflate":
+                esp.flash_defl_finish(False)
+            else:
+                esp.flash_finish(False)
+            self._write_mode = None
+        if self.after == "hard_reset":
+            self._log("Hard resetting via RTS pin...")
+            esp.hard_reset()
+        elif self.after == "soft_reset":
+            esp.soft_reset(False)
+        elif self.after == "no_reset" and esp.IS_STUB:
+            esp.soft_reset(True)
+
+    def close(self):
+        """Release the serial port"""
+        if self.esp is not None:
+            _close_port(self.esp)
+            self.esp = None
+
+    def flash_image(self, address: int, data: bytes, erase: bool = False,
+                    verify: bool = True, delta: bool = False, cache=None) -> bool:
+        """Run the full connect -> erase -> write -> verify -> reset sequence.
+
+        With ``delta`` only sectors that differ on the device are rewritten
+        (ignored when erasing, since nothing would match). With a ``cache``
+        the write is skipped when the chip already holds this image.
+        Returns True if the image was written (and verified when requested).
+        """
+        return self.flash_segments([(address, data)], erase=erase, verify=verify,
+                                   delta=delta, cache=cache)
+
+    def flash_segments(self, segments: List[Tuple[int, bytes]], erase: bool = False,
+                       verify: bool = True, delta: bool = False, cache=None) -> bool:
+        """Same as flash_image for a sparse list of (address, data) segments"""
+        self.connect()
+        try:
+            # Before the erase, so a bad image never leaves the chip blank
+            self.check_segments(segments)
+            if not erase and cache is not None and \
+                    all(self.matches_cached_image(cache, address, data) for address, data in segments):
+                self.reset()
+                return True
+
+            if erase:
+                self.erase_flash()
+            self.write_segments(segments, delta=delta and not erase)
+            verified = self.verify_segments(segments) if verify else True
+            if verified:
+                for address, data in segments:
+                    self.record_flash(cache, address, data)
+            self.reset()
+            return verified
+        finally:
+            self.close()
@@ -0,0 +1,98 @@
+# J Tech Pixel Uploader Flash Cache
+# Remembers which image (SHA-256) was last flashed at which offset on which
+# chip (MAC) so re-running a job on an already programmed board can skip the
+# write after one on-device checksum confirms the flash still matches.
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import config
+
+
+def image_digest(data: bytes) -> str:
+    """SHA-256 of an image as a hex string"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class FlashCache:
+    """Persistent JSON record of the last image flashed per (MAC, offset)"""
+
+    def __init__(self, path: Optional[str] = None, max_entries: Optional[int] = None,
+                 max_age_days: Optional[float] = None):
+        settings = config.FLASH_CACHE_CONFIG
+        self.path = path or os.path.join(config.get_config_dir(), settings["file_name"])
+        self.max_entries = max_entries if max_entries is not None else settings["max_entries"]
+        self.max_age_days = max_age_days if max_age_days is not None else settings["max_age_days"]
+        self.lock = threading.Lock()
+        self.entries = self._load()
+
+    @staticmethod
+    def _key(mac: str, offset: int) -> str:
+        return f"{mac.lower()}@0x{offset:08x}"
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, 'r') as f:
+                entries = json.load(f)
+            return entries if isinstance(entries, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        # Write to a temp file first so a crash never leaves a truncated cache
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(temp_path, self.path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Drop expired entries, then the oldest ones beyond max_entries"""
+        if self.max_age_days:
+            cutoff = time.time() - self.max_age_days * 86400
+            self.entries = {key: entry for key, entry in self.entries.items()
+                            if entry.get("timestamp", 0) >= cutoff}
+        if len(self.entries) > self.max_entries:
+            newest = sorted(self.entries.items(), key=lambda item: item[1].get("timestamp", 0),
+                            reverse=True)[:self.max_entries]
+            self.entries = dict(newest)
+
+    def lookup(self, mac: str, offset: int, data: bytes) -> Optional[Dict]:
+        """Get the cache entry if this exact image was last flashed here"""
+        digest = image_digest(data)
+        with self.lock:
+            entry = self.entries.get(self._key(mac, offset))
+        if entry and entry.get("sha256") == digest and entry.get("size") == len(data):
+            return dict(entry)
+        return None
+
+    def record(self, mac: str, offset: int, data: bytes, chip: str = ""):
+        """Remember a successful flash and persist the cache"""
+        with self.lock:
+            self.entries[self._key(mac, offset)] = {
+                "sha256": image_digest(data),
+                "size": len(data),
+                "offset": offset,
+                "mac": mac.lower(),
+                "chip": chip,
+                "timestamp": time.time()
+            }
+            self._evict()
+            self._save()
+
+    def forget(self, mac: str, offset: int):
+        """Remove the entry for a region, e.g. after a failed write"""
+        with self.lock:
+            if self.entries.pop(self._key(mac, offset), None) is not None:
+                self._save()
+
+    def clear(self):
+        with self.lock:
+            self.entries = {}
+            self._save()
@@ -0,0 +1,147 @@
+# J Tech Pixel Uploader Filesystem Image Builder
+# Builds LittleFS (v2.0 on-disk format) images in memory from DAT files so
+# Data Mode works offline, without downloading mklittlefs or running it in a
+# temp directory. All files are placed in the root directory.
+
+import zlib
+from typing import Dict, List, Tuple, Union
+
+DEFAULT_BLOCK_SIZE = 4096
+DEFAULT_PAGE_SIZE = 256
+
+# Bump when the image layout changes so cached artifacts are rebuilt
+BUILDER_VERSION = "1"
+
+LFS_DISK_VERSION = 0x00020000
+LFS_NAME_MAX = 255
+LFS_FILE_MAX = 2147483647
+LFS_ATTR_MAX = 1022
+
+# Metadata tag types
+LFS_TYPE_REG = 0x001
+LFS_TYPE_SUPERBLOCK = 0x0FF
+LFS_TYPE_INLINESTRUCT = 0x201
+LFS_TYPE_CTZSTRUCT = 0x202
+LFS_TYPE_CREATE = 0x401
+LFS_TYPE_CRC = 0x500
+
+FileList = Union[Dict[str, bytes], List[Tuple[str, bytes]]]
+
+
+class FsImageError(ValueError):
+    """Raised when files don't fit the requested filesystem geometry"""
+
+
+def _lfs_crc(crc: int, data: bytes) -> int:
+    """LittleFS CRC-32 (no final inversion)"""
+    return zlib.crc32(data, crc ^ 0xFFFFFFFF) ^ 0xFFFFFFFF
+
+
+def _tag(tag_type: int, tag_id: int, size: int) -> int:
+    return (tag_type << 20) | (tag_id << 10) | size
+
+
+def _ctz(value: int) -> int:
+    return (value & -value).bit_length() - 1
+
+
+class _MetadataCommit:
+    """Accumulates one metadata commit with XOR-chained big-endian tags"""
+
+    def __init__(self, block_size: int, page_size: int, revision: int = 1):
+        self.block_size = block_size
+        self.page_size = page_size
+        self.buffer = bytearray(revision.to_bytes(4, "little"))
+        self.previous = 0xFFFFFFFF
+
+    def add(self, tag_type: int, tag_id: int, data: bytes = b""):
+        tag = _tag(tag_type, tag_id, len(data))
+        self.buffer += (tag ^ self.previous).to_bytes(4, "big")
+        self.buffer += data
+        self.previous = tag
+
+    def finish(self) -> bytes:
+        """Append the CRC tag, padding the commit to a page boundary"""
+        offset = len(self.buffer)
+        end = -(-(offset + 8) // self.page_size) * self.page_size
+        if end > self.block_size:
+            raise FsImageError("Too many files for one metadata block - use a larger block size")
+        tag = _tag(LFS_TYPE_CRC, 0x3FF, end - offset - 4)
+        self.buffer += (tag ^ self.previous).to_bytes(4, "big")
+        crc = _lfs_crc(0xFFFFFFFF, bytes(self.buffer))
+        self.buffer += crc.to_bytes(4, "little")
+        self.buffer += b"\xff" * (self.block_size - len(self.buffer))
+        return bytes(self.buffer)
+
+
+def _ctz_blocks(data: bytes, block_size: int, first_block: int) -> List[bytes]:
+    """Lay out file data as a LittleFS CTZ skip-list starting at first_block.
+
+    Block i (i > 0) begins with ctz(i) + 1 little-endian pointers to blocks
+    i - 1, i - 2, i - 4, ... followed by file data.
+    """
+    blocks = []
+    position = 0
+    index = 0
+    while position < len(data):
+        if index == 0:
+            header = b""
+        else:
+            header = b"".join((first_block + index - (1 << skip)).to_bytes(4, "little")
+                              for skip in range(_ctz(index) + 1))
+        chunk = data[position:position + block_size - len(header)]
+        blocks.append(header + chunk)
+        position += len(chunk)
+        index += 1
+    return blocks
+
+
+def build_littlefs_image(files: FileList, fs_size: int, block_size: int = DEFAULT_BLOCK_SIZE,
+                         page_size: int = DEFAULT_PAGE_SIZE) -> bytes:
+    """
+    Build a LittleFS image containing files in the root directory
+    Files up to one page are stored inline in metadata, larger ones as CTZ lists
+    """
+    if block_size < 128 or block_size % page_size:
+        raise FsImageError("Block size must be a multiple of the page size")
+    block_count = fs_size // block_size
+    if block_count < 2:
+        raise FsImageError("Filesystem must hold at least two blocks")
+
+    items = sorted(files.items() if isinstance(files, dict) else files)
+    inline_max = min(page_size, block_size // 8, LFS_ATTR_MAX)
+
+    commit = _MetadataCommit(block_size, page_size)
+    superblock = b"".join(value.to_bytes(4, "little") for value in
+                          (LFS_DISK_VERSION, block_size, block_count, LFS_NAME_MAX, LFS_FILE_MAX, LFS_ATTR_MAX))
+    commit.add(LFS_TYPE_CREATE, 0)
+    commit.add(LFS_TYPE_SUPERBLOCK, 0, b"littlefs")
+    commit.add(LFS_TYPE_INLINESTRUCT, 0, superblock)
+
+    # Blocks 0 and 1 are the root/superblock metadata pair
+    data_blocks = []
+    next_block = 2
+    for file_id, (name, data) in enumerate(items, 1):
+        encoded_name = name.encode("utf-8")
+        if not encoded_name or len(encoded_name) > LFS_NAME_MAX or "/" in name:
+            raise FsImageError(f"Invalid file name: {name!r}")
+        data = bytes(data)
+        commit.add(LFS_TYPE_CREATE, file_id)
+        commit.add(LFS_TYPE_REG, file_id, encoded_name)
+        if len(data) <= inline_max:
+            commit.add(LFS_TYPE_INLINESTRUCT, file_id, data)
+            continue
+
+        blocks = _ctz_blocks(data, block_size, next_block)
+        if next_block + len(blocks) > block_count:
+            raise FsImageError(f"Files don't fit in a {fs_size} byte filesystem")
+        head = next_block + len(blocks) - 1
+        commit.add(LFS_TYPE_CTZSTRUCT, file_id, head.to_bytes(4, "little") + len(data).to_bytes(4, "little"))
+        data_blocks.extend(blocks)
+        next_block += len(blocks)
+
+    image = bytearray(b"\xff" * (block_count * block_size))
+    image[:block_size] = commit.finish()
+    for index, block in enumerate(data_blocks, 2):
+        image[index * block_size:index * block_size + len(block)] = block
+    return bytes(image)
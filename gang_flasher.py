@@ -0,0 +1,168 @@
+# J Tech Pixel Uploader Gang Programmer
+# Flashes one processed image to several serial ports concurrently with a
+# bounded worker pool. Each port keeps its own progress, retry and result state
+# so a slow or failing board never holds up the others.
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import esp_flasher
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_RETRIES = 1
+
+# Port states shown in the gang status grid
+STATE_QUEUED = "queued"
+STATE_RUNNING = "running"
+STATE_RETRYING = "retrying"
+STATE_SUCCESS = "success"
+STATE_FAILED = "failed"
+STATE_CANCELLED = "cancelled"
+
+FINISHED_STATES = (STATE_SUCCESS, STATE_FAILED, STATE_CANCELLED)
+
+
+class GangProgrammer:
+    """Run a flash function for every port on a bounded thread pool.
+
+    ``flash_function(port, progress_callback, log_callback)`` performs one
+    attempt and returns True on success; raising counts as a failed attempt.
+    ``update_callback(port, state)`` receives a copy of the port state after
+    every change and is called from worker threads. A flash function with a
+    ``cancel()`` method has it called by cancel() to stop running attempts.
+    """
+
+    def __init__(self, ports: List[str], flash_function: Callable,
+                 max_workers: int = DEFAULT_MAX_WORKERS, retries: int = DEFAULT_RETRIES,
+                 update_callback: Optional[Callable[[str, Dict], None]] = None,
+                 log_callback: Optional[Callable[[str, str], None]] = None):
+        # Keep order but drop duplicate ports
+        self.ports = list(dict.fromkeys(ports))
+        self.flash_function = flash_function
+        self.max_workers = max(1, min(max_workers, len(self.ports) or 1))
+        self.retries = max(0, retries)
+        self.update_callback = update_callback
+        self.log_callback = log_callback
+        self.cancel_event = threading.Event()
+        self.lock = threading.Lock()
+        self.executor = None
+        self.futures = {}
+        self.states = {
+            port: {
+                "port": port,
+                "status": STATE_QUEUED,
+                "phase": "",
+                "progress": 0.0,
+                "attempts": 0,
+                "error": "",
+                "elapsed": 0.0
+            }
+            for port in self.ports
+        }
+
+    def _update(self, port: str, **changes):
+        with self.lock:
+            self.states[port].update(changes)
+            snapshot = dict(self.states[port])
+        if self.update_callback:
+            self.update_callback(port, snapshot)
+
+    def _log(self, port: str, message: str):
+        if self.log_callback:
+            self.log_callback(port, message)
+
+    def _run_port(self, port: str) -> bool:
+        """Flash one port, retrying up to the configured limit"""
+        start = time.monotonic()
+
+        def report_progress(phase, done, total):
+            self._update(port, phase=phase, progress=esp_flasher.overall_progress(phase, done, total),
+                         elapsed=time.monotonic() - start)
+
+        def report_log(message):
+            self._log(port, message)
+
+        for attempt in range(1, self.retries + 2):
+            if self.cancel_event.is_set():
+                self._update(port, status=STATE_CANCELLED, elapsed=time.monotonic() - start)
+                return False
+
+            status = STATE_RUNNING if attempt == 1 else STATE_RETRYING
+            self._update(port, status=status, attempts=attempt, progress=0.0, error="")
+            try:
+                if self.flash_function(port, report_progress, report_log):
+                    self._update(port, status=STATE_SUCCESS, progress=100.0,
+                                 elapsed=time.monotonic() - start)
+                    return True
+                error = "Flash attempt failed"
+            except Exception as e:
+                error = str(e)
+
+            self._update(port, error=error, elapsed=time.monotonic() - start)
+            self._log(port, f"Attempt {attempt} failed: {error}")
+
+        self._update(port, status=STATE_FAILED, elapsed=time.monotonic() - start)
+        return False
+
+    def start(self):
+        """Submit every port to the worker pool without blocking"""
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                           thread_name_prefix="gang")
+        for port in self.ports:
+            self.futures[port] = self.executor.submit(self._run_port, port)
+        # Let the pool wind down on its own once all ports are done
+        self.executor.shutdown(wait=False)
+
+    def wait(self, timeout: Optional[float] = None) -> Dict[str, Dict]:
+        """Block until every port has finished and return the final states"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for future in self.futures.values():
+            remaining = None if deadline is None else max(0, deadline - time.monotonic())
+            future.result(timeout=remaining)
+        return self.snapshot()
+
+    def run(self) -> Dict[str, Dict]:
+        """Start the job and wait for all ports"""
+        self.start()
+        return self.wait()
+
+    def cancel(self):
+        """Stop scheduling new attempts and stop running ones where the flash function can"""
+        self.cancel_event.set()
+        stop_running = getattr(self.flash_function, "cancel", None)
+        if stop_running:
+            stop_running()
+
+    def is_finished(self) -> bool:
+        with self.lock:
+            return all(state["status"] in FINISHED_STATES for state in self.states.values())
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Copy of the current state of every port"""
+        with self.lock:
+            return {port: dict(state) for port, state in self.states.items()}
+
+    def summary(self) -> Dict[str, int]:
+        """Count ports by status"""
+        counts = {}
+        for state in self.snapshot().values():
+            counts[state["status"]] = counts.get(state["status"], 0) + 1
+        return counts
+
+
+def make_esp_flash_function(device: str, baud: str, segments: List[Tuple[int, bytes]],
+                            erase: bool = False, verify: bool = True, delta: bool = False,
+                            cache=None) -> Callable:
+    """Build a gang flash function that writes the shared (address, data) segments over esptool"""
+    chip = esp_flasher.get_esptool_chip(device)
+
+    def flash_port(port, progress_callback, log_callback):
+        engine = esp_flasher.ESPFlashEngine(port, int(baud), chip=chip,
+                                            progress_callback=progress_callback,
+                                            log_callback=log_callback)
+        return engine.flash_segments(segments, erase=erase, verify=verify, delta=delta,
+                                     cache=cache)
+
+    return flash_port
@@ -0,0 +1,163 @@
+# J Tech Pixel Uploader Intel HEX Reader
+# Streaming pure-Python parser for Intel HEX files (record types 00-05).
+# Builds a sparse address -> data segment map in memory so HEX files can be
+# flashed or flattened without srec_cat/objcopy/hex2bin or temp files.
+
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Record types
+RECORD_DATA = 0x00
+RECORD_EOF = 0x01
+RECORD_EXT_SEGMENT = 0x02
+RECORD_START_SEGMENT = 0x03
+RECORD_EXT_LINEAR = 0x04
+RECORD_START_LINEAR = 0x05
+
+DEFAULT_FILL = 0xFF
+
+# Bump when the conversion output changes so cached artifacts are rebuilt
+CONVERTER_VERSION = "1"
+
+
+class IntelHexError(ValueError):
+    """Raised for malformed Intel HEX input"""
+
+
+class HexImage:
+    """Sparse memory image parsed from an Intel HEX file.
+
+    ``segments`` is a sorted list of (address, bytes) pairs; contiguous
+    records are merged so gaps between segments are never materialized.
+    """
+
+    def __init__(self, segments: List[Tuple[int, bytes]], start_address: Optional[int] = None):
+        self.segments = segments
+        self.start_address = start_address
+
+    @property
+    def min_address(self) -> int:
+        return self.segments[0][0] if self.segments else 0
+
+    @property
+    def max_address(self) -> int:
+        """Address one past the last data byte"""
+        if not self.segments:
+            return 0
+        address, data = self.segments[-1]
+        return address + len(data)
+
+    @property
+    def data_size(self) -> int:
+        """Number of bytes actually present in the file"""
+        return sum(len(data) for _, data in self.segments)
+
+    def to_bin(self, fill: int = DEFAULT_FILL, start: Optional[int] = None) -> bytes:
+        """Flatten to one binary starting at ``start`` (default: lowest address)"""
+        if start is None:
+            start = self.min_address
+        end = self.max_address
+        if not self.segments or end <= start:
+            return b""
+        image = bytearray([fill]) * (end - start)
+        for address, data in self.segments:
+            if address + len(data) <= start:
+                continue
+            skip = max(0, start - address)
+            offset = address + skip - start
+            image[offset:offset + len(data) - skip] = data[skip:]
+        return bytes(image)
+
+
+def iter_records(lines) -> Iterator[Tuple[int, int, bytes, int]]:
+    """Yield (line_number, record_type, data, address) for every record, checking checksums"""
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        if isinstance(line, bytes):
+            line = line.decode("ascii", "replace")
+        if line[0] != ":":
+            raise IntelHexError(f"Line {line_number}: record does not start with ':'")
+        try:
+            raw = bytes.fromhex(line[1:])
+        except ValueError:
+            raise IntelHexError(f"Line {line_number}: invalid hex digits")
+        if len(raw) < 5 or len(raw) != raw[0] + 5:
+            raise IntelHexError(f"Line {line_number}: record length mismatch")
+        if sum(raw) & 0xFF:
+            raise IntelHexError(f"Line {line_number}: checksum error")
+        yield line_number, raw[3], raw[4:-1], (raw[1] << 8) | raw[2]
+
+
+def parse_lines(lines) -> HexImage:
+    """Parse Intel HEX records from any iterable of lines"""
+    base = 0
+    start_address = None
+    # Open runs keyed by their end address so sequential records extend in place
+    runs: Dict[int, Tuple[int, bytearray]] = {}
+    saw_eof = False
+
+    for line_number, record_type, data, address in iter_records(lines):
+        if record_type == RECORD_DATA:
+            absolute = base + address
+            run = runs.pop(absolute, None)
+            if run is None:
+                run = (absolute, bytearray())
+            run[1].extend(data)
+            end = absolute + len(data)
+            if end in runs:
+                raise IntelHexError(f"Line {line_number}: overlapping data at 0x{absolute:08X}")
+            runs[end] = run
+        elif record_type == RECORD_EOF:
+            saw_eof = True
+            break
+        elif record_type == RECORD_EXT_SEGMENT:
+            if len(data) != 2:
+                raise IntelHexError(f"Line {line_number}: bad extended segment address record")
+            base = ((data[0] << 8) | data[1]) << 4
+        elif record_type == RECORD_EXT_LINEAR:
+            if len(data) != 2:
+                raise IntelHexError(f"Line {line_number}: bad extended linear address record")
+            base = ((data[0] << 8) | data[1]) << 16
+        elif record_type == RECORD_START_SEGMENT:
+            if len(data) != 4:
+                raise IntelHexError(f"Line {line_number}: bad start segment address record")
+            start_address = (((data[0] << 8) | data[1]) << 4) + ((data[2] << 8) | data[3])
+        elif record_type == RECORD_START_LINEAR:
+            if len(data) != 4:
+                raise IntelHexError(f"Line {line_number}: bad start linear address record")
+            start_address = int.from_bytes(data, "big")
+        else:
+            raise IntelHexError(f"Line {line_number}: unknown record type {record_type:02X}")
+
+    if not saw_eof:
+        raise IntelHexError("Missing end-of-file record")
+
+    # Merge runs that touch and reject overlapping data
+    segments = []
+    for address, data in sorted(runs.values(), key=lambda run: run[0]):
+        if segments:
+            last_address, last_data = segments[-1]
+            last_end = last_address + len(last_data)
+            if address < last_end:
+                raise IntelHexError(f"Overlapping data at 0x{address:08X}")
+            if address == last_end:
+                last_data.extend(data)
+                continue
+        segments.append((address, data))
+
+    return HexImage([(address, bytes(data)) for address, data in segments], start_address)
+
+
+def load_hex(file_path: str) -> HexImage:
+    """Parse an Intel HEX file from disk, streaming it line by line"""
+    with open(file_path, "rb") as f:
+        return parse_lines(f)
+
+
+def write_bin(hex_image: HexImage, output_path: str, fill: int = DEFAULT_FILL) -> int:
+    """Write the flattened image to a .bin file and return its size"""
+    data = hex_image.to_bin(fill)
+    with open(output_path, "wb") as f:
+        f.write(data)
+    return len(data)
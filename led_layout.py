@@ -0,0 +1,190 @@
+# J Tech Pixel Uploader LED Layout
+# Maps row-major RGB frames onto the order the LEDs are actually wired:
+# serpentine rows, rotated or mirrored panels, grids of tiled modules and
+# per-LED color order (RGB, GRB, RGBW...). A layout is turned into one byte
+# permutation index when it is built; exporting a frame - or a whole stack
+# of animation frames - is then a single numpy gather.
+
+import functools
+import os
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+import animation_dat
+import config
+
+ROTATIONS = (0, 90, 180, 270)
+
+
+class LayoutError(ValueError):
+    """Raised for wiring descriptions that don't fit the matrix"""
+
+
+def _color_map(color_order: str) -> Tuple[Tuple[int, ...], bool]:
+    """Source channel for each output byte (R=0, G=1, B=2, W=3) and whether W is used"""
+    order = color_order.upper()
+    if sorted(order) not in (sorted("RGB"), sorted("RGBW")):
+        raise LayoutError(f"Unknown color order: {color_order}")
+    return tuple("RGBW".index(channel) for channel in order), "W" in order
+
+
+class LedLayout:
+    """
+    Wiring of a width x height matrix
+    serpentine: every other row runs backwards within each tile
+    rotation: clockwise rotation (0/90/180/270) of the image on the panel,
+    applied before flip_x/flip_y mirror the panel
+    tile_width/tile_height: size of each module; modules are chained in rows,
+    every other row of modules backwards when tile_serpentine is set
+    color_order: byte order each LED expects; with a W channel the white
+    part of each color (min of R, G, B) is moved to the white LED
+    """
+
+    def __init__(self, width: int, height: int, serpentine: bool = False, rotation: int = 0,
+                 flip_x: bool = False, flip_y: bool = False, tile_width: Optional[int] = None,
+                 tile_height: Optional[int] = None, tile_serpentine: bool = False, color_order: str = "RGB"):
+        if rotation not in ROTATIONS:
+            raise LayoutError(f"Rotation must be one of {ROTATIONS}")
+        self.width = width
+        self.height = height
+        self.options = {"serpentine": serpentine, "rotation": rotation, "flip_x": flip_x, "flip_y": flip_y,
+                        "tile_width": tile_width, "tile_height": tile_height,
+                        "tile_serpentine": tile_serpentine, "color_order": color_order.upper()}
+        self.channel_map, self.has_white = _color_map(color_order)
+        self.in_channels = 3
+        self.out_channels = len(self.channel_map)
+        self.led_order = self._build_led_order()
+        self.byte_index = (self.led_order[:, np.newaxis] * (4 if self.has_white else 3)
+                           + np.array(self.channel_map)).reshape(-1)
+
+    @property
+    def is_identity(self) -> bool:
+        return (not self.has_white and self.channel_map == (0, 1, 2)
+                and bool((self.led_order == np.arange(self.led_order.size)).all()))
+
+    @property
+    def frame_size(self) -> int:
+        """Bytes per exported frame"""
+        return self.width * self.height * self.out_channels
+
+    def _build_led_order(self) -> np.ndarray:
+        """Row-major pixel index of each LED along the wiring chain"""
+        options = self.options
+        rotation = options["rotation"]
+        panel_w, panel_h = (self.height, self.width) if rotation in (90, 270) else (self.width, self.height)
+        tile_w = options["tile_width"] or panel_w
+        tile_h = options["tile_height"] or panel_h
+        if panel_w % tile_w or panel_h % tile_h:
+            raise LayoutError(f"{tile_w}x{tile_h} tiles don't divide a {panel_w}x{panel_h} panel")
+        tiles_x = panel_w // tile_w
+
+        # Chain position -> tile and position inside the tile
+        chain = np.arange(panel_w * panel_h)
+        tile, local = np.divmod(chain, tile_w * tile_h)
+        tile_row, tile_col = np.divmod(tile, tiles_x)
+        row, col = np.divmod(local, tile_w)
+        if options["tile_serpentine"]:
+            tile_col = np.where(tile_row % 2 == 1, tiles_x - 1 - tile_col, tile_col)
+        if options["serpentine"]:
+            col = np.where(row % 2 == 1, tile_w - 1 - col, col)
+        px = tile_col * tile_w + col
+        py = tile_row * tile_h + row
+        if options["flip_x"]:
+            px = panel_w - 1 - px
+        if options["flip_y"]:
+            py = panel_h - 1 - py
+
+        # Panel coordinates -> image coordinates (the image is rotated clockwise onto the panel)
+        if rotation == 0:
+            x, y = px, py
+        elif rotation == 90:
+            x, y = py, self.height - 1 - px
+        elif rotation == 180:
+            x, y = self.width - 1 - px, self.height - 1 - py
+        else:
+            x, y = self.width - 1 - py, px
+        return y * self.width + x
+
+    def _source(self, frames: np.ndarray) -> np.ndarray:
+        """(n, leds * 3) RGB, or (n, leds * 4) with the white part split out for RGBW"""
+        if not self.has_white:
+            return frames
+        rgb = frames.reshape(frames.shape[0], -1, 3)
+        white = rgb.min(axis=2, keepdims=True)
+        return np.concatenate((rgb - white, white), axis=2).reshape(frames.shape[0], -1)
+
+    def apply_frames(self, frames) -> np.ndarray:
+        """Reorder a stack of row-major RGB frames; returns (n, frame_size) uint8"""
+        stack = np.asarray(frames, dtype=np.uint8).reshape(-1, self.width * self.height * self.in_channels)
+        return self._source(stack)[:, self.byte_index]
+
+    def apply(self, frame) -> bytes:
+        """Reorder one row-major RGB frame (bytes or array) into wiring order"""
+        if not isinstance(frame, np.ndarray):
+            frame = np.frombuffer(bytes(frame), dtype=np.uint8)
+        if frame.size != self.width * self.height * self.in_channels:
+            raise LayoutError(f"Frame is {frame.size} bytes, expected {self.width * self.height * 3}")
+        return self.apply_frames(frame.reshape(1, -1))[0].tobytes()
+
+
+@functools.lru_cache(maxsize=32)
+def get_layout(width: int, height: int, **options) -> LedLayout:
+    """Layout for a matrix; indexes are built once per wiring and size"""
+    return LedLayout(width, height, **options)
+
+
+def configured_layout(width: int, height: int, overrides: Optional[Dict] = None) -> LedLayout:
+    """Layout from LED_LAYOUT_CONFIG, with optional overrides"""
+    options = dict(config.LED_LAYOUT_CONFIG)
+    options.update(overrides or {})
+    return get_layout(width, height, **options)
+
+
+def configured_channels() -> int:
+    """Bytes per LED in files exported with LED_LAYOUT_CONFIG's color order (4 for RGBW)"""
+    return len(_color_map(config.LED_LAYOUT_CONFIG["color_order"])[0])
+
+
+def remap_dat_file(source_path: str, output_path: str, layout: LedLayout) -> int:
+    """
+    Write a row-major .dat file in wiring order; returns frames written
+    Flat files are remapped in chunks of whole frames, animations frame by
+    frame into a new container with the layout's channel count. Output goes
+    to a temporary file moved into place at the end, so a failure never
+    leaves a truncated output_path behind
+    """
+    if animation_dat.is_animation_dat(source_path):
+        with animation_dat.AnimationReader(source_path) as reader:
+            if (reader.width, reader.height, reader.channels) != (layout.width, layout.height, 3):
+                raise LayoutError("Animation geometry doesn't match the layout")
+            with animation_dat.AnimationWriter(output_path, reader.width, reader.height,
+                                               encoding=reader.encoding_name,
+                                               frame_delay_ms=reader.frame_delay_ms,
+                                               keyframe_interval=reader.keyframe_interval,
+                                               layout=layout) as writer:
+                for frame in reader.iter_sequential():
+                    writer.add_frame(frame)
+                return writer.close()["frames"]
+
+    frame_bytes = layout.width * layout.height * layout.in_channels
+    if os.path.getsize(source_path) % frame_bytes:
+        raise LayoutError(f"File is not a whole number of {frame_bytes}-byte frames")
+    chunk = max(1, config.DAT_VALIDATION_CONFIG["chunk_kb"] * 1024 // frame_bytes) * frame_bytes
+    frames = 0
+    temp_path = output_path + ".tmp"
+    try:
+        with open(source_path, "rb") as source, open(temp_path, "wb") as output:
+            for data in iter(lambda: source.read(chunk), b""):
+                if len(data) % frame_bytes:
+                    raise LayoutError("Source file changed while it was being remapped")
+                output.write(layout.apply_frames(np.frombuffer(data, dtype=np.uint8)).tobytes())
+                frames += len(data) // frame_bytes
+        os.replace(temp_path, output_path)
+    except Exception:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    return frames
@@ -0,0 +1,68 @@
+# J Tech Pixel Uploader Log Sink
+# Thread-safe buffer between the threads that log (uploads, probes, gang
+# workers) and the Tk log widget. Producers only append to a deque; the UI
+# drains everything pending in one batch on a fixed cadence instead of
+# scheduling a Tk callback per line.
+
+import threading
+import time
+from collections import deque
+from typing import List, Optional, Tuple
+
+# Level -> icon shown after the timestamp
+LEVEL_ICONS = {
+    "info": "ℹ",
+    "success": "✅",
+    "warning": "⚠",
+    "error": "❌",
+    "progress": "🔄",
+    "system": "🔧"
+}
+
+LOG_LEVELS = tuple(LEVEL_ICONS)
+
+# (unix time, level, message)
+LogRecord = Tuple[float, str, str]
+
+
+def format_record(record: LogRecord, timestamp_format: str = "%H:%M:%S") -> Tuple[str, str]:
+    """Split a record into its "[timestamp] " prefix and "icon message\\n" body"""
+    created, level, message = record
+    icon = LEVEL_ICONS.get(level, LEVEL_ICONS["info"])
+    return f"[{time.strftime(timestamp_format, time.localtime(created))}] ", f"{icon} {message}\n"
+
+
+class LogSink:
+    """Bounded multi-producer queue of log records drained by the UI thread"""
+
+    def __init__(self, max_pending: int = 10000):
+        self.records = deque()
+        self.max_pending = max_pending
+        self.lock = threading.Lock()
+        self.dropped = 0
+
+    def put(self, level: str, message: str, created: Optional[float] = None):
+        """Queue one record; callable from any thread"""
+        record = (created if created is not None else time.time(),
+                  level if level in LEVEL_ICONS else "info", str(message))
+        with self.lock:
+            if len(self.records) >= self.max_pending:
+                # The UI fell far behind - keep the newest lines
+                self.records.popleft()
+                self.dropped += 1
+            self.records.append(record)
+
+    def drain(self) -> Tuple[List[LogRecord], int]:
+        """
+        Take every pending record
+        Returns: (records, dropped) - dropped counts records discarded since the last drain
+        """
+        with self.lock:
+            records = list(self.records)
+            self.records.clear()
+            dropped, self.dropped = self.dropped, 0
+        return records, dropped
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.records)
@@ -0,0 +1,289 @@
+# J Tech Pixel Uploader Log Store
+# Keeps the whole session log on disk in fixed-size segment files with an
+# in-memory offset index, so the log viewer can show any window of lines and
+# search the full history without holding it in memory. Old segments are
+# dropped ring-style once the session exceeds its size budget.
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+import config
+import log_sink
+
+SEARCH_CHUNK_LINES = 4096
+
+
+def _escape(message: str) -> str:
+    return message.replace("\\", "\\\\").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def _unescape(text: str) -> str:
+    if "\\" not in text:
+        return text
+    result = []
+    chars = iter(text)
+    for char in chars:
+        if char == "\\":
+            following = next(chars, "")
+            result.append({"n": "\n", "r": "\r"}.get(following, following))
+        else:
+            result.append(char)
+    return "".join(result)
+
+
+def encode_record(record: log_sink.LogRecord) -> bytes:
+    created, level, message = record
+    return f"{created:.3f}\t{level}\t{_escape(message)}\n".encode("utf-8")
+
+
+def decode_record(raw: bytes) -> log_sink.LogRecord:
+    created, level, message = raw.decode("utf-8", "replace").rstrip("\n").split("\t", 2)
+    return float(created), level, _unescape(message)
+
+
+def record_matches(record: log_sink.LogRecord, text: str = "", levels: Optional[Sequence[str]] = None,
+                   case_sensitive: bool = False) -> bool:
+    """Check a record against a substring and level filter"""
+    if levels and record[1] not in levels:
+        return False
+    if not text:
+        return True
+    if case_sensitive:
+        return text in record[2]
+    return text.lower() in record[2].lower()
+
+
+class _Segment:
+    """One log file plus the byte offset of every line in it"""
+
+    def __init__(self, path: str, first_line: int):
+        self.path = path
+        self.first_line = first_line
+        self.offsets = array('Q')
+        self.size = 0
+
+    @property
+    def end_line(self) -> int:
+        return self.first_line + len(self.offsets)
+
+
+class LogStore:
+    """Append-only, segmented on-disk log of (time, level, message) records.
+
+    Lines are numbered from 0 for the session and keep their number when
+    older segments are dropped, so filtered views stay valid. ``first_line``
+    is the oldest line still stored and ``end_line`` is one past the newest.
+    """
+
+    def __init__(self, directory: Optional[str] = None, segment_bytes: Optional[int] = None,
+                 max_segments: Optional[int] = None):
+        settings = config.LOG_STORE_CONFIG
+        self.segment_bytes = segment_bytes or settings["segment_size_mb"] * 1024 * 1024
+        self.max_segments = max(2, max_segments or settings["max_segments"])
+        self.directory = directory or self._new_session_dir(settings)
+        os.makedirs(self.directory, exist_ok=True)
+        self.lock = threading.Lock()
+        self.segments: List[_Segment] = []
+        self._segment_counter = 0
+        self._writer = None
+        self._readers = {}
+        self._open_segment(0)
+
+    @staticmethod
+    def _new_session_dir(settings) -> str:
+        """Create a directory for this session and prune the oldest sessions"""
+        try:
+            root = os.path.join(config.get_config_dir(), settings["dir_name"])
+            os.makedirs(root, exist_ok=True)
+        except OSError:
+            return tempfile.mkdtemp(prefix="jtech_log_")
+        sessions = sorted(name for name in os.listdir(root) if name.startswith("session-"))
+        for name in sessions[:max(0, len(sessions) - settings["max_sessions"] + 1)]:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        return tempfile.mkdtemp(prefix=f"session-{stamp}-", dir=root)
+
+    def _open_segment(self, first_line: int):
+        self._segment_counter += 1
+        path = os.path.join(self.directory, f"{self._segment_counter:06d}.log")
+        if self._writer:
+            self._writer.close()
+        self._writer = open(path, 'wb')
+        self.segments.append(_Segment(path, first_line))
+
+        # Ring behaviour: drop the oldest segment once over budget
+        while len(self.segments) > self.max_segments:
+            oldest = self.segments.pop(0)
+            reader = self._readers.pop(oldest.path, None)
+            if reader:
+                reader.close()
+            try:
+                os.remove(oldest.path)
+            except OSError:
+                pass
+
+    @property
+    def first_line(self) -> int:
+        with self.lock:
+            return self.segments[0].first_line
+
+    @property
+    def end_line(self) -> int:
+        with self.lock:
+            return self.segments[-1].end_line
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.segments[-1].end_line - self.segments[0].first_line
+
+    def append(self, records: Iterable[log_sink.LogRecord]) -> int:
+        """Append records in one write; returns the line number of the first one"""
+        with self.lock:
+            first = self.segments[-1].end_line
+            segment = self.segments[-1]
+            chunk = bytearray()
+            for record in records:
+                if segment.size + len(chunk) >= self.segment_bytes and segment.offsets:
+                    self._writer.write(chunk)
+                    segment.size += len(chunk)
+                    chunk = bytearray()
+                    self._open_segment(segment.end_line)
+                    segment = self.segments[-1]
+                segment.offsets.append(segment.size + len(chunk))
+                chunk += encode_record(record)
+            self._writer.write(chunk)
+            self._writer.flush()
+            segment.size += len(chunk)
+            return first
+
+    def _reader(self, segment: _Segment):
+        reader = self._readers.get(segment.path)
+        if reader is None:
+            reader = open(segment.path, 'rb')
+            self._readers[segment.path] = reader
+        return reader
+
+    def _segment_for(self, line: int) -> Optional[_Segment]:
+        index = bisect_right([segment.first_line for segment in self.segments], line) - 1
+        if index < 0:
+            return None
+        segment = self.segments[index]
+        return segment if line < segment.end_line else None
+
+    def read(self, start: int, count: int) -> List[Tuple[int, log_sink.LogRecord]]:
+        """Read up to count consecutive lines starting at line number start"""
+        results = []
+        with self.lock:
+            line = max(start, self.segments[0].first_line)
+            end = min(start + count, self.segments[-1].end_line)
+            while line < end:
+                segment = self._segment_for(line)
+                if segment is None:
+                    break
+                stop = min(end, segment.end_line)
+                begin_offset = segment.offsets[line - segment.first_line]
+                end_offset = segment.offsets[stop - segment.first_line] if stop < segment.end_line else segment.size
+                reader = self._reader(segment)
+                reader.seek(begin_offset)
+                raw = reader.read(end_offset - begin_offset)
+                for number, raw_line in enumerate(raw.splitlines(), line):
+                    results.append((number, decode_record(raw_line)))
+                line = stop
+        return results
+
+    def read_lines(self, lines: Sequence[int]) -> List[Tuple[int, log_sink.LogRecord]]:
+        """Read specific (possibly scattered) line numbers, e.g. one page of a filtered view"""
+        results = []
+        for line in lines:
+            results.extend(self.read(line, 1))
+        return results
+
+    def search(self, text: str = "", levels: Optional[Sequence[str]] = None, start: Optional[int] = None,
+               end: Optional[int] = None, case_sensitive: bool = False,
+               cancelled: Optional[Callable[[], bool]] = None) -> array:
+        """
+        Line numbers of records matching a substring and/or level filter
+        Streams segment files from disk, so memory use stays proportional to the matches.
+        Case-insensitive matching uses str.casefold(), so it covers non-ASCII text too
+        """
+        with self.lock:
+            snapshot = [(segment.path, segment.first_line, segment.end_line) for segment in self.segments]
+        start = snapshot[0][1] if start is None else start
+        end = snapshot[-1][2] if end is None else end
+        folded = text.casefold()
+        needle = text.encode("utf-8") if case_sensitive else folded.encode("utf-8")
+        level_fields = {level.encode("ascii") for level in levels} if levels else None
+
+        matches = array('Q')
+        for path, first_line, end_line in snapshot:
+            if end_line <= start or first_line >= end:
+                continue
+            try:
+                with open(path, 'rb') as f:
+                    for number, raw in enumerate(f, first_line):
+                        if number >= min(end, end_line):
+                            break
+                        if number < start:
+                            continue
+                        if cancelled and number % SEARCH_CHUNK_LINES == 0 and cancelled():
+                            return matches
+                        _, level, message = raw.split(b"\t", 2)
+                        if level_fields and level not in level_fields:
+                            continue
+                        if needle:
+                            if case_sensitive or message.isascii():
+                                # bytes.lower() folds ASCII exactly as casefold() does
+                                if needle not in (message if case_sensitive else message.lower()):
+                                    continue
+                            elif folded not in message.decode("utf-8", "replace").casefold():
+                                continue
+                        matches.append(number)
+            except OSError:
+                continue  # Segment dropped by the ring while searching
+        return matches
+
+    def export(self, path: str, timestamp_format: Optional[str] = None):
+        """Write the whole stored session as plain text"""
+        timestamp_format = timestamp_format or config.LOG_CONFIG["date_format"]
+        with self.lock:
+            paths = [segment.path for segment in self.segments]
+        with open(path, 'w', encoding='utf-8') as out:
+            for segment_path in paths:
+                try:
+                    with open(segment_path, 'rb') as f:
+                        for raw in f:
+                            prefix, body = log_sink.format_record(decode_record(raw), timestamp_format)
+                            out.write(prefix + body)
+                except OSError:
+                    continue
+
+    def clear(self):
+        """Drop every stored line; numbering continues from the current end"""
+        with self.lock:
+            end = self.segments[-1].end_line
+            for reader in self._readers.values():
+                reader.close()
+            self._readers = {}
+            old = self.segments
+            self.segments = []
+            self._open_segment(end)
+            for segment in old:
+                try:
+                    os.remove(segment.path)
+                except OSError:
+                    pass
+
+    def close(self):
+        with self.lock:
+            for reader in self._readers.values():
+                reader.close()
+            self._readers = {}
+            if self._writer:
+                self._writer.close()
+                self._writer = None
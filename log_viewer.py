@@ -0,0 +1,262 @@
+# J Tech Pixel Uploader Log Viewer
+# Virtualized log panel over a LogStore: the Text widget only ever holds the
+# lines currently on screen, and the scrollbar maps onto the full (or
+# filtered) session. Substring and level filters search the on-disk history
+# in a background thread.
+
+import threading
+import tkinter as tk
+import tkinter.font as tkfont
+from array import array
+from bisect import bisect_left
+from tkinter import ttk
+from typing import Dict, List, Optional
+
+import config
+import log_sink
+import log_store
+
+ALL_LEVELS = "all levels"
+FILTER_DEBOUNCE_MS = 250
+
+
+class LogViewer(ttk.Frame):
+    """Scrollable, filterable window onto a LogStore"""
+
+    def __init__(self, parent, store: log_store.LogStore, colors: Dict[str, str], font=('Consolas', 12)):
+        super().__init__(parent, style='Log.TFrame')
+        self.store = store
+        self.colors = colors
+        self.top = store.first_line     # First visible line number (or view index when filtered)
+        self.follow = tk.BooleanVar(value=True)
+        self.filter_text = tk.StringVar()
+        self.filter_level = tk.StringVar(value=ALL_LEVELS)
+        self.view: Optional[array] = None  # Matching line numbers while a filter is active
+        self._filter_generation = 0
+        self._filter_job = None
+        self._render_job = None
+        self._searching = False
+
+        self.setup_ui(font)
+
+    def setup_ui(self, font):
+        self.linespace = tkfont.Font(font=font).metrics("linespace")
+        filter_bar = ttk.Frame(self)
+        filter_bar.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 5))
+        ttk.Label(filter_bar, text="🔎").grid(row=0, column=0, padx=(0, 5))
+        filter_entry = ttk.Entry(filter_bar, textvariable=self.filter_text, width=30)
+        filter_entry.grid(row=0, column=1, sticky=(tk.W, tk.E))
+        level_combo = ttk.Combobox(filter_bar, textvariable=self.filter_level, state="readonly", width=12,
+                                   values=[ALL_LEVELS] + list(log_sink.LOG_LEVELS))
+        level_combo.grid(row=0, column=2, padx=(5, 0))
+        ttk.Checkbutton(filter_bar, text="Follow", variable=self.follow,
+                        command=self.on_follow_toggle).grid(row=0, column=3, padx=(5, 0))
+        self.count_label = ttk.Label(filter_bar, text="")
+        self.count_label.grid(row=0, column=4, padx=(10, 0), sticky=tk.E)
+        filter_bar.grid_columnconfigure(1, weight=1)
+
+        self.text = tk.Text(self, height=25, width=80, font=font,
+                            bg=self.colors['surface_bg'],
+                            fg=self.colors['text_primary'],
+                            insertbackground=self.colors['text_primary'],
+                            selectbackground=self.colors['selection'],
+                            selectforeground=self.colors['text_primary'],
+                            relief='solid', borderwidth=1,
+                            # One record per row keeps the row math exact
+                            wrap=tk.NONE)
+        self.text.grid(row=1, column=0, sticky=(tk.N, tk.W, tk.E, tk.S))
+        self.scrollbar = ttk.Scrollbar(self, command=self.on_scrollbar)
+        self.scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
+        x_scrollbar = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.text.xview)
+        x_scrollbar.grid(row=2, column=0, sticky=(tk.W, tk.E))
+        self.text.config(xscrollcommand=x_scrollbar.set)
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        # Tags are configured once; rendering only references them
+        level_colors = {
+            "info": self.colors['text_primary'],
+            "success": self.colors['success'],
+            "warning": self.colors['warning'],
+            "error": self.colors['error'],
+            "progress": self.colors['accent'],
+            "system": self.colors['text_secondary']
+        }
+        for level, color in level_colors.items():
+            self.text.tag_config(f"level_{level}", foreground=color)
+
+        self.text.bind("<MouseWheel>", self.on_mousewheel)
+        self.text.bind("<Button-4>", lambda event: self.scroll_by(-3))
+        self.text.bind("<Button-5>", lambda event: self.scroll_by(3))
+        self.text.bind("<Configure>", lambda event: self.schedule_render())
+        self.filter_text.trace_add("write", lambda *args: self.schedule_filter())
+        self.filter_level.trace_add("write", lambda *args: self.schedule_filter())
+
+    # --- geometry -------------------------------------------------------
+
+    def visible_rows(self) -> int:
+        """Rows that fit in the text widget"""
+        height = self.text.winfo_height()
+        if height <= 1:
+            return int(self.text.cget("height"))
+        return max(1, height // max(1, self.linespace))
+
+    def total_rows(self) -> int:
+        return len(self.view) if self.view is not None else len(self.store)
+
+    def max_top(self) -> int:
+        return max(0, self.total_rows() - self.visible_rows())
+
+    # --- scrolling ------------------------------------------------------
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.set_top(int(float(amount) * self.total_rows()))
+        elif action == "scroll":
+            step = self.visible_rows() if unit == "pages" else 1
+            self.scroll_by(int(amount) * step)
+
+    def on_mousewheel(self, event):
+        self.scroll_by(-1 * (event.delta // 120 or (1 if event.delta > 0 else -1)) * 3)
+        return "break"
+
+    def scroll_by(self, rows: int):
+        self.set_top(self._top_index() + rows)
+        return "break"
+
+    def _top_index(self) -> int:
+        """Top position as an index into the current (filtered or full) rows"""
+        if self.view is not None:
+            return self.top
+        return self.top - self.store.first_line
+
+    def set_top(self, index: int):
+        index = max(0, min(index, self.max_top()))
+        self.top = index if self.view is not None else index + self.store.first_line
+        # Scrolling away from the bottom pauses follow mode, scrolling back resumes it
+        self.follow.set(index >= self.max_top())
+        self.render()
+
+    def on_follow_toggle(self):
+        if self.follow.get():
+            self.set_top(self.max_top())
+
+    # --- data -----------------------------------------------------------
+
+    def on_append(self, first_line: int, records: List[log_sink.LogRecord]):
+        """New records were appended to the store starting at first_line"""
+        if self.view is not None and not self._searching:
+            text, levels = self.current_filter()
+            for number, record in enumerate(records, first_line):
+                if log_store.record_matches(record, text, levels):
+                    self.view.append(number)
+        self.schedule_render()
+
+    def reset(self):
+        """Forget the current position after the store was cleared"""
+        self.top = self.store.first_line
+        if self.view is not None:
+            self.view = array('Q')
+        self.render()
+
+    def current_filter(self):
+        text = self.filter_text.get()
+        level = self.filter_level.get()
+        return text, ([level] if level and level != ALL_LEVELS else None)
+
+    def schedule_filter(self):
+        if self._filter_job:
+            self.after_cancel(self._filter_job)
+        self._filter_job = self.after(FILTER_DEBOUNCE_MS, self.apply_filter)
+
+    def apply_filter(self):
+        """Search the stored history for the current filter in a background thread"""
+        self._filter_job = None
+        text, levels = self.current_filter()
+        self._filter_generation += 1
+        generation = self._filter_generation
+        if not text and not levels:
+            self.view = None
+            self._searching = False
+            self.top = self.store.first_line
+            self.set_top(self.max_top())
+            return
+
+        self._searching = True
+        self.count_label.config(text="Searching...")
+        end = self.store.end_line
+
+        def search():
+            matches = self.store.search(text, levels, end=end,
+                                        cancelled=lambda: generation != self._filter_generation)
+            self.after(0, self._filter_done, generation, matches, end)
+
+        threading.Thread(target=search, daemon=True, name="log-search").start()
+
+    def _filter_done(self, generation: int, matches: array, end: int):
+        if generation != self._filter_generation:
+            return  # A newer filter replaced this one
+        text, levels = self.current_filter()
+        # Lines appended while the search ran
+        matches.extend(self.store.search(text, levels, start=end))
+        self._searching = False
+        self.view = matches
+        self.set_top(self.max_top())
+
+    def view_lines(self, limit: Optional[int] = None) -> List[int]:
+        """Line numbers in the current view (newest last), optionally only the last `limit`"""
+        if self.view is None:
+            end = self.store.end_line
+            start = self.store.first_line if limit is None else max(self.store.first_line, end - limit)
+            return list(range(start, end))
+        # Drop matches whose segment has already been recycled
+        first = bisect_left(self.view, self.store.first_line)
+        lines = self.view[first:]
+        return list(lines if limit is None else lines[-limit:])
+
+    # --- rendering ------------------------------------------------------
+
+    def schedule_render(self):
+        if self._render_job is None:
+            self._render_job = self.after_idle(self.render)
+
+    def render(self):
+        """Replace the widget contents with the rows at the current position"""
+        self._render_job = None
+        rows = self.visible_rows()
+        if self.follow.get():
+            index = self.max_top()
+            self.top = index if self.view is not None else index + self.store.first_line
+        index = self._top_index()
+        if self.view is not None:
+            if self.view and self.view[0] < self.store.first_line:
+                # Lines recycled by the store's ring can no longer be shown
+                del self.view[:bisect_left(self.view, self.store.first_line)]
+                index = min(index, self.max_top())
+                self.top = index
+            records = self.store.read_lines(self.view[index:index + rows])
+        else:
+            self.top = max(self.top, self.store.first_line)
+            records = self.store.read(self.top, rows)
+
+        timestamp_format = config.LOG_CONFIG["timestamp_format"]
+        chunks = []
+        for _, record in records:
+            prefix, body = log_sink.format_record(record, timestamp_format)
+            chunks.extend((prefix, (), body, (f"level_{record[1]}",)))
+        # Read-only for the user; selection and copy still work while disabled
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        if chunks:
+            self.text.insert(tk.END, *chunks)
+        self.text.config(state=tk.DISABLED)
+
+        total = self.total_rows()
+        if total:
+            self.scrollbar.set(index / total, min(1.0, (index + rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        if self.view is not None and not self._searching:
+            self.count_label.config(text=f"{len(self.view):,} of {len(self.store):,} lines")
+        elif not self._searching:
+            self.count_label.config(text=f"{total:,} lines")
@@ -1,18 +1,48 @@
+import time
+# Measured from here so the import phase shows up in the startup timings
+_IMPORT_START = time.perf_counter()
+
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, colorchooser
+from tkinter import ttk, filedialog, messagebox
 import serial
-import serial.tools.list_ports
 import os
 import threading
 import subprocess
-import time
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import utils
 import config
+import esp_flasher
+import gang_flasher
+import flash_cache
+import artifact_cache
+import log_sink
+import log_store
+import log_viewer
+import upload_pipeline
+import upload_records
+import upload_metrics
+import progress_parser
 import sys
 import importlib.util
-from PIL import Image, ImageTk, ImageDraw
-import numpy as np
+
+# Pillow, numpy, serial.tools.list_ports and the pattern editor are imported
+# on first use so they don't delay the first window
+IMPORT_TIME = time.perf_counter() - _IMPORT_START
+
+# (registry name, display name, message if missing, message if available)
+SYSTEM_TOOL_CHECKS = [
+    ("avrdude", "avrdude", "AVR/ATtiny/ATmega microcontroller support limited",
+     "Full AVR series support (Arduino, ATtiny, ATmega)"),
+    ("stm32flash", "stm32flash", "STM32 series support limited",
+     "Full STM32 series support (F1/F4/F7/H7/L4/G0)"),
+    ("rp2040", "rp2040 tool", "Raspberry Pi Pico support limited", "Raspberry Pi Pico support"),
+    ("arduino_cli", "arduino-cli", "Arduino Nano 33 BLE/RP2040 support limited", "Arduino variants support"),
+    ("teensy_loader", "teensy_loader_cli", "Teensy series support limited", "Teensy series support"),
+    ("mspdebug", "mspdebug", "MSP430 support limited", "MSP430 support"),
+    ("commander", "commander", "EFM32 support limited", "EFM32 support"),
+    ("lpc21isp", "lpc21isp", "LPC support limited", "LPC support"),
+]
+
 
 class JTechPixelUploader:
     def __init__(self, root):
@@ -40,8 +70,17 @@ class JTechPixelUploader:
             'selection': '#dbeafe'           # Text selection
         }
         
+        # Per-phase startup durations in seconds, logged once the window is up
+        self.startup_timings = {"imports": IMPORT_TIME}
+        
+        # Log lines are queued until the log widget exists and drains them
+        self.log_sink = log_sink.LogSink()
+        self.log_store = log_store.LogStore()
+        
         # Check and install dependencies after colors are initialized
+        phase_start = time.perf_counter()
         self.check_and_install_dependencies()
+        self.startup_timings["dependency check"] = time.perf_counter() - phase_start
 
         
         # Configure root window
@@ -53,6 +92,11 @@ class JTechPixelUploader:
         # Store initial window size for responsive calculations
         self.initial_width = 1400
         self.initial_height = 900
+        # Last applied layout state, so resize handling only touches what changed
+        self._window_size = None
+        self._resize_job = None
+        self._style_fonts = {}
+        self._main_padding = None
         self.min_width = 1000
         self.min_height = 700
         
@@ -64,7 +108,14 @@ class JTechPixelUploader:
         self.firmware_mode_var = tk.StringVar(value="firmware")
         self.verify_after_upload = tk.BooleanVar(value=True)
         self.erase_before_upload = tk.BooleanVar(value=False)
+        self.delta_flash = tk.BooleanVar(value=False)
+        self.skip_identical = tk.BooleanVar(value=config.FLASH_CACHE_CONFIG["enabled"])
+        self.flash_cache = flash_cache.FlashCache()
+        self.artifact_cache = artifact_cache.ArtifactCache() if config.ARTIFACT_CACHE_CONFIG["enabled"] else None
+        self.upload_records = upload_records.UploadRecordWriter()
+        self.metrics_exporters = upload_metrics.create_exporters()
         self.upload_progress = tk.DoubleVar()
+        self.progress_detail = ""  # Phase, KB/s and ETA shown next to the percentage
         self.is_uploading = False
         
         # File processing variables
@@ -78,10 +129,14 @@ class JTechPixelUploader:
         self.setup_custom_styles()
         
         # Setup UI
+        phase_start = time.perf_counter()
         self.setup_ui()
+        self.startup_timings["setup_ui"] = time.perf_counter() - phase_start
         
         # Initialize
+        phase_start = time.perf_counter()
         self.detect_ports()
+        self.startup_timings["detect_ports"] = time.perf_counter() - phase_start
         self.selected_device.set("ESP8266")
         self.selected_baud.set("115200")
         
@@ -95,6 +150,21 @@ class JTechPixelUploader:
         # Apply initial responsive adjustments
         self.apply_initial_responsive_settings()
         
+        # Runs once the main loop is idle, i.e. after the first paint
+        if config.STARTUP_CONFIG["log_timings"]:
+            self.root.after_idle(self.log_startup_timings)
+        
+    def log_startup_timings(self):
+        """Log how long each startup phase took and the time to first window"""
+        first_window = time.perf_counter() - _IMPORT_START
+        phases = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.startup_timings.items())
+        self.log_system(f"⏱ Startup: {phases}")
+        budget_ms = config.STARTUP_CONFIG["first_window_budget_ms"]
+        if first_window * 1000 > budget_ms:
+            self.log_warning(f"⚠️ First window took {first_window * 1000:.0f} ms (budget {budget_ms} ms)")
+        else:
+            self.log_system(f"⏱ First window after {first_window * 1000:.0f} ms")
+    
     def check_and_install_dependencies(self):
         """Check and automatically install required dependencies"""
         try:
@@ -138,13 +208,7 @@ class JTechPixelUploader:
                 if hasattr(self, 'log_success'):
                     self.log_success("✅ All required Python dependencies are available")
                 
-            # Check system tools (optional but recommended)
-            if hasattr(self, 'colors'):
-                system_tool_errors = self.check_system_tools()
-                if system_tool_errors:
-                    for tool_error in system_tool_errors:
-                        if hasattr(self, 'log_warning'):
-                            self.log_warning(tool_error)
+            # System tools are probed in the background by show_dependency_status
                 
         except Exception as e:
             error_msg = f"⚠️ Error checking dependencies: {e}"
@@ -360,109 +424,13 @@ class JTechPixelUploader:
         else:
             tool_errors.append("✅ esptool system tool available - Full ESP series support")
         
-        # Check for avrdude (AVR series)
-        try:
-            result = subprocess.run(['avrdude', '--help'], 
-                                  capture_output=True, text=True, timeout=5)
-            if result.returncode != 0:
-                missing_tools.append("avrdude")
-                tool_errors.append("⚠️ avrdude not found - AVR/ATtiny/ATmega microcontroller support limited")
-            else:
-                tool_errors.append("✅ avrdude available - Full AVR series support (Arduino, ATtiny, ATmega)")
-        except:
-            missing_tools.append("avrdude")
-            tool_errors.append("⚠️ avrdude not found - AVR/ATtiny/ATmega microcontroller support limited")
-        
-        # Check for stm32flash (STM32 series)
-        try:
-            result = subprocess.run(['stm32flash', '--help'], 
-                                  capture_output=True, text=True, timeout=5)
-            if result.returncode != 0:
-                missing_tools.append("stm32flash")
-                tool_errors.append("⚠️ stm32flash not found - STM32 series support limited")
-            else:
-                tool_errors.append("✅ stm32flash available - Full STM32 series support (F1/F4/F7/H7/L4/G0)")
-        except:
-            missing_tools.append("stm32flash")
-            tool_errors.append("⚠️ stm32flash not found - STM32 series support limited")
-        
-        # Check for rp2040 (Raspberry Pi Pico)
-        try:
-            result = subprocess.run(['python', '-m', 'rp2040', '--help'], 
-                                  capture_output=True, text=True, timeout=5)
-            if result.returncode != 0:
-                missing_tools.append("rp2040")
-                tool_errors.append("⚠️ rp2040 tool not found - Raspberry Pi Pico support limited")
-            else:
-                tool_errors.append("✅ rp2040 tool available - Raspberry Pi Pico support")
-        except:
-            missing_tools.append("rp2040")
-            tool_errors.append("⚠️ rp2040 tool not found - Raspberry Pi Pico support limited")
-        
-        # Check for arduino-cli (Arduino variants)
-        try:
-            result = subprocess.run(['arduino-cli', 'version'], 
-                                  capture_output=True, text=True, timeout=5)
-            if result.returncode != 0:
-                missing_tools.append("arduino-cli")
-                tool_errors.append("⚠️ arduino-cli not found - Arduino Nano 33 BLE/RP2040 support limited")
-            else:
-                tool_errors.append("✅ arduino-cli available - Arduino variants support")
-        except:
-            missing_tools.append("arduino-cli")
-            tool_errors.append("⚠️ arduino-cli not found - Arduino Nano 33 BLE/RP2040 support limited")
-        
-        # Check for teensy_loader_cli (Teensy series)
-        try:
-            result = subprocess.run(['teensy_loader_cli', '--help'], 
-                                  capture_output=True, text=True, timeout=5)
-            if result.returncode != 0:
-                missing_tools.append("teensy_loader_cli")
-                tool_errors.append("⚠️ teensy_loader_cli not found - Teensy series support limited")
-            else:
-                tool_errors.append("✅ teensy_loader_cli available - Teensy series support")
-        except:
-            missing_tools.append("teensy_loader_cli")
-            tool_errors.append("⚠️ teensy_loader_cli not found - Teensy series support limited")
-        
-        # Check for mspdebug (MSP430)
-        try:
-            result = subprocess.run(['mspdebug', '--help'], 
-                                  capture_output=True, text=True, timeout=5)
-            if result.returncode != 0:
-                missing_tools.append("mspdebug")
-                tool_errors.append("⚠️ mspdebug not found - MSP430 support limited")
-            else:
-                tool_errors.append("✅ mspdebug available - MSP430 support")
-        except:
-            missing_tools.append("mspdebug")
-            tool_errors.append("⚠️ mspdebug not found - MSP430 support limited")
-        
-        # Check for commander (EFM32)
-        try:
-            result = subprocess.run(['commander', '--help'], 
-                                  capture_output=True, text=True, timeout=5)
-            if result.returncode != 0:
-                missing_tools.append("commander")
-                tool_errors.append("⚠️ commander not found - EFM32 support limited")
-            else:
-                tool_errors.append("✅ commander available - EFM32 support")
-        except:
-            missing_tools.append("commander")
-            tool_errors.append("⚠️ commander not found - EFM32 support limited")
-        
-        # Check for lpc21isp (LPC)
-        try:
-            result = subprocess.run(['lpc21isp', '--help'], 
-                                  capture_output=True, text=True, timeout=5)
-            if result.returncode != 0:
-                missing_tools.append("lpc21isp")
-                tool_errors.append("⚠️ lpc21isp not found - LPC support limited")
-            else:
-                tool_errors.append("✅ lpc21isp available - LPC support")
-        except:
-            missing_tools.append("lpc21isp")
-            tool_errors.append("⚠️ lpc21isp not found - LPC support limited")
+        # Other flashing tools are resolved through the tool registry, which
+        # reuses results from earlier runs until PATH or the binary changes
+        for check, entry in self.probe_system_tools():
+            status = self.format_tool_status(check, entry)
+            if entry["command"] is None:
+                missing_tools.append(check[1])
+            tool_errors.append(status)
         
         # Log detailed tool status
         if hasattr(self, 'log_message'):
@@ -480,8 +448,70 @@ class JTechPixelUploader:
         
         return tool_errors
     
-    def show_dependency_status(self):
-        """Show a summary of dependency status in the log"""
+    def probe_system_tools(self, on_result=None):
+        """
+        Probe every tool in SYSTEM_TOOL_CHECKS concurrently
+        on_result(check, entry) is called from a worker thread as each probe finishes
+        Returns: [(check, registry entry)] in SYSTEM_TOOL_CHECKS order
+        """
+        registry = utils.get_tool_registry()
+        
+        def probe(check):
+            entry = registry.lookup(check[0])
+            if on_result:
+                on_result(check, entry)
+            return entry
+        
+        with ThreadPoolExecutor(max_workers=len(SYSTEM_TOOL_CHECKS), thread_name_prefix="tool-probe") as executor:
+            futures = [executor.submit(probe, check) for check in SYSTEM_TOOL_CHECKS]
+            return [(check, future.result()) for check, future in zip(SYSTEM_TOOL_CHECKS, futures)]
+    
+    def format_tool_status(self, check, entry):
+        """One-line status for a probed system tool"""
+        name, label, missing_msg, available_msg = check
+        if entry["command"] is None:
+            return f"⚠️ {label} not found - {missing_msg}"
+        version = f" ({entry['version']})" if entry.get("version") else ""
+        return f"✅ {label} available{version} - {available_msg}"
+    
+    def start_system_tool_probe(self, on_complete=None):
+        """
+        Probe system tools off the UI thread, logging each result as it arrives
+        on_complete(results) is called from the probe thread after the summary
+        """
+        def report(check, entry):
+            status = self.format_tool_status(check, entry)
+            if entry["command"] is None:
+                self.log_warning(status)
+            else:
+                self.log_message(status)
+        
+        def run():
+            start_time = time.monotonic()
+            try:
+                results = self.probe_system_tools(on_result=report)
+            except Exception as e:
+                self.log_warning(f"⚠️ System tool check failed: {e}")
+                return
+            missing = [check[1] for check, entry in results if entry["command"] is None]
+            available = len(results) - len(missing)
+            if missing:
+                self.log_warning(f"⚠️ {len(missing)} system tool(s) missing: {', '.join(missing)}")
+                self.log_message("💡 These are optional but provide enhanced microcontroller support")
+            else:
+                self.log_success("✅ All system tools are available")
+            self.log_system(f"📊 System tools: {available} available, {len(missing)} missing "
+                            f"(probed in {time.monotonic() - start_time:.2f}s)")
+            if on_complete:
+                on_complete(results)
+        
+        threading.Thread(target=run, daemon=True, name="system-tool-probe").start()
+    
+    def show_dependency_status(self, background=True, on_complete=None):
+        """
+        Show a summary of dependency status in the log
+        on_complete(results) runs once the background system tool probe is done
+        """
         try:
             self.log_system("🔍 Checking dependency status...")
             
@@ -507,7 +537,11 @@ class JTechPixelUploader:
                 self.log_message("🔧 Manual installation: pip install " + " ".join(missing))
             
             # Check system tools
-            if hasattr(self, 'colors'):
+            if background:
+                # Results are logged as each probe finishes; the window stays responsive
+                self.log_system("🔍 Checking system tools in the background...")
+                self.start_system_tool_probe(on_complete)
+            elif hasattr(self, 'colors'):
                 self.log_system("🔍 Checking system tools...")
                 system_tool_errors = self.check_system_tools()
                 
@@ -532,6 +566,8 @@ class JTechPixelUploader:
         """Manual dependency check triggered by user"""
         try:
             self.log_system("🔍 Manual dependency check initiated...")
+            # A manual check should see tools installed since the last probe
+            utils.get_tool_registry().invalidate()
             self.log_message("📋 Checking all dependencies and system tools...")
             
             # Clear previous dependency messages
@@ -539,9 +575,16 @@ class JTechPixelUploader:
             self.log_system("DEPENDENCY STATUS REPORT")
             self.log_system("=" * 50)
             
-            # Run comprehensive dependency check
-            self.show_dependency_status()
+            # Tools are probed once in the background; the report follows when they are done
+            self.show_dependency_status(on_complete=self.finish_manual_dependency_check)
             
+        except Exception as e:
+            self.log_error(f"❌ Dependency check failed: {str(e)}")
+            self.log_message("🔧 Please check the error details above")
+    
+    def finish_manual_dependency_check(self, tool_results):
+        """Log the recommendations and detailed report once the manual check's tool probe finishes"""
+        try:
             # Add summary and recommendations
             self.log_system("=" * 50)
             self.log_system("RECOMMENDATIONS")
@@ -560,7 +603,7 @@ class JTechPixelUploader:
                 self.log_message("🚀 Ready for firmware uploads!")
             
             # Show detailed dependency report
-            self.show_detailed_dependency_report()
+            self.show_detailed_dependency_report(tool_results)
             
             self.log_system("=" * 50)
             self.log_system("Dependency check complete")
@@ -570,8 +613,11 @@ class JTechPixelUploader:
             self.log_error(f"❌ Dependency check failed: {str(e)}")
             self.log_message("🔧 Please check the error details above")
     
-    def show_detailed_dependency_report(self):
-        """Show detailed dependency report in the log"""
+    def show_detailed_dependency_report(self, tool_results=None):
+        """
+        Show detailed dependency report in the log
+        tool_results: probe_system_tools() results to reuse instead of probing again
+        """
         try:
             self.log_system("📊 DETAILED DEPENDENCY REPORT")
             self.log_system("-" * 30)
@@ -593,93 +639,11 @@ class JTechPixelUploader:
             
             # System tools
             self.log_system("🔧 SYSTEM TOOLS:")
-            try:
-                # Check avrdude
-                result = subprocess.run(['avrdude', '--help'], 
-                                      capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    self.log_success("  ✅ avrdude - AVR series support (Arduino, ATtiny, ATmega)")
-                else:
-                    self.log_warning("  ⚠️ avrdude - AVR series support limited")
-            except:
-                self.log_warning("  ⚠️ avrdude - AVR series support limited")
-            
-            try:
-                # Check stm32flash
-                result = subprocess.run(['stm32flash', '--help'], 
-                                      capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    self.log_success("  ✅ stm32flash - STM32 series support (F1/F4/F7/H7/L4/G0)")
-                else:
-                    self.log_warning("  ⚠️ stm32flash - STM32 series support limited")
-            except:
-                self.log_warning("  ⚠️ stm32flash - STM32 series support limited")
-            
-            try:
-                # Check rp2040
-                result = subprocess.run(['python', '-m', 'rp2040', '--help'], 
-                                      capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    self.log_success("  ✅ rp2040 - Raspberry Pi Pico support")
-                else:
-                    self.log_warning("  ⚠️ rp2040 - Raspberry Pi Pico support limited")
-            except:
-                self.log_warning("  ⚠️ rp2040 - Raspberry Pi Pico support limited")
-            
-            try:
-                # Check arduino-cli
-                result = subprocess.run(['arduino-cli', 'version'], 
-                                      capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    self.log_success("  ✅ arduino-cli - Arduino variants support")
-                else:
-                    self.log_warning("  ⚠️ arduino-cli - Arduino variants support limited")
-            except:
-                self.log_warning("  ⚠️ arduino-cli - Arduino variants support limited")
-            
-            try:
-                # Check teensy_loader_cli
-                result = subprocess.run(['teensy_loader_cli', '--help'], 
-                                      capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    self.log_success("  ✅ teensy_loader_cli - Teensy series support")
-                else:
-                    self.log_warning("  ⚠️ teensy_loader_cli - Teensy series support limited")
-            except:
-                self.log_warning("  ⚠️ teensy_loader_cli - Teensy series support limited")
-            
-            try:
-                # Check mspdebug
-                result = subprocess.run(['mspdebug', '--help'], 
-                                      capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    self.log_success("  ✅ mspdebug - MSP430 support")
+            for (name, label, missing_msg, available_msg), entry in tool_results or self.probe_system_tools():
+                if entry["command"] is None:
+                    self.log_warning(f"  ⚠️ {label} - {missing_msg}")
                 else:
-                    self.log_warning("  ⚠️ mspdebug - MSP430 support limited")
-            except:
-                self.log_warning("  ⚠️ mspdebug - MSP430 support limited")
-            
-            try:
-                # Check commander
-                result = subprocess.run(['commander', '--help'], 
-                                      capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    self.log_success("  ✅ commander - EFM32 support")
-                else:
-                    self.log_warning("  ⚠️ commander - EFM32 support limited")
-            except:
-                self.log_warning("  ⚠️ commander - EFM32 support limited")
-            
-            try:
-                # Check lpc21isp
-                result = subprocess.run(['lpc21isp', '--help'], 
-                                      capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    self.log_success("  ✅ lpc21isp - LPC support")
-                else:
-                    self.log_warning("  ⚠️ lpc21isp - LPC support limited")
-            except:
-                self.log_warning("  ⚠️ lpc21isp - LPC support limited")
+                    self.log_success(f"  ✅ {label} - {available_msg}")
             
             # Python version and platform info
             self.log_system("💻 SYSTEM INFORMATION:")
@@ -705,6 +669,8 @@ class JTechPixelUploader:
     def setup_custom_styles(self):
         """Configure custom ttk styles for modern dark theme appearance"""
         self.style = ttk.Style()
+        # Fonts set here bypass configure_style_font, so its record no longer holds
+        self._style_fonts = {}
         
         # Configure main window background
         self.style.configure('Main.TFrame', background=self.colors['background'])
@@ -957,9 +923,11 @@ class JTechPixelUploader:
                   style='Secondary.TButton').grid(row=0, column=0, padx=(0, 10))
         ttk.Button(buttons_frame, text="🎨 Pattern Editor", command=self.open_pattern_editor,
                   style='Secondary.TButton').grid(row=0, column=1, padx=(0, 10))
+        ttk.Button(buttons_frame, text="🧩 Gang Upload", command=self.open_gang_upload,
+                  style='Secondary.TButton').grid(row=0, column=2, padx=(0, 10))
         self.upload_button = ttk.Button(buttons_frame, text="🚀 Upload", command=self.start_upload,
                                        style='Primary.TButton')
-        self.upload_button.grid(row=0, column=2)
+        self.upload_button.grid(row=0, column=3)
         
         # Options
         options_frame = ttk.Frame(actions_frame)
@@ -968,7 +936,11 @@ class JTechPixelUploader:
         ttk.Checkbutton(options_frame, text="Verify after upload", 
                        variable=self.verify_after_upload, style='Custom.TCheckbutton').grid(row=0, column=0, padx=(0, 15))
         ttk.Checkbutton(options_frame, text="Erase flash before upload", 
-                       variable=self.erase_before_upload, style='Custom.TCheckbutton').grid(row=0, column=1)
+                       variable=self.erase_before_upload, style='Custom.TCheckbutton').grid(row=0, column=1, padx=(0, 15))
+        ttk.Checkbutton(options_frame, text="Delta flash (ESP, skip unchanged sectors)",
+                       variable=self.delta_flash, style='Custom.TCheckbutton').grid(row=0, column=2)
+        ttk.Checkbutton(options_frame, text="Skip if already flashed (ESP)",
+                       variable=self.skip_identical, style='Custom.TCheckbutton').grid(row=1, column=0, sticky=tk.W, pady=(5, 0))
         
         # Progress & Status Section - Card style
         progress_frame = ttk.LabelFrame(scrollable_frame, text="📊 Progress & Status", style='Card.TFrame', padding=15)
@@ -1013,30 +985,14 @@ class JTechPixelUploader:
         ttk.Button(log_controls, text="🔍 Check Dependencies", command=self.manual_dependency_check,
                    style='Info.TButton').grid(row=0, column=3)
         
-        # Log text area
-        log_container = ttk.Frame(log_frame, style='Log.TFrame')
-        log_container.grid(row=1, column=0, sticky=(tk.N, tk.W, tk.E, tk.S), pady=(10, 0))
-        
-        # Scrollbar for log
-        log_scrollbar = ttk.Scrollbar(log_container)
-        log_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
-        
-        # Log text widget with larger font
-        self.log_text = tk.Text(log_container, height=25, width=80, 
-                               font=('Consolas', 12), 
-                               bg=self.colors['surface_bg'], 
-                               fg=self.colors['text_primary'],
-                               insertbackground=self.colors['text_primary'],
-                               selectbackground=self.colors['selection'],
-                               selectforeground=self.colors['text_primary'],
-                               relief='solid',
-                               borderwidth=1,
-                               wrap=tk.WORD)
-        self.log_text.grid(row=0, column=0, sticky=(tk.N, tk.W, tk.E, tk.S))
-        
-        # Configure scrollbar
-        log_scrollbar.config(command=self.log_text.yview)
-        self.log_text.config(yscrollcommand=log_scrollbar.set)
+        # Log area - renders only the visible window of the on-disk session log
+        self.log_view = log_viewer.LogViewer(log_frame, self.log_store, self.colors)
+        self.log_view.grid(row=1, column=0, sticky=(tk.N, tk.W, tk.E, tk.S), pady=(10, 0))
+        log_frame.grid_rowconfigure(1, weight=1)
+        log_frame.grid_columnconfigure(0, weight=1)
+        
+        # Lines logged from any thread are queued and rendered here in batches
+        self.root.after(config.LOG_CONFIG["flush_interval_ms"], self.drain_log)
         
         # Configure grid weights for responsive behavior
         file_frame.grid_columnconfigure(1, weight=1)
@@ -1104,7 +1060,7 @@ class JTechPixelUploader:
             self.log_warning("esptool not found. ESP8266/ESP32 flashing will not work.")
         
         if not tools["hex_converter"]:
-            self.log_warning("No HEX converter found. HEX files cannot be processed.")
+            self.log_message("No external HEX converter found - using the built-in HEX parser")
         
         if not tools["fs_builder"]:
             self.log_warning("No file system builder found. DAT files cannot be processed.")
@@ -1246,13 +1202,9 @@ class JTechPixelUploader:
             
         # Additional validation for ESP devices
         if device.startswith("ESP"):
-            if file_ext == ".hex":
-                # Check if converter is available
-                if not utils.find_hex_converter():
-                    return False
-            elif file_ext == ".dat":
+            if file_ext == ".dat":
                 # Check if FS builder is available
-                if not utils.find_fs_builder():
+                if not utils.get_fs_builder():
                     return False
             elif file_ext == ".bin":
                 # Check if it's a valid ESP binary (basic size check)
@@ -1283,7 +1235,7 @@ class JTechPixelUploader:
         return True
             
     def detect_ports(self):
-        ports = [port.device for port in serial.tools.list_ports.comports()]
+        ports = utils.list_serial_ports()
         if ports:
             self.selected_port.set(ports[0])
             self.log_success(f"Detected {len(ports)} COM port(s): {', '.join(ports)}")
@@ -1360,6 +1312,7 @@ class JTechPixelUploader:
         self.is_uploading = True
         self.upload_button.config(state="disabled")
         self.upload_progress.set(0)
+        self.progress_detail = ""
         self.update_progress_label()
         self.status_label.config(text="Preparing upload...", foreground="blue")
         
@@ -1368,74 +1321,77 @@ class JTechPixelUploader:
         upload_thread.start()
         
     def upload_firmware(self):
+        started = time.time()
+        pipeline = None
+        outcome = upload_records.OUTCOME_ERROR
+        error = None
+        device = self.selected_device.get()
+        port = self.selected_port.get()
+        baud = self.selected_baud.get() # Use selected_baud
+        firmware = self.firmware_path.get()
+        mode = self.firmware_mode_var.get()
+        finished = None
         try:
-            device = self.selected_device.get()
-            port = self.selected_port.get()
-            baud = self.selected_baud.get() # Use selected_baud
-            firmware = self.firmware_path.get()
-            mode = self.firmware_mode_var.get()
-            
             self.log_progress(f"Starting upload for {device} on {port} at {baud} baud")
             self.log_message(f"File: {os.path.basename(firmware)}")
             self.log_message(f"Mode: {mode}")
             
             # Process file if needed
-            processed_file = self.process_file_for_upload(firmware, mode)
+            pipeline = self.create_upload_pipeline()
+            processed_file = pipeline.process_file(firmware)
             if not processed_file:
+                outcome = upload_records.OUTCOME_PROCESSING_FAILED
                 self.status_label.config(text="File processing failed", foreground="red")
                 return
             
-            # Get flash command
-            command, args = self.get_flash_command(device, port, baud, processed_file, mode)
-            
-            if command:
-                self.log_progress(f"Executing: {command} {' '.join(args)}")
-                
-                # Run the upload command
-                success = self.execute_flash_command(command, args, device, port, baud)
-                
-                if success:
-                    # Verify if requested
-                    if self.verify_after_upload.get():
-                        self.log_progress("Starting verification...")
-                        verify_success = self.verify_flash(device, port, baud, processed_file, mode)
-                        
-                        if verify_success:
-                            self.status_label.config(text="Upload and verification completed successfully! ✅", foreground=self.colors['success'])
-                            self.log_success("Upload and verification completed successfully!")
-                            messagebox.showinfo("Success", 
-                                "Firmware uploaded and verified successfully!\n\n"
-                                "Device should now be running the new firmware.\n\n"
-                                "If the LED pattern isn't working, check:\n"
-                                "• Hardware wiring (GPIO pin connections)\n"
-                                "• Power supply stability\n"
-                                "• Reset the board after upload")
-                        else:
-                            self.status_label.config(text="Upload completed but verification failed ⚠", foreground=self.colors['warning'])
-                            self.log_warning("Upload completed but verification failed. Device may not be running firmware.")
-                            messagebox.showwarning("Upload Complete", 
-                                "Firmware uploaded successfully!\n\n"
-                                "However, verification failed.\n"
-                                "The device may not be running the new firmware.\n\n"
-                                "Troubleshooting:\n"
-                                "• Check if device is in flash mode (GPIO0)\n"
-                                "• Verify power supply\n"
-                                "• Try resetting the board\n"
-                                "• Consider erasing flash and re-uploading")
+            success, verify_success = pipeline.flash(port, processed_file)
+            # The record's duration stops here, not when the result dialog is closed
+            finished = time.time()
+            if config.METRICS_CONFIG["log_summary"]:
+                pipeline.log_phase_summary()
+            if not success:
+                outcome = upload_records.OUTCOME_FAILED
+            elif verify_success is False:
+                outcome = upload_records.OUTCOME_VERIFY_FAILED
+            else:
+                outcome = upload_records.OUTCOME_SUCCESS
+            
+            if success:
+                if verify_success is not None:
+                    if verify_success:
+                        self.status_label.config(text="Upload and verification completed successfully! ✅", foreground=self.colors['success'])
+                        self.log_success("Upload and verification completed successfully!")
+                        messagebox.showinfo("Success", 
+                            "Firmware uploaded and verified successfully!\n\n"
+                            "Device should now be running the new firmware.\n\n"
+                            "If the LED pattern isn't working, check:\n"
+                            "• Hardware wiring (GPIO pin connections)\n"
+                            "• Power supply stability\n"
+                            "• Reset the board after upload")
                     else:
-                        self.status_label.config(text="Upload completed successfully!", foreground=self.colors['success'])
-                        self.log_success("Upload completed successfully!")
-                        messagebox.showinfo("Success", "Firmware uploaded successfully!")
+                        self.status_label.config(text="Upload completed but verification failed ⚠", foreground=self.colors['warning'])
+                        self.log_warning("Upload completed but verification failed. Device may not be running firmware.")
+                        messagebox.showwarning("Upload Complete", 
+                            "Firmware uploaded successfully!\n\n"
+                            "However, verification failed.\n"
+                            "The device may not be running the new firmware.\n\n"
+                            "Troubleshooting:\n"
+                            "• Check if device is in flash mode (GPIO0)\n"
+                            "• Verify power supply\n"
+                            "• Try resetting the board\n"
+                            "• Consider erasing flash and re-uploading")
                 else:
-                    self.status_label.config(text="Upload failed", foreground=self.colors['error'])
-                    self.log_error("Upload failed!")
-                    messagebox.showerror("Error", "Upload failed. Check the log for details.")
-                    
+                    self.status_label.config(text="Upload completed successfully!", foreground=self.colors['success'])
+                    self.log_success("Upload completed successfully!")
+                    messagebox.showinfo("Success", "Firmware uploaded successfully!")
             else:
-                self.log_error(f"Device type '{device}' not supported or no flash command found.")
-                messagebox.showerror("Error", f"Device type '{device}' not supported or no flash command found.")
+                self.status_label.config(text="Upload failed", foreground=self.colors['error'])
+                self.log_error("Upload failed!")
+                messagebox.showerror("Error", "Upload failed. Check the log for details.")
                 
         except Exception as e:
+            finished = finished or time.time()
+            error = str(e)
             self.log_error(f"Error during upload: {str(e)}")
             self.status_label.config(text="Upload error", foreground=self.colors['error'])
             messagebox.showerror("Error", f"Upload error: {str(e)}")
@@ -1443,247 +1399,81 @@ class JTechPixelUploader:
         finally:
             self.is_uploading = False
             self.upload_button.config(state="normal")
-            
-    def process_file_for_upload(self, file_path: str, mode: str) -> str:
-        """Process file for upload (convert HEX to BIN, create FS image, etc.)"""
-        try:
-            file_info = self.file_type_info
-            file_ext = os.path.splitext(file_path)[1].lower()
-            
-            if file_ext == ".hex" and mode == "firmware":
-                # Convert HEX to BIN
-                self.log_progress("Converting HEX to BIN...")
-                success, output_path, error_msg = utils.convert_hex_to_bin(file_path)
-                
-                if success:
-                    self.log_success(f"Converted to: {os.path.basename(output_path)}")
-                    self.processed_file_path = output_path
-                    return output_path
-                else:
-                    self.log_error(f"HEX conversion failed: {error_msg}")
-                    return None
-                    
-            elif file_ext == ".dat" and mode == "filesystem":
-                # Create file system image
-                self.log_progress("Creating file system image...")
-                
-                # Determine FS size based on device
-                device = self.selected_device.get()
-                fs_size_mb = 1  # Default for most ESP8266 boards
-                if device == "ESP32":
-                    fs_size_mb = 2  # ESP32 typically has more flash
-                
-                success, output_path, error_msg = utils.create_fs_image(file_path, fs_size_mb)
-                
-                if success:
-                    self.log_success(f"Created FS image: {os.path.basename(output_path)}")
-                    self.processed_file_path = output_path
-                    return output_path
-                else:
-                    self.log_error(f"FS image creation failed: {error_msg}")
-                    return None
-                    
-            else:
-                # File is ready to use
-                return file_path
-                
-        except Exception as e:
-            self.log_error(f"File processing error: {str(e)}")
-            return None
-    
-    def get_flash_command(self, device: str, port: str, baud: str, file_path: str, mode: str):
-        """Get the appropriate flash command based on device and mode"""
-        if device not in self.device_configs:
-            return None, None
-            
-        config = self.device_configs[device]
-        command = config["command"]
-        
-        if mode == "filesystem":
-            # For filesystem mode, flash to appropriate offset
-            if device.startswith("ESP"):
-                # ESP8266: typically 0x300000, ESP32: typically 0x9000
-                fs_offset = "0x300000" if device == "ESP8266" else "0x9000"
-                args = ["-m", "esptool", "--chip", device.lower(), "--port", port, "--baud", baud,
-                       "--before", "default-reset", "--after", "hard-reset",
-                       "write-flash", "--flash-mode", "dio", "--flash-size", "detect",
-                       fs_offset, file_path]
-                return command, args
-        else:
-            # For firmware mode, use standard args
-            args = [arg.format(port=port, baud=baud, file=file_path) for arg in config["args"]]
-            return command, args
-    
-    def execute_flash_command(self, command: str, args: list, device: str, port: str, baud: str) -> bool:
-        """Execute the flash command and monitor progress"""
-        try:
-            # Run the upload command (hide terminal window on Windows)
-            startupinfo = None
-            if os.name == 'nt':  # Windows
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                startupinfo.wShowWindow = subprocess.SW_HIDE
-            
-            process = subprocess.Popen([command] + args, 
-                                     stdout=subprocess.PIPE, 
-                                     stderr=subprocess.STDOUT,
-                                     universal_newlines=True,
-                                     bufsize=1,
-                                     startupinfo=startupinfo)
-            
-            # Monitor output with live progress updates
-            while True:
-                output = process.stdout.readline()
-                if output == '' and process.poll() is not None:
-                    break
-                if output:
-                    output = output.strip()
-                    self.log_message(output)
-                    
-                    # Live progress updates from esptool output
-                    if "Writing at" in output and "%" in output:
-                        try:
-                            # Extract percentage from "Writing at 0x00000000 [==============] 100.0% 18/18 bytes..."
-                            percent_str = output.split("%")[0].split()[-1]
-                            percent = float(percent_str)
-                            self.upload_progress.set(percent)
-                            self.update_progress_label()
-                        except:
-                            pass
-                    elif "Compressed" in output:
-                        # Show compression progress
-                        self.upload_progress.set(25)
-                        self.update_progress_label()
-                    elif "Uploading stub flasher" in output:
-                        # Show stub upload progress
-                        self.upload_progress.set(10)
-                        self.update_progress_label()
-                    elif "Running stub flasher" in output:
-                        # Show stub running progress
-                        self.upload_progress.set(35)
-                        self.update_progress_label()
-                    elif "Configuring flash size" in output:
-                        # Show flash configuration progress
-                        self.upload_progress.set(50)
-                        self.update_progress_label()
-                    elif "Writing" in output and "bytes" in output:
-                        # Show writing progress
-                        self.upload_progress.set(75)
-                        self.update_progress_label()
-            
-            return_code = process.poll()
-            return return_code == 0
-            
-        except Exception as e:
-            self.log_error(f"Flash command execution error: {str(e)}")
-            return False
-    
-    def verify_flash(self, device: str, port: str, baud: str, file_path: str, mode: str) -> bool:
-        """Verify the flash operation"""
+            record = upload_records.make_upload_record(
+                device, port, firmware, outcome, started, finished,
+                stats=pipeline.stats() if pipeline else None,
+                baud=baud, mode=mode, error=error)
+            self.record_upload(record, pipeline.timer.totals() if pipeline else {})
+            if pipeline:
+                pipeline.cleanup()
+
+    def record_upload(self, record: dict, phases: dict):
+        """Append the upload's structured record to UploadLogs and pass its phase timings to the exporters"""
         try:
-            if mode == "filesystem":
-                # For filesystem, verify the FS image
-                if device.startswith("ESP"):
-                    fs_offset = "0x300000" if device == "ESP8266" else "0x9000"
-                    args = ["-m", "esptool", "--chip", device.lower(), "--port", port, "--baud", baud,
-                           "verify_flash", fs_offset, file_path]
-                    command = "python"
-                else:
-                    return False
-            else:
-                # For firmware, verify the firmware
-                if device.startswith("ESP"):
-                    args = ["-m", "esptool", "--chip", device.lower(), "--port", port, "--baud", baud,
-                           "verify_flash", "0x00000", file_path]
-                    command = "python"
-                else:
-                    # For non-ESP devices, verification depends on the tool
-                    return True  # Skip verification for now
-            
-            # Run verification
-            startupinfo = None
-            if os.name == 'nt':  # Windows
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                startupinfo.wShowWindow = subprocess.SW_HIDE
-            
-            process = subprocess.Popen([command] + args,
-                                     stdout=subprocess.PIPE,
-                                     stderr=subprocess.STDOUT,
-                                     universal_newlines=True,
-                                     startupinfo=startupinfo)
-            
-            output, _ = process.communicate(timeout=60)
-            return_code = process.returncode
-            
-            if return_code == 0:
-                self.log_success("Verification successful!")
-                return True
-            else:
-                self.log_error(f"Verification failed: {output.strip()}")
-                return False
-                
-        except Exception as e:
-            self.log_error(f"Verification error: {str(e)}")
-            return False
+            self.upload_records.append(record)
+        except OSError as e:
+            self.log_warning(f"Could not write upload record: {e}")
+        for exporter in self.metrics_exporters:
+            try:
+                exporter.export(record, phases)
+            except OSError as e:
+                self.log_warning(f"Could not export upload metrics ({type(exporter).__name__}): {e}")
+            
+    def create_upload_pipeline(self) -> upload_pipeline.UploadPipeline:
+        """Upload pipeline for the current device, mode and option settings"""
+        return upload_pipeline.UploadPipeline(
+            self.selected_device.get(), self.selected_baud.get(), self.firmware_mode_var.get(),
+            verify=self.verify_after_upload.get(),
+            erase=self.erase_before_upload.get(),
+            delta=self.delta_flash.get(),
+            flash_cache=self.flash_cache if self.skip_identical.get() else None,
+            artifact_cache=self.artifact_cache,
+            log_callback=self.log_message,
+            progress_callback=self.on_upload_progress,
+            progress_event_callback=self.on_upload_progress_event)
+
+    def on_upload_progress(self, percent: float):
+        """Show pipeline progress on the progress bar"""
+        self.upload_progress.set(percent)
+        self.update_progress_label()
+
+    def on_upload_progress_event(self, event: dict):
+        """Show the current phase, throughput and ETA next to the percentage"""
+        self.progress_detail = progress_parser.describe_event(event)
+        if event["overall"] is None:
+            self.update_progress_label()
+
+    def open_gang_upload(self):
+        """Open the gang programming dialog for flashing several ports at once"""
+        if self.is_uploading:
+            return
+
+        firmware = self.firmware_path.get()
+        if not firmware or not os.path.exists(firmware):
+            messagebox.showerror("Error", "Please select a firmware/data file")
+            return
+        if not self.validate_firmware_file(firmware):
+            messagebox.showerror("Error", "Selected file is not compatible with the chosen device")
+            return
+
+        GangUploadDialog(self)
+        self.log_success("🧩 Gang Upload opened")
 
     def log_message(self, message, level="info"):
-        """Enhanced log message with color coding and better formatting"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        
-        # Define message levels and colors
-        level_colors = {
-            "info": self.colors['text_primary'],
-            "success": self.colors['success'],
-            "warning": self.colors['warning'],
-            "error": self.colors['error'],
-            "progress": self.colors['accent'],
-            "system": self.colors['text_secondary']
-        }
-        
-        # Get color for message level
-        color = level_colors.get(level, self.colors['text_primary'])
-        
-        # Format the log entry
-        if level == "progress":
-            log_entry = f"[{timestamp}] 🔄 {message}\n"
-        elif level == "success":
-            log_entry = f"[{timestamp}] ✅ {message}\n"
-        elif level == "warning":
-            log_entry = f"[{timestamp}] ⚠ {message}\n"
-        elif level == "error":
-            log_entry = f"[{timestamp}] ❌ {message}\n"
-        elif level == "system":
-            log_entry = f"[{timestamp}] 🔧 {message}\n"
-        else:
-            log_entry = f"[{timestamp}] ℹ {message}\n"
-        
-        # Update log in main thread with color
-        self.root.after(0, self._update_log, log_entry, color)
+        """Queue a log line; the UI thread renders queued lines in batches"""
+        self.log_sink.put(level, message)
     
-    def _update_log(self, message, color=None):
-        """Update log with color coding"""
-        # Insert message with timestamp in muted color
-        self.log_text.insert(tk.END, message)
-        
-        # Apply color to the message content (excluding timestamp)
-        if color:
-            # Find the start of the message content (after timestamp)
-            start_pos = message.find("]") + 2
-            if start_pos > 1:
-                # Apply color to the message part
-                end_pos = f"{self.log_text.index(tk.END)}-1c"
-                self.log_text.tag_add(f"color_{color}", f"{self.log_text.index(tk.END)}-{len(message)}c+{start_pos}c", end_pos)
-                self.log_text.tag_config(f"color_{color}", foreground=color)
-        
-        # Auto-scroll to bottom
-        self.log_text.see(tk.END)
-        
-        # Limit log size to prevent memory issues (keep last 1000 lines)
-        lines = int(self.log_text.index(tk.END).split('.')[0])
-        if lines > 1000:
-            self.log_text.delete("1.0", f"{lines-1000}.0")
-            self.log_text.insert(tk.END, f"[{datetime.now().strftime('%H:%M:%S')}] 🔧 Log truncated to last 1000 lines\n")
+    def drain_log(self):
+        """Move every queued log line to the log store in one batch, then reschedule"""
+        try:
+            records, dropped = self.log_sink.drain()
+            if dropped:
+                records.insert(0, (time.time(), "warning", f"{dropped} log line(s) dropped while the UI was busy"))
+            if records:
+                first_line = self.log_store.append(records)
+                self.log_view.on_append(first_line, records)
+        finally:
+            self.root.after(config.LOG_CONFIG["flush_interval_ms"], self.drain_log)
     
     def log_success(self, message):
         """Log a success message"""
@@ -1714,7 +1504,8 @@ class JTechPixelUploader:
         self.log_message(message, "system")
 
     def clear_log(self):
-        self.log_text.delete(1.0, tk.END)
+        self.log_store.clear()
+        self.log_view.reset()
         self.log_system("Log cleared")
         
         # Add welcome message after clearing
@@ -1722,13 +1513,12 @@ class JTechPixelUploader:
         self.log_message("💡 Select a firmware file and configure your device to begin")
         
     def save_log(self):
-        """Save the current log to a file."""
+        """Save the whole session log to a file."""
         filename = filedialog.asksaveasfilename(defaultextension=".txt",
                                                filetypes=[("Text files", "*.txt"), ("All files", "*.*")])
         if filename:
             try:
-                with open(filename, 'w') as f:
-                    f.write(self.log_text.get(1.0, tk.END))
+                self.log_store.export(filename)
                 self.log_message(f"Log saved to {filename}")
             except Exception as e:
                 self.log_message(f"Error saving log: {e}")
@@ -1764,6 +1554,11 @@ Built with Python and Tkinter
         try:
             self.log_message("🔍 Verifying ESP device response...")
             
+            if esp_flasher.is_available():
+                info = upload_pipeline.read_esp_chip_info(self.selected_device.get(), port, baud)
+                self.log_message(f"✅ ESP device verification successful - {info['description']} ({info['mac']}) is responding")
+                return True
+            
             # Try to read chip info to verify device is responding
             command = "python"
             args = ["-m", "esptool", "--port", port, "--baud", baud, "chip_id"]
@@ -1792,6 +1587,10 @@ Built with Python and Tkinter
                 self.log_message(f"Verification output: {output.strip()}")
                 return False
                 
+        except esp_flasher.ESPFlashError as e:
+            self.log_message("⚠ ESP device verification failed - device may not be responding")
+            self.log_message(f"Verification output: {str(e)}")
+            return False
         except subprocess.TimeoutExpired:
             self.log_message("⚠ ESP verification timed out - device may be busy or not responding")
             return False
@@ -1834,7 +1633,7 @@ This device supports multiple firmware formats:
 • .bin - Binary files (most common)
 • .hex - Intel HEX files (Arduino standard)
 • .dat - Data files (if applicable)
-• .elf - ELF files (debugging)
+• .elf - ELF files (ESP8266, flashed without conversion)
 
 Select the appropriate format for your firmware source."""
             
@@ -1884,6 +1683,12 @@ Select the appropriate format for your firmware source."""
     def _test_esp_connection(self, port, baud):
         """Test ESP device connection using esptool"""
         try:
+            if esp_flasher.is_available():
+                info = upload_pipeline.read_esp_chip_info(self.selected_device.get(), port, baud)
+                self.log_message("✅ ESP device detected and responding!")
+                self.log_message(f"Device info: {info['description']}, MAC: {info['mac']}, Flash: {info['flash_size']}")
+                return True
+            
             command = "python"
             args = ["-m", "esptool", "--port", port, "--baud", baud, "chip_id"]
             
@@ -1912,6 +1717,10 @@ Select the appropriate format for your firmware source."""
                 self.log_message(f"Output: {output.strip()}")
                 return False
 
+        except esp_flasher.ESPFlashError as e:
+            self.log_message(f"❌ ESP device not responding or error occurred.")
+            self.log_message(f"Output: {str(e)}")
+            return False
         except subprocess.TimeoutExpired:
             self.log_message("⚠ ESP connection test timed out.")
             return False
@@ -2064,6 +1873,15 @@ Select the appropriate format for your firmware source."""
     def _get_chip_info_thread(self, device, port, baud):
         """Get chip info in a separate thread"""
         try:
+            if upload_pipeline.use_inprocess_esptool(device):
+                info = upload_pipeline.read_esp_chip_info(device, port, baud)
+                info_text = "\n".join(f"{key.replace('_', ' ').title()}: {value}" for key, value in info.items())
+                self.log_message(f"✅ Chip info for {device} on {port} at {baud} baud:")
+                for line in info_text.splitlines():
+                    self.log_message(f"  {line}")
+                messagebox.showinfo("Chip Info", f"Chip info for {device} on {port} at {baud}:\n\n{info_text}")
+                return
+            
             config = self.device_configs[device]
             command = config["command"]
             args = [arg.format(port=port, baud=baud) for arg in config["args"]]
@@ -2093,6 +1911,9 @@ Select the appropriate format for your firmware source."""
                 self.log_message(f"  {output.strip()}")
                 messagebox.showerror("Chip Info Error", f"Error getting chip info for {device} on {port} at {baud}:\n\n{output.strip()}")
 
+        except esp_flasher.ESPFlashError as e:
+            self.log_message(f"❌ Chip info error for {device} on {port} at {baud}: {str(e)}")
+            self.root.after(0, self._update_chip_info_error, f"Chip info error for {device} on {port} at {baud}: {str(e)}")
         except subprocess.TimeoutExpired:
             self.log_message(f"⚠ Chip info timed out for {device} on {port} at {baud} baud.")
             self.root.after(0, self._update_chip_info_error, f"Chip info timed out for {device} on {port} at {baud} baud.")
@@ -2172,9 +1993,12 @@ Select the appropriate format for your firmware source."""
             messagebox.showerror("Error", f"Could not get file info: {str(e)}")
     
     def copy_log(self):
-        """Copy the current log content to clipboard"""
+        """Copy the most recent lines of the current (filtered) log view to clipboard"""
         try:
-            log_content = self.log_text.get("1.0", tk.END)
+            lines = self.log_view.view_lines(limit=config.LOG_CONFIG["max_log_lines"])
+            timestamp_format = config.LOG_CONFIG["timestamp_format"]
+            log_content = "".join("".join(log_sink.format_record(record, timestamp_format))
+                                  for _, record in self.log_store.read_lines(lines))
             self.root.clipboard_clear()
             self.root.clipboard_append(log_content)
             self.log_success("Log content copied to clipboard")
@@ -2184,7 +2008,8 @@ Select the appropriate format for your firmware source."""
     def update_progress_label(self):
         """Update the progress percentage label"""
         progress = self.upload_progress.get()
-        self.progress_label.config(text=f"{int(progress)}%")
+        detail = f"  ({self.progress_detail})" if self.progress_detail and 0 < progress < 100 else ""
+        self.progress_label.config(text=f"{int(progress)}%{detail}")
         
         # Update status based on progress
         if progress == 0:
@@ -2292,24 +2117,44 @@ Select the appropriate format for your firmware source."""
                         self.upload_button.config(text="🚀 Upload")
     
     def on_window_resize(self, event):
-        """Handle window resize events for responsive UI behavior"""
-        # Only handle main window resize events
-        if event.widget == self.root:
-            new_width = event.width
-            new_height = event.height
-            
-            # Calculate responsive adjustments
-            width_ratio = new_width / self.initial_width
-            height_ratio = new_height / self.initial_height
-            
-            # Adjust font sizes based on window size
-            self.adjust_font_sizes(width_ratio, height_ratio)
-            
-            # Adjust padding and spacing
-            self.adjust_spacing(width_ratio)
-            
-            # Update scrollable canvas width for left column
-            self.update_left_column_width(new_width)
+        """Coalesce root window <Configure> events into one layout update after the drag settles"""
+        # Only handle main window resize events (child widgets and plain moves also fire <Configure>)
+        if event.widget != self.root or (event.width, event.height) == self._window_size:
+            return
+        self._window_size = (event.width, event.height)
+        if self._resize_job:
+            self.root.after_cancel(self._resize_job)
+        self._resize_job = self.root.after(config.RESIZE_CONFIG["debounce_ms"], self.apply_window_size)
+
+    def apply_window_size(self):
+        """Recompute the responsive layout once for the settled window size"""
+        self._resize_job = None
+        new_width, new_height = self._window_size
+
+        # Calculate responsive adjustments
+        width_ratio = new_width / self.initial_width
+        height_ratio = new_height / self.initial_height
+
+        # Styles and padding are only touched when their size bucket changes
+        self.adjust_font_sizes(width_ratio, height_ratio)
+        self.adjust_spacing(width_ratio)
+
+        # Update scrollable canvas width for left column
+        self.update_left_column_width(new_width)
+
+    def configure_style_font(self, style_name, font):
+        """Set a ttk style's font unless it already has it (each change re-lays out every user)"""
+        if self._style_fonts.get(style_name) != font:
+            self.style.configure(style_name, font=font)
+            self._style_fonts[style_name] = font
+
+    def set_main_padding(self, padding):
+        """Set the main frame padding unless it is already applied"""
+        if self._main_padding != padding:
+            self.main_frame.configure(padding=padding)
+            self._main_padding = padding
+            return True
+        return False
     
     def adjust_font_sizes(self, width_ratio, height_ratio):
         """Dynamically adjust font sizes based on window dimensions"""
@@ -2321,12 +2166,12 @@ Select the appropriate format for your firmware source."""
             button_size = max(9, min(14, int(11 * width_ratio)))
             
             # Update title font
-            self.style.configure('Title.TLabel', font=('Segoe UI', title_size, 'bold'))
-            self.style.configure('Subtitle.TLabel', font=('Segoe UI', subtitle_size))
-            self.style.configure('Section.TLabel', font=('Segoe UI', section_size, 'bold'))
-            self.style.configure('Primary.TButton', font=('Segoe UI', button_size, 'bold'))
-            self.style.configure('Secondary.TButton', font=('Segoe UI', button_size))
-            self.style.configure('Info.TButton', font=('Segoe UI', button_size))
+            self.configure_style_font('Title.TLabel', ('Segoe UI', title_size, 'bold'))
+            self.configure_style_font('Subtitle.TLabel', ('Segoe UI', subtitle_size))
+            self.configure_style_font('Section.TLabel', ('Segoe UI', section_size, 'bold'))
+            self.configure_style_font('Primary.TButton', ('Segoe UI', button_size, 'bold'))
+            self.configure_style_font('Secondary.TButton', ('Segoe UI', button_size))
+            self.configure_style_font('Info.TButton', ('Segoe UI', button_size))
             
         except Exception as e:
             # Silently handle any font adjustment errors
@@ -2337,16 +2182,9 @@ Select the appropriate format for your firmware source."""
         try:
             # Calculate responsive padding
             main_padding = max(10, min(30, int(20 * width_ratio)))
-            card_padding = max(10, min(20, int(15 * width_ratio)))
             
             # Update main frame padding
-            self.main_frame.configure(padding=main_padding)
-            
-            # Update card padding (this would need to be implemented differently)
-            # For now, we'll just log the adjustment
-            if hasattr(self, 'last_padding_log') and self.last_padding_log != main_padding:
-                self.log_system(f"UI spacing adjusted for window size: {main_padding}px")
-                self.last_padding_log = main_padding
+            self.set_main_padding(main_padding)
                 
         except Exception as e:
             # Silently handle spacing adjustment errors
@@ -2441,50 +2279,36 @@ Select the appropriate format for your firmware source."""
             # Silently handle optimization errors
             pass
     
-    def apply_compact_layout(self):
-        """Apply compact layout for small screens"""
+    def layout_preset_active(self, preset):
+        """Whether the padding and fonts last applied (by a preset or by resizing) are the preset's"""
+        return (self._main_padding == preset["padding"]
+                and all(self._style_fonts.get(style_name) == font
+                        for style_name, font in preset["fonts"].items()))
+
+    def apply_layout_preset(self, name):
+        """Apply one of config.LAYOUT_PRESETS; re-applying the preset that is still showing does nothing"""
         try:
-            # Reduce padding and spacing
-            self.main_frame.configure(padding=10)
-            
-            # Adjust font sizes for better fit
-            self.style.configure('Title.TLabel', font=('Segoe UI', 16, 'bold'))
-            self.style.configure('Subtitle.TLabel', font=('Segoe UI', 10))
-            
-            self.log_system("Compact layout applied for small screen")
-            
+            preset = config.LAYOUT_PRESETS[name]
+            if self.layout_preset_active(preset):
+                return
+            self.set_main_padding(preset["padding"])
+            for style_name, font in preset["fonts"].items():
+                self.configure_style_font(style_name, font)
+            self.log_system(preset["message"])
         except Exception as e:
             pass
+
+    def apply_compact_layout(self):
+        """Apply compact layout for small screens"""
+        self.apply_layout_preset("compact")
     
     def apply_expanded_layout(self):
         """Apply expanded layout for large screens"""
-        try:
-            # Increase padding and spacing
-            self.main_frame.configure(padding=30)
-            
-            # Adjust font sizes for better readability
-            self.style.configure('Title.TLabel', font=('Segoe UI', 20, 'bold'))
-            self.style.configure('Subtitle.TLabel', font=('Segoe UI', 14))
-            
-            self.log_system("Expanded layout applied for large screen")
-            
-        except Exception as e:
-            pass
+        self.apply_layout_preset("expanded")
     
     def apply_standard_layout(self):
         """Apply standard layout for medium screens"""
-        try:
-            # Standard padding and spacing
-            self.main_frame.configure(padding=20)
-            
-            # Standard font sizes
-            self.style.configure('Title.TLabel', font=('Segoe UI', 18, 'bold'))
-            self.style.configure('Subtitle.TLabel', font=('Segoe UI', 12))
-            
-            self.log_system("Standard layout applied")
-            
-        except Exception as e:
-            pass
+        self.apply_layout_preset("standard")
     
     def open_pattern_editor(self):
         """Open the visual pattern editor dialog"""
@@ -2500,7 +2324,8 @@ Select the appropriate format for your firmware source."""
                 else:
                     matrix_size = (8, 8)  # ESP8266 works well with 8x8
             
-            # Open pattern editor
+            # Open pattern editor (imported on first use)
+            from pattern_editor import PatternEditorDialog
             editor = PatternEditorDialog(self.root, matrix_size)
             self.log_success("🎨 Pattern Editor opened")
             self.log_message("💡 Create custom LED patterns and export as .dat files")
@@ -2510,299 +2335,234 @@ Select the appropriate format for your firmware source."""
             messagebox.showerror("Error", f"Failed to open Pattern Editor:\n{str(e)}")
 
 
-class PatternEditorDialog:
-    """Visual pattern editor for creating and editing LED patterns"""
-    
-    def __init__(self, parent, matrix_size=(8, 8)):
-        self.parent = parent
-        self.matrix_size = matrix_size
-        self.leds = matrix_size[0] * matrix_size[1]
-        self.pattern_data = [[0, 0, 0] for _ in range(self.leds)]  # RGB values
-        
-        # Create dialog window
-        self.dialog = tk.Toplevel(parent)
-        self.dialog.title(f"🎨 LED Pattern Editor - {matrix_size[0]}x{matrix_size[1]}")
-        self.dialog.geometry("800x600")
-        self.dialog.resizable(True, True)
-        
-        # Make dialog modal
-        self.dialog.transient(parent)
-        self.dialog.grab_set()
-        
+class GangUploadDialog:
+    """Flash the selected file to several ports at once with a per-port status grid"""
+
+    STATUS_COLORS = {
+        gang_flasher.STATE_QUEUED: "gray",
+        gang_flasher.STATE_RUNNING: "blue",
+        gang_flasher.STATE_RETRYING: "orange",
+        gang_flasher.STATE_SUCCESS: "green",
+        gang_flasher.STATE_FAILED: "red",
+        gang_flasher.STATE_CANCELLED: "gray"
+    }
+
+    RECORD_OUTCOMES = {
+        gang_flasher.STATE_SUCCESS: upload_records.OUTCOME_SUCCESS,
+        gang_flasher.STATE_FAILED: upload_records.OUTCOME_FAILED,
+        gang_flasher.STATE_CANCELLED: upload_records.OUTCOME_CANCELLED
+    }
+
+    def __init__(self, app):
+        self.app = app
+        self.programmer = None
+        self.pipeline = None
+        self.job = None
+        self.rows = {}
+
+        self.dialog = tk.Toplevel(app.root)
+        self.dialog.title("🧩 Gang Upload")
+        self.dialog.geometry("560x480")
+        self.dialog.transient(app.root)
+        self.dialog.protocol("WM_DELETE_WINDOW", self.close)
+
         self.setup_ui()
-        self.create_canvas()
-        
+        self.refresh_ports()
+
     def setup_ui(self):
         """Setup the user interface"""
-        # Main frame
         main_frame = ttk.Frame(self.dialog)
         main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        # Control panel
-        control_frame = ttk.LabelFrame(main_frame, text="Controls", padding=10)
+
+        # Job settings
+        control_frame = ttk.LabelFrame(main_frame, text="Job", padding=10)
         control_frame.pack(fill=tk.X, pady=(0, 10))
-        
-        # Matrix size selector
-        size_frame = ttk.Frame(control_frame)
-        size_frame.pack(fill=tk.X, pady=(0, 10))
-        
-        ttk.Label(size_frame, text="Matrix Size:").pack(side=tk.LEFT)
-        self.size_var = tk.StringVar(value=f"{self.matrix_size[0]}x{self.matrix_size[1]}")
-        size_combo = ttk.Combobox(size_frame, textvariable=self.size_var, 
-                                 values=["8x8", "16x16", "32x32"], state="readonly")
-        size_combo.pack(side=tk.LEFT, padx=(10, 0))
-        size_combo.bind("<<ComboboxSelected>>", self.on_size_change)
-        
-        # Color picker
-        color_frame = ttk.Frame(control_frame)
-        color_frame.pack(fill=tk.X, pady=(0, 10))
-        
-        ttk.Label(color_frame, text="Current Color:").pack(side=tk.LEFT)
-        self.color_var = tk.StringVar(value="#FF0000")
-        color_entry = ttk.Entry(color_frame, textvariable=self.color_var, width=10)
-        color_entry.pack(side=tk.LEFT, padx=(10, 0))
-        
-        self.color_button = tk.Button(color_frame, bg="#FF0000", width=3, height=1,
-                                    command=self.pick_color)
-        self.color_button.pack(side=tk.LEFT, padx=(10, 0))
-        
-        # Tool buttons
+
+        ttk.Label(control_frame, text=f"{self.app.selected_device.get()} @ {self.app.selected_baud.get()} baud - "
+                                      f"{os.path.basename(self.app.firmware_path.get())}").pack(anchor=tk.W)
+
+        settings_frame = ttk.Frame(control_frame)
+        settings_frame.pack(fill=tk.X, pady=(10, 0))
+
+        ttk.Label(settings_frame, text="Workers:").pack(side=tk.LEFT)
+        self.workers_var = tk.IntVar(value=gang_flasher.DEFAULT_MAX_WORKERS)
+        ttk.Spinbox(settings_frame, from_=1, to=32, textvariable=self.workers_var, width=4).pack(side=tk.LEFT, padx=(5, 15))
+        ttk.Label(settings_frame, text="Retries:").pack(side=tk.LEFT)
+        self.retries_var = tk.IntVar(value=gang_flasher.DEFAULT_RETRIES)
+        ttk.Spinbox(settings_frame, from_=0, to=5, textvariable=self.retries_var, width=4).pack(side=tk.LEFT, padx=(5, 15))
+
+        ttk.Button(settings_frame, text="🔄 Refresh Ports", command=self.refresh_ports).pack(side=tk.LEFT)
+
         button_frame = ttk.Frame(control_frame)
-        button_frame.pack(fill=tk.X)
-        
-        ttk.Button(button_frame, text="🎨 Pick Color", command=self.pick_color).pack(side=tk.LEFT, padx=(0, 10))
-        ttk.Button(button_frame, text="🗑️ Clear All", command=self.clear_pattern).pack(side=tk.LEFT, padx=(0, 10))
-        ttk.Button(button_frame, text="🔄 Random", command=self.random_pattern).pack(side=tk.LEFT, padx=(0, 10))
-        ttk.Button(button_frame, text="📁 Import Image", command=self.import_image).pack(side=tk.LEFT, padx=(0, 10))
-        
-        # Export buttons
-        export_frame = ttk.Frame(control_frame)
-        export_frame.pack(fill=tk.X, pady=(10, 0))
-        
-        ttk.Button(export_frame, text="💾 Save .dat", command=self.save_dat).pack(side=tk.LEFT, padx=(0, 10))
-        ttk.Button(export_frame, text="💾 Save .bin", command=self.save_bin).pack(side=tk.LEFT, padx=(0, 10))
-        ttk.Button(button_frame, text="❌ Close", command=self.dialog.destroy).pack(side=tk.RIGHT)
-        
-        # Canvas frame
-        canvas_frame = ttk.LabelFrame(main_frame, text="LED Matrix", padding=10)
-        canvas_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # Status bar
-        self.status_var = tk.StringVar(value=f"Ready - {self.leds} LEDs")
-        status_bar = ttk.Label(main_frame, textvariable=self.status_var, relief=tk.SUNKEN)
-        status_bar.pack(fill=tk.X, pady=(10, 0))
-        
-    def create_canvas(self):
-        """Create the LED matrix canvas"""
-        # Canvas frame
-        canvas_container = ttk.Frame(self.dialog.winfo_children()[0].winfo_children()[-2])
-        canvas_container.pack(fill=tk.BOTH, expand=True)
-        
-        # Create canvas
-        self.canvas = tk.Canvas(canvas_container, bg="black", highlightthickness=0)
-        self.canvas.pack(fill=tk.BOTH, expand=True)
-        
-        # Bind events
-        self.canvas.bind("<Button-1>", self.on_canvas_click)
-        self.canvas.bind("<B1-Motion>", self.on_canvas_drag)
-        
-        # Draw grid
-        self.draw_grid()
-        
-    def draw_grid(self):
-        """Draw the LED grid"""
-        self.canvas.delete("all")
-        
-        # Calculate cell size
-        canvas_width = self.canvas.winfo_width()
-        canvas_height = self.canvas.winfo_height()
-        
-        if canvas_width <= 1 or canvas_height <= 1:
-            # Canvas not yet sized, schedule redraw
-            self.dialog.after(100, self.draw_grid)
+        button_frame.pack(fill=tk.X, pady=(10, 0))
+
+        self.start_button = ttk.Button(button_frame, text="🚀 Start", command=self.start)
+        self.start_button.pack(side=tk.LEFT, padx=(0, 10))
+        self.cancel_button = ttk.Button(button_frame, text="⏹ Cancel", command=self.cancel, state="disabled")
+        self.cancel_button.pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(button_frame, text="❌ Close", command=self.close).pack(side=tk.RIGHT)
+
+        # Per-port status grid
+        self.grid_frame = ttk.LabelFrame(main_frame, text="Ports", padding=10)
+        self.grid_frame.pack(fill=tk.BOTH, expand=True)
+        self.grid_frame.columnconfigure(2, weight=1)
+
+        self.status_var = tk.StringVar(value="Select ports and press Start")
+        ttk.Label(main_frame, textvariable=self.status_var, relief=tk.SUNKEN).pack(fill=tk.X, pady=(10, 0))
+
+    def refresh_ports(self):
+        """Rebuild the status grid from the currently detected ports"""
+        if self.programmer and not self.programmer.is_finished():
             return
-        
-        cell_width = canvas_width / self.matrix_size[0]
-        cell_height = canvas_height / self.matrix_size[1]
-        
-        # Draw grid lines
-        for i in range(self.matrix_size[0] + 1):
-            x = i * cell_width
-            self.canvas.create_line(x, 0, x, canvas_height, fill="gray", width=1)
-            
-        for i in range(self.matrix_size[1] + 1):
-            y = i * cell_height
-            self.canvas.create_line(0, y, canvas_width, y, fill="gray", width=1)
-        
-        # Draw LEDs
-        for y in range(self.matrix_size[1]):
-            for x in range(self.matrix_size[0]):
-                led_index = y * self.matrix_size[0] + x
-                if led_index < len(self.pattern_data):
-                    r, g, b = self.pattern_data[led_index]
-                    color = f"#{r:02x}{g:02x}{b:02x}"
-                    
-                    x1 = x * cell_width + 2
-                    y1 = y * cell_height + 2
-                    x2 = (x + 1) * cell_width - 2
-                    y2 = (y + 1) * cell_height - 2
-                    
-                    self.canvas.create_oval(x1, y1, x2, y2, fill=color, outline="white", width=1)
-        
-        # Update status
-        self.status_var.set(f"Matrix: {self.matrix_size[0]}x{self.matrix_size[1]} - {self.leds} LEDs")
-        
-    def on_canvas_click(self, event):
-        """Handle canvas click events"""
-        self.update_led_at_position(event.x, event.y)
-        
-    def on_canvas_drag(self, event):
-        """Handle canvas drag events"""
-        self.update_led_at_position(event.x, event.y)
-        
-    def update_led_at_position(self, x, y):
-        """Update LED at given canvas position"""
-        canvas_width = self.canvas.winfo_width()
-        canvas_height = self.canvas.winfo_height()
-        
-        if canvas_width <= 1 or canvas_height <= 1:
+
+        for widget in self.grid_frame.winfo_children():
+            widget.destroy()
+        self.rows = {}
+
+        ports = utils.list_serial_ports()
+        if not ports:
+            ttk.Label(self.grid_frame, text="No COM ports detected").grid(row=0, column=0, sticky=tk.W)
             return
-        
-        cell_width = canvas_width / self.matrix_size[0]
-        cell_height = canvas_height / self.matrix_size[1]
-        
-        grid_x = int(x / cell_width)
-        grid_y = int(y / cell_height)
-        
-        if 0 <= grid_x < self.matrix_size[0] and 0 <= grid_y < self.matrix_size[1]:
-            led_index = grid_y * self.matrix_size[0] + grid_x
-            if led_index < len(self.pattern_data):
-                # Parse current color
-                color = self.color_var.get()
-                if color.startswith("#") and len(color) == 7:
-                    try:
-                        r = int(color[1:3], 16)
-                        g = int(color[3:5], 16)
-                        b = int(color[5:7], 16)
-                        self.pattern_data[led_index] = [r, g, b]
-                        self.draw_grid()
-                    except ValueError:
-                        pass
-                        
-    def pick_color(self):
-        """Open color picker dialog"""
-        try:
-            from tkinter import colorchooser
-            color = colorchooser.askcolor(title="Pick LED Color")[1]
-            if color:
-                self.color_var.set(color)
-                self.color_button.config(bg=color)
-        except ImportError:
-            # Fallback to simple color selection
-            colors = ["#FF0000", "#00FF00", "#0000FF", "#FFFF00", "#FF00FF", "#00FFFF", "#FFFFFF", "#000000"]
-            current = colors.index(self.color_var.get()) if self.color_var.get() in colors else 0
-            next_color = colors[(current + 1) % len(colors)]
-            self.color_var.set(next_color)
-            self.color_button.config(bg=next_color)
-            
-    def clear_pattern(self):
-        """Clear all LEDs to black"""
-        self.pattern_data = [[0, 0, 0] for _ in range(self.leds)]
-        self.draw_grid()
-        
-    def random_pattern(self):
-        """Generate random pattern"""
-        import random
-        self.pattern_data = [[random.randint(0, 255) for _ in range(3)] for _ in range(self.leds)]
-        self.draw_grid()
-        
-    def import_image(self):
-        """Import image and convert to LED pattern"""
-        try:
-            from tkinter import filedialog
-            filename = filedialog.askopenfilename(
-                title="Import Image",
-                filetypes=[("Image files", "*.png *.jpg *.jpeg *.bmp *.gif")]
-            )
-            if filename:
-                # Load and resize image
-                img = Image.open(filename)
-                img = img.resize(self.matrix_size, Image.Resampling.LANCZOS)
-                
-                # Convert to RGB pattern
-                for y in range(self.matrix_size[1]):
-                    for x in range(self.matrix_size[0]):
-                        led_index = y * self.matrix_size[0] + x
-                        if led_index < len(self.pattern_data):
-                            pixel = img.getpixel((x, y))
-                            if len(pixel) >= 3:
-                                self.pattern_data[led_index] = list(pixel[:3])
-                            else:
-                                self.pattern_data[led_index] = [pixel[0], pixel[0], pixel[0]]
-                
-                self.draw_grid()
-                self.status_var.set(f"Imported image: {os.path.basename(filename)}")
-        except Exception as e:
-            messagebox.showerror("Import Error", f"Failed to import image:\n{str(e)}")
-            
-    def save_dat(self):
-        """Save pattern as .dat file"""
-        try:
-            from tkinter import filedialog
-            filename = filedialog.asksaveasfilename(
-                title="Save LED Pattern",
-                defaultextension=".dat",
-                filetypes=[("DAT files", "*.dat"), ("All files", "*.*")]
-            )
-            if filename:
-                # Convert pattern to bytes
-                data = bytearray()
-                for led in self.pattern_data:
-                    data.extend(led)
-                
-                with open(filename, 'wb') as f:
-                    f.write(data)
-                
-                self.status_var.set(f"Saved: {os.path.basename(filename)}")
-                messagebox.showinfo("Success", f"Pattern saved as {filename}")
-        except Exception as e:
-            messagebox.showerror("Save Error", f"Failed to save pattern:\n{str(e)}")
-            
-    def save_bin(self):
-        """Save pattern as .bin file"""
+
+        for row, port in enumerate(ports):
+            selected = tk.BooleanVar(value=True)
+            ttk.Checkbutton(self.grid_frame, variable=selected).grid(row=row, column=0, sticky=tk.W)
+            ttk.Label(self.grid_frame, text=port, width=14).grid(row=row, column=1, sticky=tk.W)
+            progress = tk.DoubleVar(value=0)
+            ttk.Progressbar(self.grid_frame, variable=progress, maximum=100).grid(row=row, column=2,
+                                                                                   sticky=(tk.W, tk.E), padx=5, pady=2)
+            status = tk.Label(self.grid_frame, text="idle", width=16, anchor=tk.W, fg="gray")
+            status.grid(row=row, column=3, sticky=tk.W)
+            self.rows[port] = {"selected": selected, "progress": progress, "status": status}
+
+    def start(self):
+        """Process the file once and flash it to every selected port"""
+        ports = [port for port, row in self.rows.items() if row["selected"].get()]
+        if not ports:
+            messagebox.showerror("Error", "Please select at least one port", parent=self.dialog)
+            return
+        if self.app.is_uploading:
+            return
+
+        self.app.is_uploading = True
+        self.app.upload_button.config(state="disabled")
+        self.start_button.config(state="disabled")
+        self.cancel_button.config(state="normal")
+        self.status_var.set("Preparing image...")
+
+        thread = threading.Thread(target=self._start_job, args=(ports,))
+        thread.daemon = True
+        thread.start()
+
+    def _start_job(self, ports):
+        app = self.app
+        device = app.selected_device.get()
+        self.programmer = None
+        self.pipeline = None
+        self.job = {"device": device, "firmware": app.firmware_path.get(), "started": time.time(),
+                    "baud": app.selected_baud.get(), "mode": app.firmware_mode_var.get()}
         try:
-            from tkinter import filedialog
-            filename = filedialog.asksaveasfilename(
-                title="Save LED Pattern",
-                defaultextension=".bin",
-                filetypes=[("BIN files", "*.bin"), ("All files", "*.*")]
-            )
-            if filename:
-                # Convert pattern to bytes
-                data = bytearray()
-                for led in self.pattern_data:
-                    data.extend(led)
-                
-                with open(filename, 'wb') as f:
-                    f.write(data)
-                
-                self.status_var.set(f"Saved: {os.path.basename(filename)}")
-                messagebox.showinfo("Success", f"Pattern saved as {filename}")
+            # The image is processed once and shared by every port
+            pipeline = self.pipeline = app.create_upload_pipeline()
+            processed_file = pipeline.process_file(self.job["firmware"])
+            if not processed_file:
+                raise RuntimeError("File processing failed")
+            flash_function = pipeline.create_gang_flash_function(processed_file)
+
+            self.programmer = gang_flasher.GangProgrammer(
+                ports, flash_function,
+                max_workers=self.workers_var.get(),
+                retries=self.retries_var.get(),
+                log_callback=lambda port, message: app.log_message(f"[{port}] {message}"))
+            app.log_progress(f"Gang upload of {device} to {len(ports)} port(s): {', '.join(ports)}")
+            self.programmer.start()
+            self.dialog.after(0, self._poll)
         except Exception as e:
-            messagebox.showerror("Save Error", f"Failed to save pattern:\n{str(e)}")
-            
-    def on_size_change(self, event=None):
-        """Handle matrix size change"""
-        try:
-            size_str = self.size_var.get()
-            width, height = map(int, size_str.split('x'))
-            self.matrix_size = (width, height)
-            self.leds = width * height
-            self.pattern_data = [[0, 0, 0] for _ in range(self.leds)]
-            self.draw_grid()
-        except ValueError:
-            pass
- 
+            app.log_error(f"Gang upload error: {str(e)}")
+            self.dialog.after(0, self._finish)
+
+    def _poll(self):
+        """Refresh the grid from the programmer snapshot until all ports finish"""
+        if not self.programmer:
+            return
+        states = self.programmer.snapshot()
+        for port, state in states.items():
+            row = self.rows.get(port)
+            if not row:
+                continue
+            row["progress"].set(state["progress"])
+            text = state["status"]
+            if state["attempts"] > 1:
+                text += f" ({state['attempts']})"
+            row["status"].config(text=text, fg=self.STATUS_COLORS.get(state["status"], "black"))
+
+        done = sum(1 for state in states.values() if state["status"] in gang_flasher.FINISHED_STATES)
+        self.status_var.set(f"{done}/{len(states)} ports finished")
+
+        if self.programmer.is_finished():
+            self._finish()
+        else:
+            self.dialog.after(100, self._poll)
+
+    def _finish(self):
+        app = self.app
+        if self.programmer:
+            summary = self.programmer.summary()
+            parts = [f"{count} {status}" for status, count in summary.items()]
+            message = f"Gang upload finished: {', '.join(parts)}"
+            if summary.get(gang_flasher.STATE_SUCCESS, 0) == len(self.programmer.ports):
+                app.log_success(message)
+            else:
+                app.log_warning(message)
+            self.status_var.set(message)
+            self.record_ports()
+        else:
+            self.status_var.set("Gang upload failed")
+        if self.pipeline:
+            self.pipeline.cleanup()
+            self.pipeline = None
+
+        app.is_uploading = False
+        app.upload_button.config(state="normal")
+        self.start_button.config(state="normal")
+        self.cancel_button.config(state="disabled")
+
+    def record_ports(self):
+        """Write an upload record for every port, counting its attempts after the first as retries"""
+        job = self.job
+        for port, state in self.programmer.snapshot().items():
+            record = upload_records.make_upload_record(
+                job["device"], port, job["firmware"],
+                self.RECORD_OUTCOMES.get(state["status"], upload_records.OUTCOME_ERROR),
+                job["started"], job["started"] + state["elapsed"],
+                retries=max(0, state["attempts"] - 1),
+                baud=job["baud"], mode=job["mode"], gang=True, error=state["error"] or None)
+            self.app.record_upload(record, {})
+
+    def cancel(self):
+        """Stop scheduling new ports and retries; running flash tools are killed"""
+        if self.programmer:
+            self.programmer.cancel()
+            self.status_var.set("Cancelling - waiting for running ports to stop")
+
+    def close(self):
+        if self.programmer and not self.programmer.is_finished():
+            # Keep the dialog until running ports release their serial ports
+            self.cancel()
+            messagebox.showinfo("Gang Upload", "Waiting for running ports to finish before closing.",
+                                parent=self.dialog)
+            return
+        self.dialog.destroy()
+
+
+def __getattr__(name):
+    # main.PatternEditorDialog still works without importing the editor at startup
+    if name == "PatternEditorDialog":
+        from pattern_editor import PatternEditorDialog
+        return PatternEditorDialog
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def main():
     root = tk.Tk()
     app = JTechPixelUploader(root)
@@ -0,0 +1,214 @@
+# J Tech Pixel Uploader Media Import
+# Turns images, animated GIFs, image sequences and (when ffmpeg is on PATH)
+# video into LED animation frames. Frames are decoded one at a time,
+# decimated to the target frame rate, resampled to the matrix size with
+# whole-array box filtering, optionally dithered, and streamed straight
+# into an AnimationWriter - a long clip is never held in memory.
+
+import itertools
+import os
+import subprocess
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+import animation_dat
+import config
+import utils
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".webp", ".tif", ".tiff")
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".avi", ".mkv", ".webm", ".m4v")
+
+# 4x4 Bayer matrix for ordered dithering, as thresholds in [0, 1)
+BAYER_4X4 = (np.array([
+    [0, 8, 2, 10],
+    [12, 4, 14, 6],
+    [3, 11, 1, 9],
+    [15, 7, 13, 5]
+]) + 0.5) / 16
+
+Frame = np.ndarray   # (height, width, 3) uint8
+TimedFrames = Iterable[Tuple[Frame, float]]   # (frame, duration in ms)
+
+
+class MediaImportError(ValueError):
+    """Raised for media that can't be decoded into frames"""
+
+
+def _axis_resample(frame: np.ndarray, size: int, axis: int) -> np.ndarray:
+    """Box-average one axis down to size, or repeat nearest pixels to grow it"""
+    source = frame.shape[axis]
+    if source == size:
+        return frame
+    if source < size:
+        return np.take(frame, np.arange(size) * source // size, axis=axis)
+    starts = np.arange(size) * source // size
+    counts = np.diff(np.append(starts, source))
+    sums = np.add.reduceat(frame.astype(np.uint32), starts, axis=axis)
+    shape = [1] * frame.ndim
+    shape[axis] = size
+    return sums / counts.reshape(shape)
+
+
+def resample_frame(frame: np.ndarray, width: int, height: int) -> Frame:
+    """Resize an (h, w, 3) frame to the matrix size; each LED is the average of the pixels it covers"""
+    resized = _axis_resample(_axis_resample(frame, height, 0), width, 1)
+    return np.clip(np.rint(resized), 0, 255).astype(np.uint8)
+
+
+def dither_frame(frame: Frame, bits: int) -> Frame:
+    """Ordered (Bayer) dither down to bits per channel, keeping 0-255 values"""
+    if not bits or bits >= 8:
+        return frame
+    levels = (1 << bits) - 1
+    height, width = frame.shape[:2]
+    threshold = np.tile(BAYER_4X4, (height // 4 + 1, width // 4 + 1))[:height, :width, np.newaxis]
+    scaled = frame.astype(np.float32) * levels / 255
+    quantized = np.minimum(np.floor(scaled + threshold), levels)
+    return (quantized * 255 / levels).round().astype(np.uint8)
+
+
+def decimate(frames: TimedFrames, frame_delay_ms: float) -> Iterator[Frame]:
+    """
+    Resample frames with their own durations to a fixed frame delay
+    Output frame k is whichever source frame is showing at k * frame_delay_ms,
+    so faster sources are thinned out and long frames are repeated
+    """
+    elapsed = 0.0
+    next_time = 0.0
+    for frame, duration in frames:
+        elapsed += duration
+        while next_time < elapsed:
+            yield frame
+            next_time += frame_delay_ms
+
+
+def _pil_to_rgb(image) -> Frame:
+    """RGB array with any transparency composited onto black (unlit LEDs)"""
+    rgba = np.asarray(image.convert("RGBA"), dtype=np.uint16)
+    return (rgba[..., :3] * rgba[..., 3:] // 255).astype(np.uint8)
+
+
+def iter_image_frames(path: str) -> Iterator[Tuple[Frame, float]]:
+    """Frames and durations of an image; animated GIF/PNG/WebP yield every frame"""
+    from PIL import Image, ImageSequence
+    default_ms = config.MEDIA_IMPORT_CONFIG["default_frame_ms"]
+    with Image.open(path) as image:
+        for frame in ImageSequence.Iterator(image):
+            yield _pil_to_rgb(frame), frame.info.get("duration") or default_ms
+
+
+def iter_sequence_frames(paths: Sequence[str]) -> Iterator[Tuple[Frame, float]]:
+    """One frame per image file, in file name order"""
+    from PIL import Image
+    default_ms = config.MEDIA_IMPORT_CONFIG["default_frame_ms"]
+    for path in sorted(paths):
+        with Image.open(path) as image:
+            yield _pil_to_rgb(image), default_ms
+
+
+def find_video_decoder() -> Optional[str]:
+    """ffmpeg command from the tool registry, or None"""
+    return utils.get_tool_registry().lookup("ffmpeg")["command"]
+
+
+def iter_video_frames(path: str, width: int, height: int, fps: float,
+                      decoder: Optional[str] = None) -> Iterator[Tuple[Frame, float]]:
+    """
+    Frames of a video decoded by ffmpeg, already at the matrix size and frame rate
+    ffmpeg's area scaler does the resampling while decoding, so full-size
+    frames never reach Python
+    """
+    decoder = decoder or find_video_decoder()
+    if not decoder:
+        raise MediaImportError("Video import needs ffmpeg on PATH")
+    command = [decoder, "-v", "error", "-i", path,
+               "-vf", f"fps={fps},scale={width}:{height}:flags=area",
+               "-f", "rawvideo", "-pix_fmt", "rgb24", "-"]
+    frame_bytes = width * height * 3
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    finished = False
+    try:
+        while True:
+            data = process.stdout.read(frame_bytes)
+            if len(data) < frame_bytes:
+                break
+            yield np.frombuffer(data, dtype=np.uint8).reshape(height, width, 3), 1000.0 / fps
+        finished = True
+    finally:
+        # Closing stdout early makes ffmpeg exit on a broken pipe
+        process.stdout.close()
+        error = process.stderr.read().decode("utf-8", "replace").strip()
+        process.stderr.close()
+        if process.wait() != 0 and finished:
+            raise MediaImportError(f"ffmpeg failed: {error.splitlines()[-1] if error else 'no output'}")
+
+
+def is_video(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in VIDEO_EXTENSIONS
+
+
+def load_image_frame(path: str, width: int, height: int, dither_bits: int = 0) -> Frame:
+    """First frame of an image resampled to the matrix size"""
+    frames = iter_image_frames(path)
+    try:
+        frame, _ = next(frames)
+    finally:
+        frames.close()
+    return dither_frame(resample_frame(frame, width, height), dither_bits)
+
+
+def import_media(source: Union[str, List[str]], output_path: str, width: int, height: int,
+                 max_fps: Optional[float] = None, dither_bits: Optional[int] = None,
+                 encoding: Optional[str] = None, progress_callback=None, layout=None) -> Dict:
+    """
+    Convert media into an animation .dat file
+    source is an image/GIF/video path or a list of image files (a sequence).
+    The frame delay is the first frame's duration, but no faster than
+    max_fps; progress_callback(frames_written) is called as frames are written.
+    With a led_layout.LedLayout the frames are stored in its wiring order.
+    Returns the writer's size stats plus source and output frame counts.
+    """
+    settings = config.MEDIA_IMPORT_CONFIG
+    max_fps = max_fps or settings["max_fps"]
+    dither_bits = settings["dither_bits"] if dither_bits is None else dither_bits
+    min_delay_ms = 1000.0 / max_fps
+
+    if isinstance(source, (list, tuple)):
+        timed = iter_sequence_frames(source)
+    elif is_video(source):
+        timed = iter_video_frames(source, width, height, max_fps)
+    else:
+        timed = iter_image_frames(source)
+
+    source_frames = 0
+
+    def counted(frames):
+        nonlocal source_frames
+        for item in frames:
+            source_frames += 1
+            yield item
+
+    timed = counted(timed)
+    try:
+        first = next(timed)
+    except StopIteration:
+        raise MediaImportError("No frames found")
+    frame_delay_ms = max(first[1], min_delay_ms)
+
+    with animation_dat.AnimationWriter(output_path, width, height, encoding=encoding,
+                                       frame_delay_ms=int(round(frame_delay_ms)), layout=layout) as writer:
+        last_source = None
+        last_output = None
+        for frame in decimate(itertools.chain([first], timed), frame_delay_ms):
+            # A source frame repeated by decimate() is only resampled once
+            if frame is not last_source:
+                last_source = frame
+                last_output = dither_frame(resample_frame(frame, width, height), dither_bits)
+            writer.add_frame(last_output)
+            if progress_callback:
+                progress_callback(writer.frame_count)
+        stats = writer.close()
+
+    stats.update(source_frames=source_frames, frame_delay_ms=int(round(frame_delay_ms)))
+    return stats
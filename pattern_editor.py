@@ -0,0 +1,430 @@
+# J Tech Pixel Uploader Pattern Editor
+# Visual LED pattern editor dialog. Kept out of main.py so the editor (and
+# Pillow/numpy, used only for media import) is loaded the first time it is opened.
+
+import os
+import threading
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+# Wait this long after the last canvas resize before rebuilding the grid
+RESIZE_REDRAW_MS = 100
+
+# Animation import progress is shown every this many frames
+IMPORT_PROGRESS_FRAMES = 10
+
+
+class PatternEditorDialog:
+    """Visual pattern editor for creating and editing LED patterns"""
+    
+    def __init__(self, parent, matrix_size=(8, 8)):
+        self.parent = parent
+        self.matrix_size = matrix_size
+        self.leds = matrix_size[0] * matrix_size[1]
+        self.pattern_data = [[0, 0, 0] for _ in range(self.leds)]  # RGB values
+        
+        # Retained canvas items: LED index -> oval item id, plus the geometry they were built for
+        self.led_items = []
+        self.grid_geometry = None  # (canvas_width, canvas_height, columns, rows)
+        self.last_cell = None      # Last cell painted in the current drag
+        self.redraw_job = None
+        
+        # Create dialog window
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title(f"🎨 LED Pattern Editor - {matrix_size[0]}x{matrix_size[1]}")
+        self.dialog.geometry("800x600")
+        self.dialog.resizable(True, True)
+        
+        # Make dialog modal
+        self.dialog.transient(parent)
+        self.dialog.grab_set()
+        
+        self.setup_ui()
+        self.create_canvas()
+        
+    def setup_ui(self):
+        """Setup the user interface"""
+        # Main frame
+        main_frame = ttk.Frame(self.dialog)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        # Control panel
+        control_frame = ttk.LabelFrame(main_frame, text="Controls", padding=10)
+        control_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        # Matrix size selector
+        size_frame = ttk.Frame(control_frame)
+        size_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        ttk.Label(size_frame, text="Matrix Size:").pack(side=tk.LEFT)
+        self.size_var = tk.StringVar(value=f"{self.matrix_size[0]}x{self.matrix_size[1]}")
+        size_combo = ttk.Combobox(size_frame, textvariable=self.size_var, 
+                                 values=["8x8", "16x16", "32x32", "64x64"], state="readonly")
+        size_combo.pack(side=tk.LEFT, padx=(10, 0))
+        size_combo.bind("<<ComboboxSelected>>", self.on_size_change)
+        
+        # Color picker
+        color_frame = ttk.Frame(control_frame)
+        color_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        ttk.Label(color_frame, text="Current Color:").pack(side=tk.LEFT)
+        self.color_var = tk.StringVar(value="#FF0000")
+        color_entry = ttk.Entry(color_frame, textvariable=self.color_var, width=10)
+        color_entry.pack(side=tk.LEFT, padx=(10, 0))
+        
+        self.color_button = tk.Button(color_frame, bg="#FF0000", width=3, height=1,
+                                    command=self.pick_color)
+        self.color_button.pack(side=tk.LEFT, padx=(10, 0))
+        
+        # Tool buttons
+        button_frame = ttk.Frame(control_frame)
+        button_frame.pack(fill=tk.X)
+        
+        ttk.Button(button_frame, text="🎨 Pick Color", command=self.pick_color).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(button_frame, text="🗑️ Clear All", command=self.clear_pattern).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(button_frame, text="🔄 Random", command=self.random_pattern).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(button_frame, text="📁 Import Image", command=self.import_image).pack(side=tk.LEFT, padx=(0, 10))
+        self.import_animation_button = ttk.Button(button_frame, text="🎞️ Import Animation",
+                                                  command=self.import_animation)
+        self.import_animation_button.pack(side=tk.LEFT, padx=(0, 10))
+        
+        # Export buttons
+        export_frame = ttk.Frame(control_frame)
+        export_frame.pack(fill=tk.X, pady=(10, 0))
+        
+        ttk.Button(export_frame, text="💾 Save .dat", command=self.save_dat).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(export_frame, text="💾 Save .bin", command=self.save_bin).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(button_frame, text="❌ Close", command=self.dialog.destroy).pack(side=tk.RIGHT)
+        
+        # Canvas frame
+        canvas_frame = ttk.LabelFrame(main_frame, text="LED Matrix", padding=10)
+        canvas_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Status bar
+        self.status_var = tk.StringVar(value=f"Ready - {self.leds} LEDs")
+        status_bar = ttk.Label(main_frame, textvariable=self.status_var, relief=tk.SUNKEN)
+        status_bar.pack(fill=tk.X, pady=(10, 0))
+        
+    def create_canvas(self):
+        """Create the LED matrix canvas"""
+        # Canvas frame
+        canvas_container = ttk.Frame(self.dialog.winfo_children()[0].winfo_children()[-2])
+        canvas_container.pack(fill=tk.BOTH, expand=True)
+        
+        # Create canvas
+        self.canvas = tk.Canvas(canvas_container, bg="black", highlightthickness=0)
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+        
+        # Bind events
+        self.canvas.bind("<Button-1>", self.on_canvas_click)
+        self.canvas.bind("<B1-Motion>", self.on_canvas_drag)
+        self.canvas.bind("<ButtonRelease-1>", self.on_canvas_release)
+        self.canvas.bind("<Configure>", self.on_canvas_resize)
+        
+        # Draw grid
+        self.draw_grid()
+        
+    def on_canvas_resize(self, event=None):
+        """Rebuild the grid once the canvas has settled at a new size"""
+        if self.redraw_job:
+            self.dialog.after_cancel(self.redraw_job)
+        self.redraw_job = self.dialog.after(RESIZE_REDRAW_MS, self.redraw_if_resized)
+        
+    def redraw_if_resized(self):
+        self.redraw_job = None
+        geometry = (self.canvas.winfo_width(), self.canvas.winfo_height()) + tuple(self.matrix_size)
+        if geometry != self.grid_geometry:
+            self.draw_grid()
+        
+    def draw_grid(self):
+        """Create the grid lines and one oval per LED
+        Only needed when the canvas or matrix size changes; painting just recolors items
+        """
+        self.canvas.delete("all")
+        self.led_items = []
+        self.grid_geometry = None
+        
+        # Calculate cell size
+        canvas_width = self.canvas.winfo_width()
+        canvas_height = self.canvas.winfo_height()
+        
+        if canvas_width <= 1 or canvas_height <= 1:
+            # Canvas not yet sized, schedule redraw
+            self.dialog.after(100, self.draw_grid)
+            return
+        
+        cell_width = canvas_width / self.matrix_size[0]
+        cell_height = canvas_height / self.matrix_size[1]
+        
+        # Draw grid lines
+        for i in range(self.matrix_size[0] + 1):
+            x = i * cell_width
+            self.canvas.create_line(x, 0, x, canvas_height, fill="gray", width=1)
+            
+        for i in range(self.matrix_size[1] + 1):
+            y = i * cell_height
+            self.canvas.create_line(0, y, canvas_width, y, fill="gray", width=1)
+        
+        # Draw LEDs in index order so led_items[index] is that LED's oval
+        for y in range(self.matrix_size[1]):
+            for x in range(self.matrix_size[0]):
+                led_index = y * self.matrix_size[0] + x
+                if led_index < len(self.pattern_data):
+                    x1 = x * cell_width + 2
+                    y1 = y * cell_height + 2
+                    x2 = (x + 1) * cell_width - 2
+                    y2 = (y + 1) * cell_height - 2
+                    
+                    self.led_items.append(self.canvas.create_oval(
+                        x1, y1, x2, y2, fill=self.led_color(led_index), outline="white", width=1))
+        
+        self.grid_geometry = (canvas_width, canvas_height) + tuple(self.matrix_size)
+        
+        # Update status
+        self.status_var.set(f"Matrix: {self.matrix_size[0]}x{self.matrix_size[1]} - {self.leds} LEDs")
+        
+    def led_color(self, led_index):
+        """Canvas fill color for an LED"""
+        r, g, b = self.pattern_data[led_index]
+        return f"#{r:02x}{g:02x}{b:02x}"
+        
+    def refresh_leds(self):
+        """Recolor every LED oval in place after the pattern data changed"""
+        if len(self.led_items) != len(self.pattern_data):
+            self.draw_grid()
+            return
+        for led_index, item in enumerate(self.led_items):
+            self.canvas.itemconfigure(item, fill=self.led_color(led_index))
+        
+    def on_canvas_click(self, event):
+        """Handle canvas click events"""
+        self.last_cell = None
+        self.update_led_at_position(event.x, event.y)
+        
+    def on_canvas_drag(self, event):
+        """Handle canvas drag events"""
+        self.update_led_at_position(event.x, event.y)
+        
+    def on_canvas_release(self, event):
+        self.last_cell = None
+        
+    def current_rgb(self):
+        """Parse the current color entry; None if it isn't #RRGGBB"""
+        color = self.color_var.get()
+        if color.startswith("#") and len(color) == 7:
+            try:
+                return [int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16)]
+            except ValueError:
+                pass
+        return None
+        
+    def update_led_at_position(self, x, y):
+        """Paint the LED at a canvas position, and any cells a fast drag skipped over"""
+        if not self.grid_geometry:
+            return
+        canvas_width, canvas_height, columns, rows = self.grid_geometry
+        
+        grid_x = int(x / (canvas_width / columns))
+        grid_y = int(y / (canvas_height / rows))
+        if not (0 <= grid_x < columns and 0 <= grid_y < rows):
+            return
+        
+        rgb = self.current_rgb()
+        if rgb is None:
+            return
+        
+        cells = [(grid_x, grid_y)]
+        if self.last_cell:
+            # Motion events arrive further apart than one cell when dragging quickly
+            last_x, last_y = self.last_cell
+            steps = max(abs(grid_x - last_x), abs(grid_y - last_y))
+            cells = [(round(last_x + (grid_x - last_x) * step / steps),
+                      round(last_y + (grid_y - last_y) * step / steps))
+                     for step in range(1, steps + 1)]
+        self.last_cell = (grid_x, grid_y)
+        
+        for cell_x, cell_y in cells:
+            self.set_led(cell_y * columns + cell_x, rgb)
+            
+    def set_led(self, led_index, rgb):
+        """Set one LED and recolor only its oval"""
+        if led_index >= len(self.pattern_data) or self.pattern_data[led_index] == rgb:
+            return
+        self.pattern_data[led_index] = list(rgb)
+        if led_index < len(self.led_items):
+            self.canvas.itemconfigure(self.led_items[led_index], fill=self.led_color(led_index))
+                        
+    def pick_color(self):
+        """Open color picker dialog"""
+        try:
+            from tkinter import colorchooser
+            color = colorchooser.askcolor(title="Pick LED Color")[1]
+            if color:
+                self.color_var.set(color)
+                self.color_button.config(bg=color)
+        except ImportError:
+            # Fallback to simple color selection
+            colors = ["#FF0000", "#00FF00", "#0000FF", "#FFFF00", "#FF00FF", "#00FFFF", "#FFFFFF", "#000000"]
+            current = colors.index(self.color_var.get()) if self.color_var.get() in colors else 0
+            next_color = colors[(current + 1) % len(colors)]
+            self.color_var.set(next_color)
+            self.color_button.config(bg=next_color)
+            
+    def clear_pattern(self):
+        """Clear all LEDs to black"""
+        self.pattern_data = [[0, 0, 0] for _ in range(self.leds)]
+        self.refresh_leds()
+        
+    def random_pattern(self):
+        """Generate random pattern"""
+        import random
+        self.pattern_data = [[random.randint(0, 255) for _ in range(3)] for _ in range(self.leds)]
+        self.refresh_leds()
+        
+    def import_image(self):
+        """Import image and convert to LED pattern"""
+        try:
+            from tkinter import filedialog
+            filename = filedialog.askopenfilename(
+                title="Import Image",
+                filetypes=[("Image files", "*.png *.jpg *.jpeg *.bmp *.gif")]
+            )
+            if filename:
+                # media_import (numpy and Pillow) is only needed here, so it isn't loaded at startup
+                import media_import
+                frame = media_import.load_image_frame(filename, *self.matrix_size)
+                self.pattern_data = frame.reshape(-1, 3).tolist()
+                
+                self.refresh_leds()
+                self.status_var.set(f"Imported image: {os.path.basename(filename)}")
+        except Exception as e:
+            messagebox.showerror("Import Error", f"Failed to import image:\n{str(e)}")
+            
+    def import_animation(self):
+        """Convert a GIF, image sequence or video into an animation .dat file"""
+        try:
+            from tkinter import filedialog
+            import led_layout
+            sources = filedialog.askopenfilenames(
+                title="Import Animation (choose several images for a sequence)",
+                filetypes=[("Animations and video", "*.gif *.png *.webp *.mp4 *.mov *.avi *.mkv *.webm"),
+                           ("Image files", "*.png *.jpg *.jpeg *.bmp *.gif"), ("All files", "*.*")]
+            )
+            if not sources:
+                return
+            output = filedialog.asksaveasfilename(
+                title="Save LED Animation",
+                defaultextension=".dat",
+                filetypes=[("DAT files", "*.dat"), ("All files", "*.*")]
+            )
+            if not output:
+                return
+            
+            source = list(sources) if len(sources) > 1 else sources[0]
+            layout = led_layout.configured_layout(*self.matrix_size)
+        except Exception as e:
+            messagebox.showerror("Import Error", f"Failed to import animation:\n{str(e)}")
+            return
+        
+        # Decoding a video can take a while, so it runs off the Tk thread
+        self.status_var.set("Importing animation...")
+        self.import_animation_button.config(state="disabled")
+        import_thread = threading.Thread(target=self._import_animation_thread, args=(source, output, layout))
+        import_thread.daemon = True
+        import_thread.start()
+        
+    def _import_animation_thread(self, source, output, layout):
+        """Run the media import in a separate thread, reporting progress through the status bar"""
+        try:
+            import media_import
+            stats = media_import.import_media(
+                source, output, *self.matrix_size, layout=None if layout.is_identity else layout,
+                progress_callback=self._import_animation_progress)
+            self._post(self._import_animation_done, output, layout, stats)
+        except Exception as e:
+            self._post(self._import_animation_failed, str(e))
+            
+    def _import_animation_progress(self, frames):
+        if frames % IMPORT_PROGRESS_FRAMES == 0:
+            self._post(self.status_var.set, f"Importing animation... {frames} frames")
+            
+    def _post(self, callback, *args):
+        """Run callback on the Tk thread; dropped once the editor has been closed"""
+        try:
+            self.dialog.after(0, callback, *args)
+        except (tk.TclError, RuntimeError):
+            pass
+            
+    def _import_animation_done(self, output, layout, stats):
+        self.import_animation_button.config(state="normal")
+        # Show the first frame in the editor (only possible while it is still row-major RGB)
+        if layout.is_identity:
+            try:
+                import animation_dat
+                with animation_dat.AnimationReader(output) as reader:
+                    self.pattern_data = reader.frame_array(0).reshape(-1, 3).tolist()
+                self.refresh_leds()
+            except Exception as e:
+                messagebox.showerror("Import Error", f"Failed to read imported animation:\n{str(e)}")
+        self.status_var.set(f"Imported {stats['frames']} frames ({stats['frame_delay_ms']} ms) "
+                            f"into {os.path.basename(output)} - {stats['file_bytes']} bytes")
+        
+    def _import_animation_failed(self, error):
+        self.import_animation_button.config(state="normal")
+        self.status_var.set("Animation import failed")
+        messagebox.showerror("Import Error", f"Failed to import animation:\n{error}")
+            
+    def export_bytes(self):
+        """Pattern bytes in the wiring and color order set in LED_LAYOUT_CONFIG"""
+        import numpy as np
+        import led_layout
+        layout = led_layout.configured_layout(*self.matrix_size)
+        return layout.apply(np.asarray(self.pattern_data, dtype=np.uint8))
+            
+    def save_dat(self):
+        """Save pattern as .dat file"""
+        try:
+            from tkinter import filedialog
+            filename = filedialog.asksaveasfilename(
+                title="Save LED Pattern",
+                defaultextension=".dat",
+                filetypes=[("DAT files", "*.dat"), ("All files", "*.*")]
+            )
+            if filename:
+                with open(filename, 'wb') as f:
+                    f.write(self.export_bytes())
+                
+                self.status_var.set(f"Saved: {os.path.basename(filename)}")
+                messagebox.showinfo("Success", f"Pattern saved as {filename}")
+        except Exception as e:
+            messagebox.showerror("Save Error", f"Failed to save pattern:\n{str(e)}")
+            
+    def save_bin(self):
+        """Save pattern as .bin file"""
+        try:
+            from tkinter import filedialog
+            filename = filedialog.asksaveasfilename(
+                title="Save LED Pattern",
+                defaultextension=".bin",
+                filetypes=[("BIN files", "*.bin"), ("All files", "*.*")]
+            )
+            if filename:
+                with open(filename, 'wb') as f:
+                    f.write(self.export_bytes())
+                
+                self.status_var.set(f"Saved: {os.path.basename(filename)}")
+                messagebox.showinfo("Success", f"Pattern saved as {filename}")
+        except Exception as e:
+            messagebox.showerror("Save Error", f"Failed to save pattern:\n{str(e)}")
+            
+    def on_size_change(self, event=None):
+        """Handle matrix size change"""
+        try:
+            size_str = self.size_var.get()
+            width, height = map(int, size_str.split('x'))
+            self.matrix_size = (width, height)
+            self.leds = width * height
+            self.pattern_data = [[0, 0, 0] for _ in range(self.leds)]
+            self.draw_grid()
+        except ValueError:
+            pass
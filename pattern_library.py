@@ -0,0 +1,179 @@
+# J Tech Pixel Uploader Pattern Library
+# Computes the sample LED patterns for any W x H matrix as whole-array numpy
+# operations. Every generator returns a (height, width, 3) uint8 frame in
+# row-major RGB order; generate() turns it into one contiguous buffer ready
+# for a .dat/.bin file. At 8x8 the output matches the original hand-written
+# generators, except spiral, which now places its colors along the spiral.
+
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+BLUE = (0, 0, 255)
+WHITE = (255, 255, 255)
+YELLOW = (255, 255, 0)
+
+# Length of the hue wheel used by rainbow() and spiral()
+HUE_STEPS = 768
+
+# The 8x8 heart bitmap; other sizes sample it with nearest-neighbour
+HEART_MASK = np.array([
+    [0, 0, 0, 0, 0, 0, 0, 0],
+    [0, 1, 1, 0, 0, 1, 1, 0],
+    [1, 1, 1, 1, 1, 1, 1, 1],
+    [1, 1, 1, 1, 1, 1, 1, 1],
+    [1, 1, 1, 1, 1, 1, 1, 1],
+    [0, 1, 1, 1, 1, 1, 1, 0],
+    [0, 0, 1, 1, 1, 1, 0, 0],
+    [0, 0, 0, 1, 1, 0, 0, 0]
+], dtype=bool)
+
+
+def _grid(width: int, height: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Column and row index arrays that broadcast to (height, width)"""
+    if width < 1 or height < 1:
+        raise ValueError(f"Invalid matrix size: {width}x{height}")
+    return np.arange(width)[np.newaxis, :], np.arange(height)[:, np.newaxis]
+
+
+def _paint(mask: np.ndarray, color: Tuple[int, int, int], background: Tuple[int, int, int] = (0, 0, 0)) -> np.ndarray:
+    """Frame with color where mask is set and background elsewhere"""
+    return np.where(mask[..., np.newaxis], np.array(color, dtype=np.uint8),
+                    np.array(background, dtype=np.uint8))
+
+
+def hue_to_rgb(hue: np.ndarray) -> np.ndarray:
+    """
+    Map hues on the 0-767 wheel to RGB
+    Red fades to green (0-255), green to blue (256-511), blue back to red (512-767)
+    """
+    hue = np.asarray(hue, dtype=np.int32) % HUE_STEPS
+    segment = hue // 256
+    step = hue % 256
+    rgb = np.zeros(hue.shape + (3,), dtype=np.uint8)
+    for index in range(3):
+        rising, falling = (index + 1) % 3, index
+        rgb[..., rising] = np.where(segment == index, step, rgb[..., rising])
+        rgb[..., falling] = np.where(segment == index, 255 - step, rgb[..., falling])
+    return rgb
+
+
+def spiral_order(width: int, height: int) -> np.ndarray:
+    """
+    Position of every LED along a clockwise spiral from the top-left corner
+    Computed per ring: the ring index is the distance to the nearest edge and
+    the position within the ring follows its top, right, bottom and left side
+    """
+    x, y = _grid(width, height)
+    ring = np.minimum(np.minimum(x, y), np.minimum(width - 1 - x, height - 1 - y))
+    ring_w = width - 2 * ring
+    ring_h = height - 2 * ring
+    u = x - ring
+    v = y - ring
+    before = width * height - ring_w * ring_h  # LEDs in the outer rings
+    along = np.select(
+        [v == 0, u == ring_w - 1, v == ring_h - 1],
+        [u, (ring_w - 1) + v, 2 * (ring_w - 1) + (ring_h - 1) - u],
+        2 * (ring_w - 1) + 2 * (ring_h - 1) - v)
+    return before + along
+
+
+def alternating_cols(width: int = 8, height: int = 8) -> np.ndarray:
+    """Red even columns, blue odd columns"""
+    x, y = _grid(width, height)
+    return _paint(np.broadcast_to(x % 2 == 0, (height, width)), RED, BLUE)
+
+
+def checkerboard(width: int = 8, height: int = 8) -> np.ndarray:
+    """White and black checkerboard, white in the top-left corner"""
+    x, y = _grid(width, height)
+    return _paint((x + y) % 2 == 0, WHITE)
+
+
+def rainbow(width: int = 8, height: int = 8) -> np.ndarray:
+    """Diagonal rainbow; the hue advances 256 steps per matrix side"""
+    x, y = _grid(width, height)
+    return hue_to_rgb((x + y) * 256 // max(width, height))
+
+
+def pulse(width: int = 8, height: int = 8) -> np.ndarray:
+    """White glow fading with distance from the center"""
+    x, y = _grid(width, height)
+    distance = np.sqrt((x - width // 2) ** 2 + (y - height // 2) ** 2)
+    falloff = 320.0 / max(width, height)  # 40 per LED at 8x8
+    intensity = np.maximum(0, 255 - (distance * falloff).astype(np.int32)).astype(np.uint8)
+    return np.repeat(intensity[..., np.newaxis], 3, axis=2)
+
+
+def spiral(width: int = 8, height: int = 8) -> np.ndarray:
+    """Rainbow laid along a clockwise spiral, spanning a third of the hue wheel"""
+    return hue_to_rgb(spiral_order(width, height) * 256 // (width * height))
+
+
+def heart(width: int = 8, height: int = 8) -> np.ndarray:
+    """Red heart scaled from the 8x8 bitmap"""
+    x, y = _grid(width, height)
+    rows = y * HEART_MASK.shape[0] // height
+    cols = x * HEART_MASK.shape[1] // width
+    return _paint(HEART_MASK[rows, cols], RED)
+
+
+def cross(width: int = 8, height: int = 8) -> np.ndarray:
+    """Green cross through the center, two LEDs wide per 8"""
+    x, y = _grid(width, height)
+    half_w = max(1, width // 8)
+    half_h = max(1, height // 8)
+    vertical = np.abs(x - width // 2 + 0.5) < half_w
+    horizontal = np.abs(y - height // 2 + 0.5) < half_h
+    return _paint(vertical | horizontal, GREEN)
+
+
+def border(width: int = 8, height: int = 8) -> np.ndarray:
+    """Blue frame, one LED thick per 8"""
+    x, y = _grid(width, height)
+    thickness = max(1, min(width, height) // 8)
+    edge = np.minimum(np.minimum(x, y), np.minimum(width - 1 - x, height - 1 - y))
+    return _paint(edge < thickness, BLUE)
+
+
+def diagonal(width: int = 8, height: int = 8) -> np.ndarray:
+    """Yellow X joining opposite corners"""
+    x, y = _grid(width, height)
+    # Distance to each corner-to-corner line, scaled so one LED of slack stays connected
+    slack = max(width, height) / 2
+    down = np.abs(x * (height - 1) - y * (width - 1)) < slack
+    up = np.abs(x * (height - 1) - (height - 1 - y) * (width - 1)) < slack
+    return _paint(down | up, YELLOW)
+
+
+PATTERNS: Dict[str, Callable[[int, int], np.ndarray]] = {
+    "alternating_cols": alternating_cols,
+    "checkerboard": checkerboard,
+    "rainbow": rainbow,
+    "pulse": pulse,
+    "spiral": spiral,
+    "heart": heart,
+    "cross": cross,
+    "border": border,
+    "diagonal": diagonal
+}
+
+
+def to_buffer(frame: np.ndarray) -> bytearray:
+    """Contiguous row-major RGB bytes for a (height, width, 3) frame"""
+    return bytearray(np.ascontiguousarray(frame, dtype=np.uint8).tobytes())
+
+
+def generate(name: str, width: int = 8, height: int = 8, layout=None) -> bytearray:
+    """
+    RGB buffer (width * height * 3 bytes) for a named pattern
+    With a led_layout.LedLayout the bytes are in its wiring and color order
+    """
+    if name not in PATTERNS:
+        raise ValueError(f"Unknown pattern: {name}")
+    frame = PATTERNS[name](width, height)
+    if layout is not None and not layout.is_identity:
+        return bytearray(layout.apply(frame))
+    return to_buffer(frame)
@@ -0,0 +1,299 @@
+# J Tech Pixel Uploader Progress Parser
+# Turns flash tool output (esptool, avrdude, stm32flash, bossac via
+# arduino-cli, teensy_loader_cli, plus a generic "NN%" fallback) into
+# structured progress events: phase, bytes done/total, percent, KB/s and an
+# ETA smoothed with an exponential moving average. A throttle limits how
+# often events reach the UI so a chatty tool can't flood the Tk thread.
+
+import os
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import config
+
+# Pattern kinds
+MARKER = "marker"          # Line starts a phase
+TOTAL = "total"            # Group: total bytes for the phase
+DONE_TOTAL = "done_total"  # Groups: bytes done, bytes total
+PERCENT = "percent"        # Group: percent done
+PAGES = "pages"            # Groups: pages done, pages total
+BAR = "bar"                # Group: avrdude hash bar, 50 hashes = 100%
+COMPLETE = "complete"      # Phase finished; optional group: bytes
+
+# avrdude reads the signature before writing and the flash after it
+READ_PHASE = "read"
+
+AVRDUDE_BAR_WIDTH = 50
+
+# Phases whose progress is counted in bytes when the total is known
+BYTE_PHASES = ("compare", "write", "verify")
+
+
+def _compile(table):
+    return [(re.compile(pattern), phase, kind) for pattern, phase, kind in table]
+
+
+ESPTOOL_PATTERNS = _compile([
+    (r"Connecting", "connect", MARKER),
+    (r"Uploading stub|Running stub|Changing baud rate", "stub", MARKER),
+    (r"Erasing flash|Flash will be erased", "erase", MARKER),
+    (r"Compressed (\d+) bytes", "write", TOTAL),
+    # esptool v5: "Writing at 0x00000000 [=====     ] 50.0% 512/1024 bytes..."
+    (r"Writing at 0x[0-9a-fA-F]+\s*\[[^\]]*\]\s*[\d.]+%\s*(\d+)/(\d+) bytes", "write", DONE_TOTAL),
+    # esptool v4: "Writing at 0x00010000... (50 %)"
+    (r"Writing at 0x[0-9a-fA-F]+\.*\s*\((\d+(?:\.\d+)?) ?%\)", "write", PERCENT),
+    (r"Wrote (\d+) bytes", "write", COMPLETE),
+    (r"Hash of data verified|Verifying", "verify", MARKER),
+    (r"Hard resetting|Leaving", "reset", MARKER),
+])
+
+AVRDUDE_PATTERNS = _compile([
+    (r"AVR device initialized|Device signature", "connect", MARKER),
+    (r"erasing chip", "erase", MARKER),
+    (r"writing (?:flash|output) \((\d+) bytes\)|Writing (\d+) bytes? for flash", "write", TOTAL),
+    (r"reading on-chip flash data|verifying flash memory", "verify", MARKER),
+    (r"Writing \| (#*)", "write", BAR),
+    (r"Reading \| (#*)", READ_PHASE, BAR),
+    (r"(\d+) bytes of flash verified", "verify", COMPLETE),
+    (r"(\d+) bytes of flash written", "write", COMPLETE),
+])
+
+STM32FLASH_PATTERNS = _compile([
+    (r"Interface serial|Version\s*:", "connect", MARKER),
+    (r"^\s*Size\s*:\s*(\d+)", None, TOTAL),
+    (r"Erasing", "erase", MARKER),
+    (r"Wrote (?:and verified )?address 0x[0-9a-fA-F]+ \((\d+(?:\.\d+)?)%\)", "write", PERCENT),
+    (r"Starting execution", "reset", MARKER),
+])
+
+BOSSAC_PATTERNS = _compile([
+    (r"Erase flash", "erase", MARKER),
+    (r"Write (\d+) bytes to flash", "write", TOTAL),
+    (r"Verify (\d+) bytes", "verify", MARKER),
+    (r"\[[= ]*\]\s*\d+% \((\d+)/(\d+) pages\)", None, PAGES),
+])
+
+TEENSY_PATTERNS = _compile([
+    (r"Programming", "write", MARKER),
+    (r"Booting", "reset", MARKER),
+])
+
+# Any "NN%" in the current phase, for tools without a dedicated table
+GENERIC_PATTERNS = _compile([
+    (r"(\d{1,3}(?:\.\d+)?)\s?%", None, PERCENT),
+])
+
+TOOL_PATTERNS = {
+    "esptool": ESPTOOL_PATTERNS,
+    "avrdude": AVRDUDE_PATTERNS,
+    "stm32flash": STM32FLASH_PATTERNS,
+    "arduino_cli": AVRDUDE_PATTERNS + BOSSAC_PATTERNS,
+    "teensy_loader_cli": TEENSY_PATTERNS,
+    "generic": []
+}
+
+LINE_SPLIT = re.compile(r"\r\n|\r|\n")
+
+
+def tool_for_command(command: str, args: List[str]) -> str:
+    """Name of the pattern table for a flash command"""
+    if any("esptool" in arg for arg in args[:2]):
+        return "esptool"
+    name = os.path.splitext(os.path.basename(command))[0].lower().replace("-", "_")
+    return name if name in TOOL_PATTERNS else "generic"
+
+
+def describe_event(event: Dict) -> str:
+    """Short "phase · KB/s · ETA" text for a progress event"""
+    parts = [event["phase"]]
+    if event.get("rate_bps"):
+        parts.append(f"{event['rate_bps'] / 1024:.1f} KB/s")
+    if event.get("eta_s") is not None:
+        parts.append(f"ETA {event['eta_s']:.0f}s")
+    return " · ".join(parts)
+
+
+class RateEstimator:
+    """Progress rate and ETA for one phase, smoothed with an exponential moving average"""
+
+    def __init__(self, alpha: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.alpha = alpha if alpha is not None else config.PROGRESS_CONFIG["eta_smoothing"]
+        self.clock = clock
+        self.reset()
+
+    def reset(self, done: float = 0.0):
+        self.last_time = self.clock()
+        self.last_done = done
+        self.rate = None
+
+    def update(self, done: float, total: float) -> Tuple[Optional[float], Optional[float]]:
+        """Add a sample; returns (units per second, seconds remaining)"""
+        now = self.clock()
+        elapsed = now - self.last_time
+        if done > self.last_done and elapsed > 0:
+            sample = (done - self.last_done) / elapsed
+            self.rate = sample if self.rate is None else self.alpha * sample + (1 - self.alpha) * self.rate
+            self.last_time = now
+            self.last_done = done
+        if not self.rate or not total:
+            return self.rate, None
+        return self.rate, max(0.0, total - done) / self.rate
+
+
+class ProgressTracker:
+    """Builds progress events from (phase, done, total) samples"""
+
+    def __init__(self, tool: str = "", alpha: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.tool = tool
+        self.phase = None
+        self.estimator = RateEstimator(alpha, clock)
+
+    def enter(self, phase: str) -> Dict:
+        """Switch phase; returns a phase-only event (percent None)"""
+        if phase != self.phase:
+            self.phase = phase
+            self.estimator.reset()
+        return {"tool": self.tool, "phase": phase, "done": 0, "total": 0, "unit": None,
+                "percent": None, "rate_bps": None, "eta_s": None}
+
+    def update(self, phase: str, done: float, total: float, unit: str = "bytes") -> Dict:
+        event = self.enter(phase)
+        percent = min(100.0, done / total * 100.0) if total else 100.0
+        rate, eta = self.estimator.update(done, total)
+        event.update(done=done, total=total, unit=unit, percent=percent,
+                     rate_bps=rate if unit == "bytes" else None,
+                     eta_s=round(eta, 1) if eta is not None else None)
+        return event
+
+
+class ToolOutputParser:
+    """Incremental parser for one flash tool's combined stdout/stderr"""
+
+    def __init__(self, tool: str = "generic", clock: Callable[[], float] = time.monotonic):
+        self.tool = tool if tool in TOOL_PATTERNS else "generic"
+        self.patterns = TOOL_PATTERNS[self.tool] + GENERIC_PATTERNS
+        self.bar_patterns = [entry for entry in self.patterns if entry[2] == BAR]
+        self.tracker = ProgressTracker(self.tool, clock=clock)
+        self.total_bytes = None
+        self.wrote = False
+        self._buffer = ""
+        self._partial_bar = None
+
+    @property
+    def phase(self) -> Optional[str]:
+        return self.tracker.phase
+
+    def feed(self, text: str) -> Tuple[List[str], List[Dict]]:
+        """
+        Add tool output; returns (complete lines, progress events)
+        Lines end at \\r or \\n, so progress redrawn in place is seen as it happens
+        """
+        parts = LINE_SPLIT.split(self._buffer + text)
+        self._buffer = parts.pop()
+        lines = [line.strip() for line in parts if line.strip()]
+        events = []
+        for line in lines:
+            self._partial_bar = None
+            event = self.parse_line(line)
+            if event:
+                events.append(event)
+        # avrdude draws its hash bar without a line end until the phase is done
+        if self._buffer and self.bar_patterns:
+            event = self._parse_partial(self._buffer)
+            if event:
+                events.append(event)
+        return lines, events
+
+    def finish(self) -> Tuple[List[str], List[Dict]]:
+        """Flush the last unterminated line"""
+        return self.feed("\n") if self._buffer else ([], [])
+
+    def _parse_partial(self, text: str) -> Optional[Dict]:
+        for pattern, phase, kind in self.bar_patterns:
+            match = pattern.search(text)
+            if match and match.group(1) != self._partial_bar:
+                self._partial_bar = match.group(1)
+                return self._event(match, phase, kind)
+        return None
+
+    def parse_line(self, line: str) -> Optional[Dict]:
+        """Progress event for one line of output, or None"""
+        for pattern, phase, kind in self.patterns:
+            match = pattern.search(line)
+            if match:
+                return self._event(match, phase, kind)
+        return None
+
+    def _event(self, match, phase: Optional[str], kind: str) -> Optional[Dict]:
+        if phase == READ_PHASE:
+            phase = "verify" if self.wrote else "connect"
+        phase = phase or self.phase or "write"
+        if phase == "write":
+            self.wrote = True
+        values = [] if kind == BAR else [float(value) if kind == PERCENT else int(value)
+                                         for value in match.groups() if value is not None]
+
+        if kind == MARKER:
+            return self.tracker.enter(phase)
+        if kind == TOTAL:
+            self.total_bytes = values[0]
+            return self.tracker.enter(phase) if phase != self.phase else None
+        if kind == DONE_TOTAL:
+            self.total_bytes = values[1]
+            return self.tracker.update(phase, values[0], values[1])
+        if kind == COMPLETE:
+            total = values[0] if values else self.total_bytes
+            if total:
+                return self.tracker.update(phase, total, total)
+            return self.tracker.update(phase, 100.0, 100.0, "percent")
+        if kind == PERCENT:
+            fraction = values[0] / 100.0
+        elif kind == PAGES:
+            fraction = values[0] / values[1] if values[1] else 1.0
+        else:  # BAR
+            fraction = len(match.group(1)) / AVRDUDE_BAR_WIDTH
+        if self.total_bytes and phase in BYTE_PHASES:
+            return self.tracker.update(phase, fraction * self.total_bytes, self.total_bytes)
+        return self.tracker.update(phase, fraction * 100.0, 100.0, "percent")
+
+
+class ProgressThrottle:
+    """
+    Passes at most one event per interval to deliver()
+    Phase changes and completed phases always go through; the newest
+    skipped event is kept and delivered by flush()
+    """
+
+    def __init__(self, deliver: Callable[[Dict], None], interval_s: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.deliver = deliver
+        self.interval_s = interval_s if interval_s is not None else \
+            config.PROGRESS_CONFIG["update_interval_ms"] / 1000.0
+        self.clock = clock
+        self.lock = threading.Lock()
+        self._last_sent = None
+        self._last_phase = None
+        self._pending = None
+
+    def submit(self, event: Dict):
+        now = self.clock()
+        with self.lock:
+            due = (self._last_sent is None or event["phase"] != self._last_phase
+                   or (event["percent"] or 0) >= 100.0 or now - self._last_sent >= self.interval_s)
+            if not due:
+                self._pending = event
+                return
+            self._pending = None
+            self._last_sent = now
+            self._last_phase = event["phase"]
+        self.deliver(event)
+
+    def flush(self):
+        with self.lock:
+            event, self._pending = self._pending, None
+            if event:
+                self._last_sent = self.clock()
+        if event:
+            self.deliver(event)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script for the multi-frame animation DAT container
+"""
+
+import os
+import tempfile
+
+import numpy as np
+
+import animation_dat
+import pattern_library
+import utils
+
+
+def moving_dot_frames(width=16, height=16, count=60):
+    """A rainbow background with one white LED moving across it"""
+    background = pattern_library.rainbow(width, height)
+    for i in range(count):
+        frame = background.copy()
+        frame[(i // width) % height, i % width] = 255
+        yield frame
+
+
+def test_round_trip_and_seek():
+    """Test every encoding reads back identical frames in any order"""
+    print("🧪 Testing animation round trip...")
+    frames = [frame.tobytes() for frame in moving_dot_frames()]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for encoding in ["raw", "xor", "delta"]:
+            path = os.path.join(temp_dir, f"{encoding}.dat")
+            stats = animation_dat.write_animation(path, moving_dot_frames(), 16, 16,
+                                                  encoding=encoding, keyframe_interval=25)
+            assert stats["frames"] == 60 and os.path.getsize(path) == stats["file_bytes"]
+            assert not os.path.exists(path + ".tmp")
+            with animation_dat.AnimationReader(path) as reader:
+                for index in [59, 0, 31, 32, 25, 24, 7]:
+                    assert reader.frame(index) == frames[index], (encoding, index)
+                assert list(reader.frames()) == frames
+                kinds = [reader.entry(i)[2] for i in range(60)]
+            expected_keys = [0, 25, 50] if encoding != "raw" else list(range(60))
+            assert [i for i, kind in enumerate(kinds) if kind == animation_dat.KIND_KEY] == expected_keys
+            print(f"  ✅ {encoding}: {stats['file_bytes']} bytes for {stats['raw_bytes']} raw")
+        assert os.path.getsize(os.path.join(temp_dir, "xor.dat")) * 5 < stats["raw_bytes"]
+
+
+def test_header_and_index_checks():
+    """Test truncated or corrupt files raise AnimationDatError"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "anim.dat")
+        animation_dat.write_animation(path, moving_dot_frames(8, 8, 10), 8, 8)
+        with open(path, "rb") as f:
+            data = f.read()
+
+        for name, content in [("short.dat", data[:20]), ("truncated.dat", data[:-5]),
+                              ("bad_magic.dat", b"XXXX" + data[4:])]:
+            bad_path = os.path.join(temp_dir, name)
+            with open(bad_path, "wb") as f:
+                f.write(content)
+            try:
+                animation_dat.AnimationReader(bad_path)
+                assert False, f"{name} accepted"
+            except animation_dat.AnimationDatError:
+                pass
+
+        try:
+            with animation_dat.AnimationWriter(os.path.join(temp_dir, "wrong.dat"), 8, 8) as writer:
+                writer.add_frame(b"\x00" * 10)
+        except animation_dat.AnimationDatError:
+            pass
+        assert not os.path.exists(os.path.join(temp_dir, "wrong.dat.tmp"))
+
+
+def test_validator_and_info():
+    """Test validate_dat_file and get_dat_file_info understand animations"""
+    print("🧪 Testing .dat validation of animations...")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "dot.dat")
+        frames = list(moving_dot_frames(32, 32, 40))  # 120 KB raw, above the flat-frame cap
+        animation_dat.write_animation(path, frames, 32, 32, encoding="delta")
+        is_valid, message = utils.validate_dat_file(path)
+        assert is_valid, message
+        assert "32x32" in message and "40 frames" in message
+        print(f"  ✅ {message}")
+
+        info = utils.get_dat_file_info(path)
+        assert info["format"] == "animation" and info["frame_count"] == 40
+        assert info["matrix_size"] == "32x32" and info["encoding"] == "delta"
+        assert info["rgb_values"][0] == (255, 255, 255)  # The dot starts at LED 0
+        assert info["rgb_values"][1] == tuple(frames[0][0, 1])
+
+        # Corrupt a delta span so decoding runs past the frame
+        with open(path, "r+b") as f:
+            reader = animation_dat.AnimationReader(path)
+            offset, length, kind = reader.entry(1)
+            reader.close()
+            f.seek(offset)
+            f.write(b"\xff\x7f")
+        is_valid, message = utils.validate_dat_file(path)
+        assert not is_valid and "Invalid animation" in message
+
+        assert utils.get_dat_file_info("SampleFirmware/heart_8x8.dat")["format"] == "frame"
+
+
+if __name__ == "__main__":
+    test_round_trip_and_seek()
+    test_header_and_index_checks()
+    test_validator_and_info()
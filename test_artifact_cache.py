@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test script for the processed-file artifact cache
+"""
+
+import os
+import tempfile
+
+import artifact_cache
+import config
+import fs_image
+import upload_pipeline
+import utils
+
+
+def write_file(path, content):
+    with open(path, "wb") as f:
+        f.write(content)
+    return path
+
+
+def test_hit_after_first_build():
+    """Test a repeat build of an unchanged source reuses the artifact"""
+    print("🧪 Testing artifact cache hits...")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = artifact_cache.ArtifactCache(os.path.join(temp_dir, "cache"))
+        hex_file = os.path.join(temp_dir, "app.hex")
+        with open(hex_file, "w") as f:
+            f.write(":100000000102030405060708090A0B0C0D0E0F1068\n:00000001FF\n")
+
+        builds = []
+
+        def build(output):
+            builds.append(output)
+            return utils.convert_hex_to_bin(hex_file, output)
+
+        success, first_path, _, hit = cache.get_or_build(hex_file, "intel_hex", "1", {}, build, ".bin")
+        assert success and not hit
+        success, second_path, _, hit = cache.get_or_build(hex_file, "intel_hex", "1", {}, build, ".bin")
+        assert success and hit and second_path == first_path
+        assert len(builds) == 1
+        with open(second_path, "rb") as f:
+            assert f.read() == bytes(range(1, 17))
+
+        # Different converter version or parameters must rebuild
+        cache.get_or_build(hex_file, "intel_hex", "2", {}, build, ".bin")
+        cache.get_or_build(hex_file, "intel_hex", "1", {"fill": 0}, build, ".bin")
+        assert len(builds) == 3
+        assert cache.stats() == "1 hit(s), 3 miss(es)"
+        assert not any(name.startswith(".") for name in os.listdir(cache.cache_dir)), "Temp files left behind"
+        print(f"  ✅ {cache.stats()}")
+
+
+def test_source_change_invalidates():
+    """Test editing the source produces a new key"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = artifact_cache.ArtifactCache(os.path.join(temp_dir, "cache"))
+        source = write_file(os.path.join(temp_dir, "pattern.dat"), b"\x00" * 192)
+        first_key = cache.make_key(source, "copy", "1")
+        write_file(source, b"\x01" * 192)
+        os.utime(source, ns=(0, 1))  # Force a distinct mtime
+        assert cache.make_key(source, "copy", "1") != first_key
+
+
+def test_failed_build_is_not_cached():
+    """Test failures leave nothing in the cache"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = artifact_cache.ArtifactCache(os.path.join(temp_dir, "cache"))
+        source = write_file(os.path.join(temp_dir, "bad.hex"), b"garbage")
+        success, path, message, hit = cache.get_or_build(
+            source, "intel_hex", "1", {}, lambda output: utils.convert_hex_to_bin(source, output), ".bin")
+        assert not success and not hit
+        assert os.listdir(cache.cache_dir) == []
+
+
+def test_lru_eviction():
+    """Test the least recently used artifacts are evicted past the size cap"""
+    print("🧪 Testing artifact cache eviction...")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = artifact_cache.ArtifactCache(os.path.join(temp_dir, "cache"), max_bytes=2500)
+        sources = {}
+        paths = {}
+
+        def build_copy(source):
+            def build(output):
+                with open(source, "rb") as src, open(output, "wb") as dst:
+                    dst.write(src.read())
+                return True, output, "copied"
+            return build
+
+        for index in range(3):
+            sources[index] = write_file(os.path.join(temp_dir, f"src{index}.dat"), bytes([index]) * 1000)
+
+        for index in range(2):
+            paths[index] = cache.get_or_build(sources[index], "copy", "1", {}, build_copy(sources[index]))[1]
+            # Old, distinct access times so LRU order is deterministic
+            os.utime(paths[index], (index + 1, index + 1))
+
+        # A hit on the first artifact makes the second the least recently used
+        assert cache.get_or_build(sources[0], "copy", "1", {}, build_copy(sources[0]))[3]
+        paths[2] = cache.get_or_build(sources[2], "copy", "1", {}, build_copy(sources[2]))[1]
+
+        assert os.path.exists(paths[0]) and os.path.exists(paths[2])
+        assert not os.path.exists(paths[1])
+        assert cache.total_size() <= 2500
+        print("  ✅ Least recently used artifact evicted")
+
+
+def test_fs_builder_version():
+    """Test filesystem artifacts are keyed on the external builder's version"""
+    print("🧪 Testing filesystem builder versions...")
+
+    class StubRegistry:
+        def lookup(self, name):
+            assert name == "fs_builder"
+            return {"command": "mkspiffs", "version": "mkspiffs ver. 0.2.3"}
+
+    pipeline = upload_pipeline.UploadPipeline("ESP8266", "115200", upload_pipeline.MODE_FILESYSTEM)
+    original_filesystem = config.FS_IMAGE_CONFIG["filesystem"]
+    original_registry = utils._tool_registry
+    try:
+        assert pipeline.get_fs_builder_version() == fs_image.BUILDER_VERSION
+        config.FS_IMAGE_CONFIG["filesystem"] = "spiffs"
+        utils._tool_registry = StubRegistry()
+        assert pipeline.get_fs_builder_version() == "mkspiffs ver. 0.2.3"
+    finally:
+        config.FS_IMAGE_CONFIG["filesystem"] = original_filesystem
+        utils._tool_registry = original_registry
+    print("  ✅ External builder version used in the cache key")
+
+
+def test_uncached_build_is_removed():
+    """Test a processed file built without the cache is deleted by cleanup()"""
+    print("🧪 Testing uncached processed files are cleaned up...")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = write_file(os.path.join(temp_dir, "pattern.dat"), b"\x10" * 192)
+        pipeline = upload_pipeline.UploadPipeline("ESP8266", "115200", upload_pipeline.MODE_FILESYSTEM)
+        processed = pipeline.process_file(source)
+        assert processed and processed != source and os.path.exists(processed)
+        pipeline.cleanup()
+        assert not os.path.exists(processed), "Temp .bin left behind"
+        assert pipeline.temp_files == []
+    print("  ✅ Temp image removed after flashing")
+
+
+if __name__ == "__main__":
+    test_hit_after_first_build()
+    test_source_change_invalidates()
+    test_failed_build_is_not_cached()
+    test_lru_eviction()
+    test_fs_builder_version()
+    test_uncached_build_is_removed()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming .dat validation statistics
+"""
+
+import hashlib
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import animation_dat
+import config
+import dat_stats
+import pattern_library
+import utils
+
+
+def make_frames(count=50, size=32):
+    """Rainbow frames with every tenth frame black"""
+    frames = np.repeat(pattern_library.rainbow(size, size)[np.newaxis], count, axis=0)
+    frames[::10] = 0
+    return frames
+
+
+def expected_stats(frames):
+    pixels = frames.reshape(-1, 3)
+    return {
+        "channel_min": pixels.min(axis=0).tolist(),
+        "channel_max": pixels.max(axis=0).tolist(),
+        "channel_mean": pixels.mean(axis=0).round(2).tolist(),
+        "black_frames": int((frames.reshape(len(frames), -1).max(axis=1) == 0).sum())
+    }
+
+
+def test_flat_frames_across_chunks():
+    """Test frames split across chunk reads give the same statistics as numpy on the whole file"""
+    print("🧪 Testing chunked frame statistics...")
+    frames = make_frames()
+    frame_size = frames[0].size
+    original_chunk = config.DAT_VALIDATION_CONFIG["chunk_kb"]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "frames.dat")
+        with open(path, "wb") as f:
+            f.write(frames.tobytes())
+        try:
+            config.DAT_VALIDATION_CONFIG["chunk_kb"] = 1  # Smaller than one 3 KB frame
+            stats = dat_stats.scan_dat_file(path, frame_size)
+        finally:
+            config.DAT_VALIDATION_CONFIG["chunk_kb"] = original_chunk
+        for key, value in expected_stats(frames).items():
+            assert stats[key] == value, key
+        assert stats["frame_count"] == 50 and stats["black_frame_indices"] == [0, 10, 20, 30, 40]
+        assert stats["matrix_size"] == "32x32"
+        with open(path, "rb") as f:
+            assert stats["digest"] == hashlib.sha256(f.read()).hexdigest()
+    print(f"  ✅ {stats['frame_count']} frames, brightness {stats['brightness']}%")
+
+
+def test_animation_matches_flat():
+    """Test an animation container reports the same pixel statistics as its raw frames"""
+    frames = make_frames(count=30, size=16)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "anim.dat")
+        animation_dat.write_animation(path, frames, 16, 16, encoding="xor")
+        stats = dat_stats.scan_dat_file(path)
+        with open(path, "rb") as f:
+            assert stats["digest"] == hashlib.sha256(f.read()).hexdigest()
+    for key, value in expected_stats(frames).items():
+        assert stats[key] == value, key
+    assert stats["format"] == "animation" and stats["frame_count"] == 30
+    assert stats["rgb_values"][0] == (0, 0, 0)  # Frame 0 is black
+
+
+def test_large_file_without_cap():
+    """Test multi-megabyte files validate in one streaming pass"""
+    print("🧪 Testing a 3 MB pattern file...")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "big.dat")
+        with open(path, "wb") as f:
+            f.write(pattern_library.generate("rainbow", 1024, 1024))
+        start = time.perf_counter()
+        is_valid, large_message = utils.validate_dat_file(path)
+        elapsed = time.perf_counter() - start
+        assert is_valid and "1024x1024" in large_message, large_message
+
+        black_path = os.path.join(temp_dir, "black.dat")
+        with open(black_path, "wb") as f:
+            f.write(b"\x00" * 192)
+        is_valid, message = utils.validate_dat_file(black_path)
+        assert is_valid and "all LEDs are off" in message
+    print(f"  ✅ {large_message} in {elapsed * 1000:.0f} ms")
+
+
+def test_multi_frame_flat_file():
+    """Test flat files of several matrix frames are split by the configured matrix sizes"""
+    print("🧪 Testing multi-frame flat files...")
+    assert dat_stats.infer_frame_size(192) == 192
+    assert dat_stats.infer_frame_size(192 * 3) == 192
+    assert dat_stats.infer_frame_size(3 * 7) is None
+    # Several sizes fit: no guess unless the matrix is configured
+    assert dat_stats.frame_size_candidates(768 * 2) == [192, 768]
+    assert dat_stats.infer_frame_size(768 * 2) is None
+    assert dat_stats.infer_frame_size(192 * 60000) is None
+    original_matrix = config.DAT_VALIDATION_CONFIG["matrix_size"]
+    try:
+        config.DAT_VALIDATION_CONFIG["matrix_size"] = "16x16"
+        assert dat_stats.infer_frame_size(768 * 2) == 768
+        config.DAT_VALIDATION_CONFIG["matrix_size"] = "8x8"
+        assert dat_stats.infer_frame_size(192 * 60000) == 192
+        assert dat_stats.infer_frame_size(100 * 3) is None
+    finally:
+        config.DAT_VALIDATION_CONFIG["matrix_size"] = original_matrix
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "frames.dat")
+        with open(path, "wb") as f:
+            f.write(bytes(pattern_library.generate("heart")) + b"\x00" * 192 * 2)
+        is_valid, message = utils.validate_dat_file(path)
+        assert is_valid and "8x8" in message and "3 frames" in message, message
+        info = utils.get_dat_file_info(path)
+        assert info["frame_count"] == 3 and info["black_frames"] == 2
+    print(f"  ✅ {message}")
+
+
+def test_ambiguous_frame_size():
+    """Test a file that is four 8x8 frames or one 16x16 frame is reported as ambiguous"""
+    print("🧪 Testing ambiguous flat files...")
+    original_matrix = config.DAT_VALIDATION_CONFIG["matrix_size"]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "frames.dat")
+        with open(path, "wb") as f:
+            f.write(bytes(pattern_library.generate("heart")) + b"\x00" * 192 * 3)
+        is_valid, message = utils.validate_dat_file(path)
+        assert is_valid and "ambiguous (8x8 / 16x16)" in message, message
+        assert utils.get_dat_file_info(path)["frame_count"] == 1
+        try:
+            config.DAT_VALIDATION_CONFIG["matrix_size"] = "8x8"
+            is_valid, configured_message = utils.validate_dat_file(path)
+            info = utils.get_dat_file_info(path)
+        finally:
+            config.DAT_VALIDATION_CONFIG["matrix_size"] = original_matrix
+        assert is_valid and "8x8 matrix, 4 frames" in configured_message, configured_message
+        assert "ambiguous" not in configured_message
+        assert info["black_frames"] == 3 and info["ambiguous_frame_sizes"] == []
+    print(f"  ✅ {message}")
+
+
+if __name__ == "__main__":
+    test_flat_frames_across_chunks()
+    test_animation_matches_flat()
+    test_large_file_without_cap()
+    test_multi_frame_flat_file()
+    test_ambiguous_frame_size()
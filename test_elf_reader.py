@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test script for the built-in ELF segment reader
+Builds small ELF32 files in memory so no toolchain is required
+"""
+
+import os
+import struct
+import tempfile
+
+import elf_reader
+import upload_pipeline
+import utils
+
+
+def build_elf(segments, entry=0x08000101, machine=0x28, endian="<"):
+    """Build an ELF32 file from (p_type, paddr, data, memsz) tuples"""
+    phoff = 52
+    data_offset = phoff + 32 * len(segments)
+    header = elf_reader.ELF_MAGIC + bytes([elf_reader.ELFCLASS32,
+                                           elf_reader.ELFDATA2LSB if endian == "<" else elf_reader.ELFDATA2MSB,
+                                           1]) + b"\x00" * 9
+    header += struct.pack(endian + "HHIIIIIHHHHHH", 2, machine, 1, entry, phoff, 0, 0, 52, 32,
+                          len(segments), 40, 0, 0)
+    program_headers = b""
+    payload = b""
+    for p_type, paddr, data, memsz in segments:
+        program_headers += struct.pack(endian + "IIIIIIII", p_type, data_offset + len(payload),
+                                       paddr | 0x20000000, paddr, len(data), memsz, 5, 4)
+        payload += data
+    return header + program_headers + payload
+
+
+def write_temp(temp_dir, name, content):
+    path = os.path.join(temp_dir, name)
+    with open(path, "wb") as f:
+        f.write(content)
+    return path
+
+
+def test_load_segments():
+    """Test PT_LOAD segments, physical addresses and entry point are extracted"""
+    print("🧪 Testing ELF segment extraction...")
+    vectors = bytes(range(64))
+    text = b"\x00\xbf" * 512
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = write_temp(temp_dir, "app.elf", build_elf([
+            (elf_reader.PT_LOAD, 0x08004000, text, len(text)),
+            (elf_reader.PT_LOAD, 0x08000000, vectors, len(vectors)),
+            (elf_reader.PT_LOAD, 0x20000000, b"", 0x400),  # .bss has nothing to flash
+            (4, 0x0, b"NOTE", 4),                        # PT_NOTE is ignored
+        ]))
+        image = elf_reader.load_elf(path)
+
+    assert image.segments == [(0x08000000, vectors), (0x08004000, text)]
+    assert image.entry == 0x08000101
+    assert image.machine == "ARM"
+    assert image.data_size == len(vectors) + len(text)
+    print(f"  ✅ {len(image.segments)} segments, entry 0x{image.entry:08X}")
+
+
+def test_big_endian():
+    """Test big-endian ELF files are read correctly"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = write_temp(temp_dir, "be.elf", build_elf(
+            [(elf_reader.PT_LOAD, 0x1000, b"\xde\xad\xbe\xef", 4)], entry=0x1000, machine=0x08, endian=">"))
+        image = elf_reader.load_elf(path)
+    assert image.segments == [(0x1000, b"\xde\xad\xbe\xef")]
+    assert image.machine == "MIPS"
+
+
+def test_rejects_invalid_files():
+    """Test non-ELF, 64-bit and truncated files raise ElfError"""
+    print("🧪 Testing invalid ELF detection...")
+    truncated = build_elf([(elf_reader.PT_LOAD, 0x0, b"\x00" * 64, 64)])[:-10]
+    elf64 = bytearray(build_elf([]))
+    elf64[4] = 2
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name, content in [("text.elf", b"not an elf file at all" * 4), ("elf64.elf", bytes(elf64)),
+                              ("truncated.elf", truncated), ("empty.elf", b"")]:
+            try:
+                elf_reader.load_elf(write_temp(temp_dir, name, content))
+            except elf_reader.ElfError as e:
+                print(f"  ✅ {name}: {e}")
+                continue
+            raise AssertionError(f"{name} should have been rejected")
+
+
+def esp8266_elf():
+    """Xtensa ELF with two touching IRAM segments, DRAM data and an IROM segment"""
+    return build_elf([
+        (elf_reader.PT_LOAD, 0x40100000, b"\x11" * 6, 6),           # Padded to 8, touches the next one
+        (elf_reader.PT_LOAD, 0x40100008, b"\x22" * 8, 8),
+        (elf_reader.PT_LOAD, 0x3FFE8000, b"\x33" * 5, 5),
+        (elf_reader.PT_LOAD, 0x3FFE9000, b"", 0x100),              # .bss
+        (elf_reader.PT_LOAD, 0x40210000, b"\x44" * 32, 32),
+    ], entry=0x40100004, machine=0x5E)
+
+
+def test_esp8266_flash_layout():
+    """Test ESP8266 ELFs get the same flash layout as esptool elf2image"""
+    print("🧪 Testing ESP8266 ELF flash layout...")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        image = elf_reader.load_elf(write_temp(temp_dir, "app.elf", esp8266_elf()))
+        segments = elf_reader.esp8266_flash_segments(image)
+        assert [address for address, _ in segments] == [0x0, 0x10000]
+        assert segments[1][1] == b"\x44" * 32
+        assert len(segments[0][1]) % 16 == 0 and segments[0][1][:2] == b"\xe9\x02"
+
+        try:
+            from esptool.bin_image import ESP8266ROMFirmwareImage, ImageSegment
+        except ImportError:
+            print("  ⏭ esptool not installed, layout not compared")
+            return
+        reference = ESP8266ROMFirmwareImage()
+        reference.entrypoint = image.entry
+        reference.flash_size_freq = elf_reader.ESP8266_FLASH_SIZE_FREQ
+        reference.segments = [ImageSegment(address, bytes(data)) for address, data in image.segments]
+        reference.merge_adjacent_segments()
+        basename = os.path.join(temp_dir, "ref-")
+        reference.save(basename)
+        for address, data in segments:
+            with open(f"{basename}0x{address:05x}.bin", "rb") as f:
+                assert f.read() == data, f"0x{address:05x} differs from elf2image"
+    print(f"  ✅ {len(segments)} flash segments match elf2image")
+
+
+def test_file_type_info():
+    """Test ELF files are flashed in memory on ESP8266 and refused on ESP32"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = write_temp(temp_dir, "app.elf", esp8266_elf())
+        info = utils.get_file_type_info(path)
+        assert info["status"] == "can_convert"
+        assert utils.validate_firmware_file(path, "ESP8266")[0]
+        assert not utils.validate_firmware_file(path, "ESP32")[0]
+        assert upload_pipeline.UploadPipeline("ESP32", "115200").process_file(path) is None, \
+            "ESP32 uploads must not take raw ELF load addresses"
+        pipeline = upload_pipeline.UploadPipeline("ESP8266", "115200")
+        if pipeline.inprocess:
+            assert pipeline.process_file(path) == path
+            assert [address for address, _ in pipeline.load_flash_segments(path)] == [0x0, 0x10000]
+
+
+if __name__ == "__main__":
+    test_load_segments()
+    test_big_endian()
+    test_rejects_invalid_files()
+    test_esp8266_flash_layout()
+    test_file_type_info()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Test script for the in-process ESP flash engine
+Uses a simulated esptool loader so no hardware is required
+"""
+
+import hashlib
+import zlib
+
+import esp_flasher
+
+
+class SimulatedLoader:
+    """Minimal stand-in for an esptool stub loader backed by a bytearray"""
+    CHIP_NAME = "ESP8266"
+    IS_STUB = True
+    FLASH_WRITE_SIZE = 0x4000
+    FLASH_SECTOR_SIZE = 0x1000
+    CHIP_DETECT_MAGIC_REG_ADDR = 0x40001000
+
+    def __init__(self, flash_size=0x100000):
+        self.flash = bytearray(b"\xff" * flash_size)
+        self.write_offset = 0
+        self.decompressor = None
+        self.md5_calls = 0
+        self.blocks_written = 0
+
+    def flash_defl_begin(self, size, compsize, offset):
+        # Like the real loader, erase every sector the write touches
+        start = offset - offset % self.FLASH_SECTOR_SIZE
+        end = -(-(offset + size) // self.FLASH_SECTOR_SIZE) * self.FLASH_SECTOR_SIZE
+        self.flash[start:end] = b"\xff" * (end - start)
+        self.write_offset = offset
+        self.decompressor = zlib.decompressobj()
+
+    def flash_defl_block(self, data, seq, timeout=None):
+        chunk = self.decompressor.decompress(data)
+        self.flash[self.write_offset:self.write_offset + len(chunk)] = chunk
+        self.write_offset += len(chunk)
+        self.blocks_written += 1
+
+    def read_reg(self, addr, timeout=None):
+        return 0
+
+    def flash_md5sum(self, addr, size):
+        self.md5_calls += 1
+        return hashlib.md5(bytes(self.flash[addr:addr + size])).hexdigest()
+
+    def get_chip_description(self):
+        return "ESP8266EX"
+
+    def read_mac(self):
+        return b"\x24\x0a\xc4\x12\x34\x56"
+
+    def flash_begin(self, size, offset):
+        pass
+
+    def flash_defl_finish(self, reboot=False):
+        pass
+
+    def hard_reset(self):
+        pass
+
+
+def create_engine(loader, events=None):
+    """Create an engine that talks to a simulated loader"""
+    engine = esp_flasher.ESPFlashEngine(
+        "SIM", 921600, chip="esp8266",
+        progress_callback=(lambda phase, done, total: events.append((phase, done, total))) if events is not None else None)
+    engine.esp = loader
+    return engine
+
+
+def test_chip_mapping():
+    """Test device names map to esptool chip names"""
+    print("🧪 Testing esptool chip mapping...")
+    assert esp_flasher.get_esptool_chip("ESP8266") == "esp8266"
+    assert esp_flasher.get_esptool_chip("ESP32-S3") == "esp32s3"
+    assert esp_flasher.get_esptool_chip("AVR") == "auto"
+    print("  ✅ Chip mapping correct")
+
+
+def test_write_and_verify():
+    """Test a compressed write lands in flash and verifies by MD5"""
+    print("🧪 Testing in-process write and verify...")
+    loader = SimulatedLoader()
+    events = []
+    engine = create_engine(loader, events)
+
+    image = bytes(range(256)) * 200  # 51200 bytes
+    written = engine.write_flash(0x1000, image)
+    assert written == len(image)
+    assert bytes(loader.flash[0x1000:0x1000 + len(image)]) == image
+    assert engine.verify_flash(0x1000, image)
+
+    write_events = [e for e in events if e[0] == "write"]
+    assert write_events, "No write progress reported"
+    assert write_events[-1][1] == write_events[-1][2] == len(image)
+    print(f"  ✅ Wrote {written} bytes with {len(write_events)} progress callbacks")
+
+
+def test_verify_detects_mismatch():
+    """Test verification fails when flash differs from the image"""
+    print("🧪 Testing verification mismatch...")
+    loader = SimulatedLoader()
+    engine = create_engine(loader)
+    image = b"\x12\x34\x56\x78" * 1024
+    engine.write_flash(0, image)
+    loader.flash[100] ^= 0xFF
+    assert not engine.verify_flash(0, image)
+    print("  ✅ Mismatch detected")
+
+
+def test_delta_write_skips_unchanged_sectors():
+    """Test delta mode only rewrites sectors that differ on the device"""
+    print("🧪 Testing delta flashing...")
+    loader = SimulatedLoader()
+    engine = create_engine(loader)
+    old_image = bytes(range(256)) * 256  # 64KB, 16 sectors
+    engine.write_flash(0x10000, old_image)
+
+    new_image = bytearray(old_image)
+    new_image[0x2010] ^= 0xFF           # sector 2
+    new_image[0x3000] ^= 0xFF           # sector 3 (joins the same run)
+    new_image[0xF000:0xF004] = b"JTEC"  # sector 15
+    loader.blocks_written = 0
+
+    written = engine.write_flash_delta(0x10000, bytes(new_image))
+    assert written == 3 * 0x1000, f"Expected 3 sectors written, got {written} bytes"
+    assert bytes(loader.flash[0x10000:0x10000 + len(new_image)]) == bytes(new_image)
+    assert loader.blocks_written == 2, "Adjacent changed sectors should be written as one run"
+
+    loader.md5_calls = 0
+    assert engine.write_flash_delta(0x10000, bytes(new_image)) == 0
+    assert loader.md5_calls == 16
+    print(f"  ✅ Wrote {written} of {len(new_image)} bytes, identical image wrote nothing")
+
+
+def test_delta_write_unaligned_falls_back():
+    """Test delta mode writes the full image when the address isn't sector aligned"""
+    print("🧪 Testing delta fallback...")
+    loader = SimulatedLoader()
+    engine = create_engine(loader)
+    image = b"\xAA" * 0x2000
+    assert engine.write_flash_delta(0x100, image) == len(image)
+    assert loader.md5_calls == 0
+    print("  ✅ Unaligned delta wrote full image")
+
+
+def test_coalesce_segments():
+    """Test only segments sharing a sector are merged"""
+    print("🧪 Testing segment coalescing...")
+    segments = [(0x2000, b"\x02" * 16), (0x0, b"\x01" * 8), (0x2100, b"\x03" * 4), (0x100000, b"\x04" * 4)]
+    merged = esp_flasher.coalesce_segments(segments)
+    assert [address for address, _ in merged] == [0x0, 0x2000, 0x100000]
+    assert merged[1][1] == b"\x02" * 16 + b"\xff" * (0x100 - 16) + b"\x03" * 4
+    print(f"  ✅ {len(segments)} segments -> {len(merged)} writes")
+
+
+def test_write_segments_skips_gaps():
+    """Test sparse segments are written without padding the gaps"""
+    print("🧪 Testing sparse segment writes...")
+    loader = SimulatedLoader()
+    loader.flash[0x8000:0x9000] = b"\x55" * 0x1000  # Data in the gap must survive
+    engine = create_engine(loader)
+    bootloader = b"\xB0" * 0x1000
+    app = bytes(range(256)) * 16
+    written = engine.write_segments([(0x0, bootloader), (0x10000, app), (0x10000 + len(app) + 8, b"TAIL")])
+
+    assert written < 0x3000, f"Gap was written ({written} bytes)"
+    assert bytes(loader.flash[0x8000:0x9000]) == b"\x55" * 0x1000
+    assert engine.verify_segments([(0x0, bootloader), (0x10000, app)])
+    assert bytes(loader.flash[0x10000 + len(app) + 8:0x10000 + len(app) + 12]) == b"TAIL"
+    print(f"  ✅ Wrote {written} bytes for a 0x{0x10000 + len(app) + 12:x} byte span")
+
+
+def test_segments_outside_flash_rejected():
+    """Test a segment past the end of flash is refused before anything is written"""
+    print("🧪 Testing flash bounds check...")
+    loader = SimulatedLoader()
+    engine = create_engine(loader)
+    engine.flash_size = "1MB"
+    # ELF load addresses such as the ESP8266 IROM mapping are not flash offsets
+    segments = [(0x0, b"\x01" * 16), (0x40201000, b"\x02" * 16)]
+    try:
+        engine.write_segments(segments)
+    except esp_flasher.ESPFlashError as e:
+        assert "0x40201000" in str(e)
+        assert loader.blocks_written == 0, "Nothing should be written"
+        print("  ✅ ESPFlashError raised, flash untouched")
+        return
+    raise AssertionError("Out-of-range segment should be rejected")
+
+
+def test_requires_connection():
+    """Test operations refuse to run without a session"""
+    print("🧪 Testing unconnected engine...")
+    engine = esp_flasher.ESPFlashEngine("SIM")
+    try:
+        engine.write_flash(0, b"\x00" * 4)
+    except esp_flasher.ESPFlashError:
+        print("  ✅ ESPFlashError raised")
+        return
+    raise AssertionError("write_flash should fail without a connection")
+
+
+def test_failed_connect_closes_port():
+    """Test a failure after the port opens (stub upload) releases the port"""
+    from esptool.targets import CHIP_DEFS
+    from esptool.util import FatalError
+
+    class FakePort:
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    opened = []
+
+    class FailingStubLoader(SimulatedLoader):
+        IS_STUB = False
+        secure_download_mode = False
+        stub_is_disabled = False
+
+        def __init__(self, port, baud, trace):
+            super().__init__()
+            self._port = FakePort()
+            opened.append(self)
+
+        def connect(self, mode, attempts):
+            pass
+
+        def run_stub(self):
+            raise FatalError("Failed to start stub")
+
+    original = CHIP_DEFS["esp8266"]
+    CHIP_DEFS["esp8266"] = FailingStubLoader
+    try:
+        engine = esp_flasher.ESPFlashEngine("SIM", 115200, chip="esp8266")
+        try:
+            engine.connect()
+            raise AssertionError("connect should fail when the stub can't start")
+        except esp_flasher.ESPFlashError:
+            pass
+    finally:
+        CHIP_DEFS["esp8266"] = original
+    assert opened and opened[0]._port.closed and engine.esp is None
+
+
+if __name__ == "__main__":
+    test_chip_mapping()
+    test_write_and_verify()
+    test_verify_detects_mismatch()
+    test_delta_write_skips_unchanged_sectors()
+    test_delta_write_unaligned_falls_back()
+    test_coalesce_segments()
+    test_write_segments_skips_gaps()
+    test_segments_outside_flash_rejected()
+    test_requires_connection()
+    test_failed_connect_closes_port()
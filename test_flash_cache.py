@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test script for the skip-if-identical flash cache
+Uses a simulated esptool loader so no hardware is required
+"""
+
+import os
+import tempfile
+import time
+
+import flash_cache
+from test_esp_flasher import SimulatedLoader, create_engine
+
+
+def test_lookup_and_record():
+    """Test entries match on MAC, offset and image digest"""
+    print("🧪 Testing flash cache lookup...")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "flash_cache.json")
+        cache = flash_cache.FlashCache(path)
+        image = b"firmware" * 100
+
+        assert cache.lookup("24:0a:c4:12:34:56", 0x0, image) is None
+        cache.record("24:0A:C4:12:34:56", 0x0, image, chip="ESP8266")
+
+        # Reload from disk to check persistence
+        cache = flash_cache.FlashCache(path)
+        assert cache.lookup("24:0a:c4:12:34:56", 0x0, image)["chip"] == "ESP8266"
+        assert cache.lookup("24:0a:c4:12:34:56", 0x1000, image) is None
+        assert cache.lookup("24:0a:c4:12:34:57", 0x0, image) is None
+        assert cache.lookup("24:0a:c4:12:34:56", 0x0, image + b"!") is None
+        print("  ✅ Cache hits only for the same chip, offset and image")
+
+
+def test_eviction():
+    """Test the cache is bounded by entry count and age"""
+    print("🧪 Testing flash cache eviction...")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = flash_cache.FlashCache(os.path.join(temp_dir, "flash_cache.json"),
+                                       max_entries=3, max_age_days=1)
+        for i in range(5):
+            cache.record(f"00:00:00:00:00:0{i}", 0x0, b"image")
+        assert len(cache.entries) == 3
+        assert cache.lookup("00:00:00:00:00:04", 0x0, b"image")
+        assert cache.lookup("00:00:00:00:00:00", 0x0, b"image") is None
+
+        # Age out an entry
+        key = next(iter(cache.entries))
+        cache.entries[key]["timestamp"] = time.time() - 2 * 86400
+        cache.record("00:00:00:00:00:09", 0x0, b"image")
+        assert key not in cache.entries
+        print("  ✅ Oldest and expired entries evicted")
+
+
+def test_flash_image_skips_identical():
+    """Test a second flash of the same image only costs one MD5"""
+    print("🧪 Testing skip-if-identical flashing...")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = flash_cache.FlashCache(os.path.join(temp_dir, "flash_cache.json"))
+        image = bytes(range(256)) * 64
+
+        loader = SimulatedLoader()
+        assert create_engine(loader).flash_image(0x0, image, cache=cache)
+        assert loader.blocks_written > 0
+
+        loader.blocks_written = 0
+        loader.md5_calls = 0
+        assert create_engine(loader).flash_image(0x0, image, cache=cache)
+        assert loader.blocks_written == 0, "Identical image should not be rewritten"
+        assert loader.md5_calls == 1
+
+        # Flash changed behind the cache's back - must be rewritten
+        loader.flash[10] ^= 0xFF
+        assert create_engine(loader).flash_image(0x0, image, cache=cache)
+        assert loader.blocks_written > 0
+        assert bytes(loader.flash[:len(image)]) == image
+        print("  ✅ Identical image skipped, modified flash rewritten")
+
+
+if __name__ == "__main__":
+    test_lookup_and_record()
+    test_eviction()
+    test_flash_image_skips_identical()
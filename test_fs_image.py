@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test script for the built-in LittleFS image builder
+Uses littlefs-python to mount the image when it is installed
+"""
+
+import os
+import tempfile
+
+import fs_image
+import utils
+
+try:
+    import littlefs
+except ImportError:
+    littlefs = None
+
+
+def test_superblock_layout():
+    """Test the root metadata block carries the LittleFS superblock"""
+    print("🧪 Testing LittleFS superblock...")
+    image = fs_image.build_littlefs_image({"pattern.dat": b"\x01" * 192}, 64 * 1024)
+    assert len(image) == 64 * 1024
+    assert image[:4] == (1).to_bytes(4, "little")    # Revision
+    # Revision, CREATE tag, SUPERBLOCK tag, then the magic
+    assert image[12:20] == b"littlefs"
+    block_size, block_count = (int.from_bytes(image[28 + i:32 + i], "little") for i in (0, 4))
+    assert (block_size, block_count) == (4096, 16)
+    assert image[4096:8192] == b"\xff" * 4096          # Second metadata block left erased
+    print("  ✅ Superblock found in block 0")
+
+
+def test_ctz_layout():
+    """Test large files are stored as a CTZ skip-list after the metadata pair"""
+    block_size = 512
+    data = bytes(range(256)) * 20
+    blocks = fs_image._ctz_blocks(data, block_size, 2)
+    assert blocks[0] == data[:block_size]
+    # Block 2 points back to blocks 1 and 0 of the file (absolute blocks 3 and 2)
+    assert blocks[2][:8] == (3).to_bytes(4, "little") + (2).to_bytes(4, "little")
+    assert b"".join(block[4 * (fs_image._ctz(i) + 1) if i else 0:] for i, block in enumerate(blocks)) == data
+
+
+def test_rejects_oversized_content():
+    """Test files that don't fit raise FsImageError"""
+    print("🧪 Testing filesystem capacity checks...")
+    for files, size in [({"big.dat": b"\x00" * 40000}, 32 * 1024), ({"bad/name.dat": b"\x00"}, 32 * 1024)]:
+        try:
+            fs_image.build_littlefs_image(files, size)
+        except fs_image.FsImageError as e:
+            print(f"  ✅ {e}")
+            continue
+        raise AssertionError("Image should have been rejected")
+
+
+def test_mount_with_littlefs():
+    """Test the image mounts and reads back with the reference implementation"""
+    if littlefs is None:
+        print("⚠ littlefs-python not installed, skipping mount test")
+        return
+    print("🧪 Testing LittleFS mount...")
+    files = {"pattern.dat": os.urandom(70000), "small.dat": b"hello", "exact.dat": os.urandom(4096)}
+    for block_size, page_size in [(4096, 256), (8192, 128)]:
+        image = fs_image.build_littlefs_image(files, 1024 * 1024, block_size, page_size)
+        fs = littlefs.LittleFS(block_size=block_size, block_count=len(image) // block_size,
+                               read_size=page_size, prog_size=page_size, mount=False)
+        fs.context.buffer[:] = image
+        fs.mount()
+        assert sorted(fs.listdir("/")) == sorted(files)
+        for name, data in files.items():
+            with fs.open(name, "rb") as f:
+                assert f.read() == data, name
+    print("  ✅ All files read back")
+
+
+def test_create_fs_image_offline():
+    """Test utils.create_fs_image needs no external builder"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        dat_path = os.path.join(temp_dir, "pattern.dat")
+        with open(dat_path, "wb") as f:
+            f.write(b"\x10\x20\x30" * 64)
+        success, output_path, message = utils.create_fs_image(dat_path, 1)
+        assert success, message
+        assert os.path.getsize(output_path) == 1024 * 1024
+        assert utils.get_file_type_info(dat_path)["status"] == "can_create_fs"
+
+
+if __name__ == "__main__":
+    test_superblock_layout()
+    test_ctz_layout()
+    test_rejects_oversized_content()
+    test_mount_with_littlefs()
+    test_create_fs_image_offline()
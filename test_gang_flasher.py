@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Test script for gang programming
+Uses fake flash functions so no hardware is required
+"""
+
+import sys
+import threading
+import time
+
+import gang_flasher
+import upload_pipeline
+
+
+def test_all_ports_succeed():
+    """Test every port is flashed and reported as success"""
+    print("🧪 Testing gang upload success...")
+    flashed = []
+
+    def flash_port(port, progress_callback, log_callback):
+        progress_callback("write", 1, 2)
+        progress_callback("write", 2, 2)
+        flashed.append(port)
+        return True
+
+    programmer = gang_flasher.GangProgrammer(["COM1", "COM2", "COM3", "COM2"], flash_port, max_workers=2)
+    states = programmer.run()
+
+    assert sorted(flashed) == ["COM1", "COM2", "COM3"], "Duplicate ports should be flashed once"
+    assert all(state["status"] == gang_flasher.STATE_SUCCESS for state in states.values())
+    assert all(state["progress"] == 100.0 for state in states.values())
+    assert programmer.summary() == {gang_flasher.STATE_SUCCESS: 3}
+    print("  ✅ 3 ports flashed")
+
+
+def test_retry_and_failure():
+    """Test a flaky port is retried and a broken port fails after its retries"""
+    print("🧪 Testing gang upload retries...")
+    attempts = {}
+    logs = []
+
+    def flash_port(port, progress_callback, log_callback):
+        attempts[port] = attempts.get(port, 0) + 1
+        if port == "FLAKY" and attempts[port] == 1:
+            raise IOError("Failed to connect")
+        return port != "BROKEN"
+
+    programmer = gang_flasher.GangProgrammer(["FLAKY", "BROKEN"], flash_port, retries=2,
+                                             log_callback=lambda port, message: logs.append((port, message)))
+    states = programmer.run()
+
+    assert states["FLAKY"]["status"] == gang_flasher.STATE_SUCCESS
+    assert states["FLAKY"]["attempts"] == 2
+    assert states["BROKEN"]["status"] == gang_flasher.STATE_FAILED
+    assert states["BROKEN"]["attempts"] == 3
+    assert any(port == "FLAKY" and "Failed to connect" in message for port, message in logs)
+    print("  ✅ Flaky port recovered, broken port failed after 3 attempts")
+
+
+def test_slow_port_does_not_block_others():
+    """Test a stalled port doesn't hold up the rest of the batch"""
+    print("🧪 Testing slow port isolation...")
+    release = threading.Event()
+
+    def flash_port(port, progress_callback, log_callback):
+        if port == "SLOW":
+            release.wait(5)
+        return True
+
+    programmer = gang_flasher.GangProgrammer(["SLOW", "A", "B", "C"], flash_port, max_workers=2)
+    programmer.start()
+
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        states = programmer.snapshot()
+        if all(states[port]["status"] == gang_flasher.STATE_SUCCESS for port in ("A", "B", "C")):
+            break
+        time.sleep(0.01)
+
+    assert programmer.snapshot()["SLOW"]["status"] == gang_flasher.STATE_RUNNING
+    assert not programmer.is_finished()
+    release.set()
+    states = programmer.wait(timeout=5)
+    assert all(state["status"] == gang_flasher.STATE_SUCCESS for state in states.values())
+    print("  ✅ Other ports finished while one was stalled")
+
+
+def test_cancel_skips_queued_ports():
+    """Test cancelling leaves queued ports unflashed"""
+    print("🧪 Testing gang upload cancel...")
+    started = threading.Event()
+    release = threading.Event()
+
+    def flash_port(port, progress_callback, log_callback):
+        started.set()
+        release.wait(5)
+        return True
+
+    programmer = gang_flasher.GangProgrammer(["A", "B", "C"], flash_port, max_workers=1)
+    programmer.start()
+    started.wait(5)
+    programmer.cancel()
+    release.set()
+    states = programmer.wait(timeout=5)
+
+    assert states["A"]["status"] == gang_flasher.STATE_SUCCESS
+    assert states["B"]["status"] == gang_flasher.STATE_CANCELLED
+    assert states["C"]["status"] == gang_flasher.STATE_CANCELLED
+    print("  ✅ Queued ports cancelled")
+
+
+def test_tool_flash_function_progress_timeout_and_cancel():
+    """Test external tool attempts stream progress, time out and can be cancelled"""
+    print("🧪 Testing gang flash with an external tool...")
+    script = {
+        "ok": "import sys, time\nfor p in (10, 50, 100):\n    print(f'Writing | {p}%', flush=True)\n    time.sleep(0.05)",
+        "hang": "import time\nprint('Connecting...', flush=True)\ntime.sleep(30)"
+    }
+
+    def build_command(port):
+        return sys.executable, ["-c", script[port]]
+
+    progress = []
+    flash = upload_pipeline.ToolFlashFunction(build_command, timeout=5)
+    assert flash("ok", lambda phase, done, total: progress.append((phase, done, total)), lambda line: None)
+    assert progress and progress[-1][1] == progress[-1][2], "Progress should reach 100%"
+
+    flash = upload_pipeline.ToolFlashFunction(build_command, timeout=0.5)
+    start = time.monotonic()
+    try:
+        flash("hang", lambda *args: None, lambda line: None)
+        assert False, "A hung tool should time out"
+    except RuntimeError as e:
+        assert "timed out" in str(e)
+    assert time.monotonic() - start < 10
+
+    flash = upload_pipeline.ToolFlashFunction(build_command, timeout=60)
+    programmer = gang_flasher.GangProgrammer(["hang"], flash, retries=3)
+    programmer.start()
+    deadline = time.monotonic() + 5
+    while not flash.processes and time.monotonic() < deadline:
+        time.sleep(0.01)
+    programmer.cancel()
+    states = programmer.wait(timeout=10)
+    assert states["hang"]["status"] == gang_flasher.STATE_CANCELLED
+    assert states["hang"]["attempts"] == 1
+    print("  ✅ Progress streamed, hung tool killed on timeout and on cancel")
+
+
+if __name__ == "__main__":
+    test_all_ports_succeed()
+    test_retry_and_failure()
+    test_slow_port_does_not_block_others()
+    test_cancel_skips_queued_ports()
+    test_tool_flash_function_progress_timeout_and_cancel()
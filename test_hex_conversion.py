@@ -49,6 +49,8 @@ def test_hex_conversion():
     try:
         import shutil
         shutil.rmtree(test_dir)
+        if success:
+            os.remove(output_path)
     except:
         pass
     
@@ -47,6 +47,8 @@ def test_simple_hex():
     try:
         import shutil
         shutil.rmtree(test_dir)
+        if success:
+            os.remove(output_path)
     except:
         pass
     
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test script for the built-in Intel HEX parser
+"""
+
+import os
+import tempfile
+
+import intel_hex
+import utils
+
+
+def make_record(record_type, address, data=b""):
+    """Build one Intel HEX record line with a valid checksum"""
+    raw = bytes([len(data), (address >> 8) & 0xFF, address & 0xFF, record_type]) + data
+    return ":" + (raw + bytes([(-sum(raw)) & 0xFF])).hex().upper()
+
+
+def test_parse_basic_records():
+    """Test data records are merged into one contiguous segment"""
+    print("🧪 Testing basic HEX parsing...")
+    lines = [
+        ":020000040000FA",
+        ":100000000102030405060708090A0B0C0D0E0F1068",
+        ":100010001112131415161718191A1B1C1D1E1F2058",
+        ":00000001FF",
+    ]
+    image = intel_hex.parse_lines(lines)
+    assert image.segments == [(0, bytes(range(1, 33)))]
+    assert image.to_bin() == bytes(range(1, 33))
+    print("  ✅ 32 bytes in one segment")
+
+
+def test_extended_addresses_and_gaps():
+    """Test extended segment/linear addressing keeps gaps sparse"""
+    print("🧪 Testing extended addresses...")
+    lines = [
+        make_record(intel_hex.RECORD_EXT_SEGMENT, 0, b"\x10\x00"),      # base 0x10000
+        make_record(intel_hex.RECORD_DATA, 0x0010, b"\xAA\xBB"),
+        make_record(intel_hex.RECORD_EXT_LINEAR, 0, b"\x00\x20"),       # base 0x200000
+        make_record(intel_hex.RECORD_DATA, 0x0000, b"\x01\x02\x03\x04"),
+        make_record(intel_hex.RECORD_START_LINEAR, 0, b"\x00\x20\x01\x00"),
+        make_record(intel_hex.RECORD_EOF, 0),
+    ]
+    image = intel_hex.parse_lines(lines)
+    assert image.segments == [(0x10010, b"\xAA\xBB"), (0x200000, b"\x01\x02\x03\x04")]
+    assert image.start_address == 0x200100
+    assert image.data_size == 6
+
+    flat = image.to_bin()
+    assert len(flat) == 0x200004 - 0x10010
+    assert flat[:2] == b"\xAA\xBB" and flat[2:4] == b"\xFF\xFF" and flat[-4:] == b"\x01\x02\x03\x04"
+    print("  ✅ Segments kept sparse, flat image padded with 0xFF")
+
+
+def test_start_segment_address():
+    """Test record type 03 sets CS:IP start address"""
+    image = intel_hex.parse_lines([
+        make_record(intel_hex.RECORD_START_SEGMENT, 0, b"\x12\x34\x00\x10"),
+        make_record(intel_hex.RECORD_EOF, 0),
+    ])
+    assert image.start_address == 0x12340 + 0x10
+    assert image.segments == []
+
+
+def test_rejects_bad_input():
+    """Test checksum errors, overlaps and missing EOF are reported"""
+    print("🧪 Testing malformed HEX detection...")
+    bad_inputs = {
+        "checksum": [":100000000102030405060708090A0B0C0D0E0F1069", ":00000001FF"],
+        "missing eof": [make_record(intel_hex.RECORD_DATA, 0, b"\x00")],
+        "overlap": [make_record(intel_hex.RECORD_DATA, 0, b"\x00\x01"),
+                    make_record(intel_hex.RECORD_DATA, 1, b"\x02"),
+                    make_record(intel_hex.RECORD_EOF, 0)],
+        "not hex": [":GG", ":00000001FF"],
+    }
+    for name, lines in bad_inputs.items():
+        try:
+            intel_hex.parse_lines(lines)
+        except intel_hex.IntelHexError as e:
+            print(f"  ✅ {name}: {e}")
+            continue
+        raise AssertionError(f"{name} should have been rejected")
+
+
+def test_convert_hex_to_bin_without_tools():
+    """Test utils.convert_hex_to_bin works without external converters"""
+    print("🧪 Testing HEX to BIN conversion...")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        hex_file = os.path.join(temp_dir, "test.hex")
+        with open(hex_file, "w") as f:
+            f.write(":100000000102030405060708090A0B0C0D0E0F1068\n")
+            f.write(":00000001FF\n")
+        success, output_path, message = utils.convert_hex_to_bin(hex_file)
+        assert success, message
+        try:
+            assert os.path.dirname(output_path) != temp_dir, "Nothing should be written next to the HEX file"
+            with open(output_path, "rb") as f:
+                assert f.read() == bytes(range(1, 17))
+        finally:
+            os.remove(output_path)
+
+        valid, message = utils.validate_firmware_file(hex_file, "ESP32")
+        assert valid, message
+        assert utils.get_file_type_info(hex_file)["status"] == "can_convert"
+        print(f"  ✅ {message}")
+
+
+if __name__ == "__main__":
+    test_parse_basic_records()
+    test_extended_addresses_and_gaps()
+    test_start_segment_address()
+    test_rejects_bad_input()
+    test_convert_hex_to_bin_without_tools()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Test script for physical LED layout mapping
+"""
+
+import os
+import tempfile
+
+import numpy as np
+
+import animation_dat
+import config
+import led_layout
+import pattern_library
+import utils
+
+
+def numbered_frame(width, height):
+    """RGB frame whose red channel is the row-major pixel index"""
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    frame[..., 0] = np.arange(width * height).reshape(height, width)
+    frame[..., 1] = 100
+    frame[..., 2] = 200
+    return frame
+
+
+def red_order(layout, frame):
+    return list(np.frombuffer(layout.apply(frame), dtype=np.uint8)[0::layout.out_channels])
+
+
+def test_serpentine_and_color_order():
+    """Test serpentine rows and GRB byte order"""
+    print("🧪 Testing serpentine GRB layout...")
+    frame = numbered_frame(4, 3)
+    layout = led_layout.LedLayout(4, 3, serpentine=True, color_order="GRB")
+    data = layout.apply(frame)
+    assert data[:3] == bytes([100, 0, 200])  # G, R, B of pixel 0
+    assert list(data[1::3]) == [0, 1, 2, 3, 7, 6, 5, 4, 8, 9, 10, 11]
+
+    identity = led_layout.LedLayout(4, 3)
+    assert identity.is_identity and identity.apply(frame) == frame.tobytes()
+    print("  ✅ Rows reversed every other line, bytes in G-R-B order")
+
+
+def test_rotation_matches_numpy():
+    """Test rotations and flips place the image as np.rot90/np.flip would"""
+    frame = numbered_frame(4, 2)
+    for rotation in (0, 90, 180, 270):
+        for flip_x in (False, True):
+            layout = led_layout.LedLayout(4, 2, rotation=rotation, flip_x=flip_x)
+            expected = np.rot90(frame[..., 0], k=-rotation // 90)
+            if flip_x:
+                expected = np.flip(expected, axis=1)
+            assert red_order(layout, frame) == expected.reshape(-1).tolist(), (rotation, flip_x)
+
+
+def test_tiled_panels():
+    """Test a 32x16 display made of two 16x16 serpentine modules"""
+    print("🧪 Testing tiled 16x16 modules...")
+    index = np.arange(32 * 16).reshape(16, 32)
+    layout = led_layout.LedLayout(32, 16, serpentine=True, tile_width=16, tile_height=16)
+    order = layout.led_order
+    assert order[:16].tolist() == index[0, :16].tolist()            # First module, first row
+    assert order[16:32].tolist() == index[1, 15::-1].tolist()       # First module, second row reversed
+    assert order[256:272].tolist() == index[0, 16:].tolist()        # Second module starts at column 16
+
+    try:
+        led_layout.LedLayout(32, 16, tile_width=12, tile_height=16)
+        assert False, "tiles that don't divide the panel accepted"
+    except led_layout.LayoutError:
+        pass
+    print("  ✅ Module chaining OK")
+
+
+def test_rgbw_and_animation_gather():
+    """Test RGBW white extraction and remapping an animation in one pass"""
+    layout = led_layout.LedLayout(2, 1, color_order="RGBW")
+    assert layout.apply(bytes([10, 20, 30, 255, 255, 255])) == bytes([0, 10, 20, 10, 0, 0, 0, 255])
+
+    layout = led_layout.get_layout(8, 8, serpentine=True, color_order="GRB")
+    assert led_layout.get_layout(8, 8, serpentine=True, color_order="GRB") is layout  # Index built once
+    frames = np.stack([pattern_library.rainbow(8, 8), pattern_library.heart(8, 8)])
+    stacked = layout.apply_frames(frames)
+    assert stacked.shape == (2, 192)
+    assert stacked[1].tobytes() == layout.apply(frames[1])
+    assert bytes(pattern_library.generate("heart", 8, 8, layout)) == stacked[1].tobytes()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = os.path.join(temp_dir, "anim.dat")
+        output = os.path.join(temp_dir, "wired.dat")
+        animation_dat.write_animation(source, frames, 8, 8)
+        assert led_layout.remap_dat_file(source, output, layout) == 2
+        with animation_dat.AnimationReader(output) as reader:
+            assert [reader.frame(i) for i in range(2)] == [row.tobytes() for row in stacked]
+
+        flat = os.path.join(temp_dir, "flat.dat")
+        with open(flat, "wb") as f:
+            f.write(frames.tobytes())
+        assert led_layout.remap_dat_file(flat, output, layout) == 2
+        with open(output, "rb") as f:
+            assert f.read() == stacked.tobytes()
+
+        # A trailing partial frame is rejected before the existing output is touched
+        with open(flat, "ab") as f:
+            f.write(b"\x01" * 5)
+        try:
+            led_layout.remap_dat_file(flat, output, layout)
+            assert False, "Partial frame should be rejected"
+        except led_layout.LayoutError:
+            pass
+        with open(output, "rb") as f:
+            assert f.read() == stacked.tobytes()
+        assert sorted(os.listdir(temp_dir)) == ["anim.dat", "flat.dat", "wired.dat"]
+
+
+def test_configured_layout_in_generators():
+    """Test the utils pattern generators follow LED_LAYOUT_CONFIG"""
+    plain = bytes(utils.create_heart_pattern())
+    assert plain == bytes(pattern_library.generate("heart")), "Default wiring is row-major RGB"
+    original = dict(config.LED_LAYOUT_CONFIG)
+    try:
+        config.LED_LAYOUT_CONFIG.update(serpentine=True, color_order="GRB")
+        wired = bytes(utils.create_heart_pattern())
+    finally:
+        config.LED_LAYOUT_CONFIG.clear()
+        config.LED_LAYOUT_CONFIG.update(original)
+    assert wired == led_layout.get_layout(8, 8, serpentine=True, color_order="GRB").apply(plain)
+    assert wired != plain
+
+
+def test_rgbw_export_validates():
+    """Test 4-byte RGBW exports pass .dat validation under an RGBW color order"""
+    print("🧪 Testing RGBW .dat validation...")
+    original = dict(config.LED_LAYOUT_CONFIG)
+    try:
+        config.LED_LAYOUT_CONFIG.update(color_order="GRBW")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "heart_grbw.dat")
+            with open(path, "wb") as f:
+                f.write(bytes(utils.create_heart_pattern()))
+                f.write(b"\x00" * 256)
+            assert os.path.getsize(path) == 2 * 64 * 4
+            is_valid, message = utils.validate_dat_file(path)
+            assert is_valid and "8x8" in message and "2 frames" in message, message
+            info = utils.get_dat_file_info(path)
+            assert info["is_valid_rgb"] and info["channels"] == 4 and info["led_count"] == 64
+            assert info["black_frames"] == 1
+    finally:
+        config.LED_LAYOUT_CONFIG.clear()
+        config.LED_LAYOUT_CONFIG.update(original)
+    print(f"  ✅ {message}")
+
+
+if __name__ == "__main__":
+    test_serpentine_and_color_order()
+    test_rotation_matches_numpy()
+    test_tiled_panels()
+    test_rgbw_and_animation_gather()
+    test_configured_layout_in_generators()
+    test_rgbw_export_validates()
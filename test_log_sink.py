@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Test script for the batched, thread-safe log sink
+"""
+
+import threading
+
+import log_sink
+
+
+def test_batched_drain():
+    """Test records from many threads arrive in one drain, in per-thread order"""
+    print("🧪 Testing concurrent log producers...")
+    sink = log_sink.LogSink()
+
+    def produce(worker):
+        for index in range(500):
+            sink.put("progress", f"worker{worker} line{index}")
+
+    threads = [threading.Thread(target=produce, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    records, dropped = sink.drain()
+    assert len(records) == 4000 and dropped == 0
+    assert len(sink) == 0 and sink.drain() == ([], 0)
+    for worker in range(8):
+        lines = [message for _, _, message in records if message.startswith(f"worker{worker} ")]
+        assert lines == [f"worker{worker} line{index}" for index in range(500)]
+    print(f"  ✅ {len(records)} records drained in one batch")
+
+
+def test_bounded_queue():
+    """Test the oldest records are dropped and counted when the UI falls behind"""
+    sink = log_sink.LogSink(max_pending=10)
+    for index in range(25):
+        sink.put("info", str(index))
+    records, dropped = sink.drain()
+    assert [message for _, _, message in records] == [str(index) for index in range(15, 25)]
+    assert dropped == 15
+
+
+def test_format_record():
+    """Test the timestamp prefix and level icon formatting"""
+    prefix, body = log_sink.format_record((0.0, "error", "Upload failed"), "%Y")
+    assert prefix.startswith("[19") and prefix.endswith("] ")
+    assert body == "❌ Upload failed\n"
+    sink = log_sink.LogSink()
+    sink.put("unknown-level", "hello")
+    assert sink.drain()[0][0][1] == "info"
+
+
+if __name__ == "__main__":
+    test_batched_drain()
+    test_bounded_queue()
+    test_format_record()
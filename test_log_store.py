@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test script for the segmented on-disk log store
+"""
+
+import os
+import tempfile
+import time
+
+import log_store
+
+
+def make_records(count, start=0):
+    levels = ["info", "progress", "warning", "error"]
+    return [(1700000000.0 + index, levels[index % 4], f"line {index} port COM{index % 3}")
+            for index in range(start, start + count)]
+
+
+def test_append_and_read_window():
+    """Test any window of lines can be read back across segment boundaries"""
+    print("🧪 Testing log store windows...")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = log_store.LogStore(temp_dir, segment_bytes=4096, max_segments=1000)
+        assert store.append(make_records(5000)) == 0
+        assert store.append(make_records(10, 5000)) == 5000
+        assert len(store) == 5010 and len(store.segments) > 10
+
+        window = store.read(2995, 10)
+        assert [number for number, _ in window] == list(range(2995, 3005))
+        assert window[0][1] == make_records(1, 2995)[0]
+        assert store.read(5005, 100)[-1][0] == 5009
+        assert [number for number, _ in store.read_lines([1, 4000, 5009])] == [1, 4000, 5009]
+        store.close()
+    print(f"  ✅ 5010 lines in {len(store.segments)} segments")
+
+
+def test_escaped_messages():
+    """Test multi-line and backslash messages survive a round trip"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = log_store.LogStore(temp_dir)
+        record = (1.0, "error", "Traceback:\n  C:\\path\\file.py\r\n\ttab")
+        store.append([record, (2.0, "info", "next")])
+        assert store.read(0, 2)[0][1] == record
+        assert store.read(1, 1)[0][1][2] == "next"
+        store.close()
+
+
+def test_search_filters():
+    """Test substring and level filtering over the stored history"""
+    print("🧪 Testing log search...")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = log_store.LogStore(temp_dir, segment_bytes=8192, max_segments=1000)
+        store.append(make_records(20000))
+        start_time = time.monotonic()
+        errors = store.search(levels=["error"])
+        com1 = store.search("com1")
+        both = store.search("COM1", levels=["warning"], case_sensitive=True)
+        elapsed = time.monotonic() - start_time
+
+        assert list(errors[:3]) == [3, 7, 11] and len(errors) == 5000
+        assert len(com1) == 6667 and com1[0] == 1
+        assert all(index % 4 == 2 and index % 3 == 1 for index in both)
+        assert list(store.search("line 1999", start=19000)) == [19990, 19991, 19992, 19993, 19994,
+                                                                 19995, 19996, 19997, 19998, 19999]
+        assert list(store.search("port", cancelled=lambda: True)) == []
+        store.close()
+    print(f"  ✅ 3 searches over 20000 lines in {elapsed:.2f}s")
+
+
+def test_search_non_ascii_case():
+    """Test case-insensitive search folds non-ASCII text, not just ASCII"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = log_store.LogStore(temp_dir)
+        store.append([(1.0, "info", "Устройство ПОДКЛЮЧЕНО"), (2.0, "info", "Café lights on"),
+                      (3.0, "info", "STRASSE panel"), (4.0, "info", "plain ascii")])
+        assert list(store.search("подключено")) == [0]
+        assert list(store.search("CAFÉ")) == [1]
+        assert list(store.search("straße")) == [2]
+        assert list(store.search("CAFÉ", case_sensitive=True)) == []
+        assert list(store.search("PLAIN")) == [3]
+        store.close()
+
+
+def test_ring_and_export():
+    """Test old segments are recycled and export writes what is still stored"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = log_store.LogStore(os.path.join(temp_dir, "session"), segment_bytes=2048, max_segments=3)
+        store.append(make_records(2000))
+        assert len(store.segments) == 3
+        assert store.first_line > 0 and store.end_line == 2000
+        assert store.read(0, 5) == []  # Recycled lines are gone
+        assert store.read(store.first_line, 1)[0][0] == store.first_line
+        assert len(os.listdir(store.directory)) == 3
+
+        export_path = os.path.join(temp_dir, "session.txt")
+        store.export(export_path)
+        with open(export_path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        assert len(lines) == len(store)
+        assert lines[-1].endswith("line 1999 port COM1")
+
+        store.clear()
+        assert len(store) == 0 and store.end_line == 2000
+        store.append(make_records(1))
+        assert store.read(2000, 1)[0][1][2] == "line 0 port COM0"
+        store.close()
+
+
+if __name__ == "__main__":
+    test_append_and_read_window()
+    test_escaped_messages()
+    test_search_filters()
+    test_search_non_ascii_case()
+    test_ring_and_export()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test script for the image, GIF and video import pipeline
+Builds small images with Pillow; the video test runs only when ffmpeg is on PATH
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+
+import numpy as np
+from PIL import Image
+
+import animation_dat
+import media_import
+
+
+def solid(color, size=(64, 64)):
+    return Image.new("RGB", size, color)
+
+
+def test_resample_and_dither():
+    """Test box downscaling, nearest upscaling and ordered dithering"""
+    print("🧪 Testing frame resampling...")
+    frame = np.zeros((4, 4, 3), dtype=np.uint8)
+    frame[:2, :2] = 200          # Top-left quarter lit
+    frame[0, 3] = 100
+    small = media_import.resample_frame(frame, 2, 2)
+    assert small[0, 0].tolist() == [200, 200, 200]
+    assert small[0, 1].tolist() == [25, 25, 25]  # 100 averaged over 4 pixels
+    assert small[1, 1].tolist() == [0, 0, 0]
+
+    large = media_import.resample_frame(small, 8, 6)
+    assert large.shape == (6, 8, 3) and large[2, 3].tolist() == [200, 200, 200]
+
+    gray = np.full((16, 16, 3), 128, dtype=np.uint8)
+    dithered = media_import.dither_frame(gray, 1)
+    assert set(np.unique(dithered).tolist()) == {0, 255}
+    assert abs(dithered.mean() - 128) < 8  # Average brightness kept
+    assert media_import.dither_frame(gray, 0) is gray
+    print("  ✅ Box filter, nearest upscale and Bayer dither OK")
+
+
+def test_decimate():
+    """Test variable frame durations are sampled onto a fixed delay"""
+    frames = [("a", 50), ("b", 50), ("c", 200), ("d", 20)]
+    assert list(media_import.decimate(frames, 100)) == ["a", "c", "c", "d"]
+    assert list(media_import.decimate(frames, 50)) == ["a", "b", "c", "c", "c", "c", "d"]
+    # A frame shown between two samples is dropped
+    assert list(media_import.decimate([("a", 50), ("b", 30), ("c", 100)], 100)) == ["a", "c"]
+
+
+def test_gif_import():
+    """Test an animated GIF streams into an animation .dat at the matrix size"""
+    print("🧪 Testing animated GIF import...")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        gif_path = os.path.join(temp_dir, "clip.gif")
+        images = [solid((255, 0, 0)), solid((0, 255, 0)), solid((0, 0, 255))]
+        images[0].save(gif_path, save_all=True, append_images=images[1:], duration=[50, 50, 200], loop=0)
+
+        output = os.path.join(temp_dir, "clip.dat")
+        written = []
+        stats = media_import.import_media(gif_path, output, 8, 8, max_fps=10, progress_callback=written.append)
+        assert stats["source_frames"] == 3 and stats["frames"] == 3 and stats["frame_delay_ms"] == 100
+        assert written == [1, 2, 3]
+        with animation_dat.AnimationReader(output) as reader:
+            assert (reader.width, reader.height) == (8, 8)
+            colors = [tuple(reader.frame_array(i)[:3].tolist()) for i in range(reader.frame_count)]
+            # Blue repeats for its 200 ms; the repeat is stored as an empty delta
+            assert reader.entry(2)[1] == 0
+        assert colors[0][0] > 200 and colors[1][2] > 200 and colors[2][2] > 200
+    print(f"  ✅ {stats['frames']} frames, {stats['file_bytes']} bytes")
+
+
+def test_image_sequence_and_alpha():
+    """Test a list of images becomes a sequence and transparency turns into unlit LEDs"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths = []
+        for i in range(3):
+            path = os.path.join(temp_dir, f"frame_{2 - i}.png")
+            Image.new("RGBA", (16, 16), (0, 0, 255 - i * 100, 255 if i else 0)).save(path)
+            paths.append(path)
+        output = os.path.join(temp_dir, "seq.dat")
+        stats = media_import.import_media(paths, output, 4, 4)
+        assert stats["frames"] == 3
+        with animation_dat.AnimationReader(output) as reader:
+            blues = [reader.frame_array(i)[2] for i in range(3)]
+        assert blues == [55, 155, 0]  # Sorted by name; frame_2 was fully transparent
+
+        frame = media_import.load_image_frame(paths[1], 2, 2)
+        assert frame.shape == (2, 2, 3) and frame[0, 0].tolist() == [0, 0, 155]
+
+
+def test_video_import():
+    """Test video decoding through ffmpeg when it is installed"""
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        print("⚠ ffmpeg not installed, skipping video import test")
+        return
+    with tempfile.TemporaryDirectory() as temp_dir:
+        video = os.path.join(temp_dir, "test.mp4")
+        subprocess.run([ffmpeg, "-v", "error", "-f", "lavfi", "-i", "testsrc=size=64x64:rate=30:duration=1",
+                        "-pix_fmt", "yuv420p", video], check=True)
+        output = os.path.join(temp_dir, "video.dat")
+        stats = media_import.import_media(video, output, 8, 8, max_fps=10)
+        assert 9 <= stats["frames"] <= 11 and stats["frame_delay_ms"] == 100
+
+
+if __name__ == "__main__":
+    test_resample_and_dither()
+    test_decimate()
+    test_gif_import()
+    test_image_sequence_and_alpha()
+    test_video_import()
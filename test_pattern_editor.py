@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Test script for the retained-mode pattern editor canvas
+Uses a stand-in canvas that counts item operations, so no display is needed
+"""
+
+import os
+import tempfile
+import threading
+
+import led_layout
+from pattern_editor import PatternEditorDialog
+
+
+class CountingCanvas:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.items = {}
+        self.created = 0
+        self.recolored = 0
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+    def delete(self, tag):
+        self.items.clear()
+
+    def create_line(self, *coords, **options):
+        return self._create(options)
+
+    def create_oval(self, *coords, **options):
+        return self._create(options)
+
+    def _create(self, options):
+        self.created += 1
+        self.items[self.created] = dict(options)
+        return self.created
+
+    def itemconfigure(self, item, **options):
+        self.recolored += 1
+        self.items[item].update(options)
+
+
+class Value:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class QueuedDialog:
+    """Stands in for the Toplevel: after() queues callbacks for the test to run as the Tk loop would"""
+
+    def __init__(self):
+        self.queue = []
+        self.threads = set()
+
+    def after(self, delay, callback, *args):
+        self.threads.add(threading.current_thread().name)
+        self.queue.append((callback, args))
+
+    def run_pending(self):
+        while self.queue:
+            callback, args = self.queue.pop(0)
+            callback(*args)
+
+
+class StateButton:
+    def __init__(self):
+        self.state = "normal"
+
+    def config(self, state):
+        self.state = state
+
+
+class Event:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+def make_editor(size=64, canvas_size=640):
+    editor = PatternEditorDialog.__new__(PatternEditorDialog)
+    editor.matrix_size = (size, size)
+    editor.leds = size * size
+    editor.pattern_data = [[0, 0, 0] for _ in range(editor.leds)]
+    editor.led_items = []
+    editor.grid_geometry = None
+    editor.last_cell = None
+    editor.canvas = CountingCanvas(canvas_size, canvas_size)
+    editor.color_var = Value("#FF0000")
+    editor.status_var = Value("")
+    editor.draw_grid()
+    return editor
+
+
+def test_painting_recolors_single_items():
+    """Test painting changes one oval's fill instead of rebuilding the grid"""
+    print("🧪 Testing retained-mode painting at 64x64...")
+    editor = make_editor()
+    built = editor.canvas.created
+    assert len(editor.led_items) == 64 * 64 and built == 64 * 64 + 2 * 65
+
+    editor.on_canvas_click(Event(15, 25))  # cell (1, 2)
+    assert editor.canvas.created == built and editor.canvas.recolored == 1
+    assert editor.pattern_data[2 * 64 + 1] == [255, 0, 0]
+    assert editor.canvas.items[editor.led_items[2 * 64 + 1]]["fill"] == "#ff0000"
+
+    editor.on_canvas_drag(Event(15, 25))  # Same cell, same color: nothing to do
+    assert editor.canvas.recolored == 1
+    print(f"  ✅ {built} items built once, 1 recolor per painted LED")
+
+
+def test_fast_drag_fills_skipped_cells():
+    """Test a drag that jumps several cells paints the cells in between"""
+    editor = make_editor()
+    editor.on_canvas_click(Event(5, 5))
+    editor.on_canvas_drag(Event(55, 5))  # 5 cells to the right in one event
+    assert [editor.pattern_data[x] for x in range(6)] == [[255, 0, 0]] * 6
+    editor.on_canvas_release(Event(55, 5))
+    editor.on_canvas_click(Event(5, 55))
+    assert editor.pattern_data[5 * 64 + 1] == [0, 0, 0]
+
+
+def test_bulk_changes_and_resize():
+    """Test clearing recolors in place while a size change rebuilds"""
+    editor = make_editor(size=8, canvas_size=80)
+    editor.random_pattern()
+    built = editor.canvas.created
+    editor.clear_pattern()
+    assert editor.canvas.created == built
+    assert all(editor.canvas.items[item]["fill"] == "#000000" for item in editor.led_items)
+
+    editor.canvas.width = 160
+    editor.redraw_if_resized()
+    assert editor.canvas.created > built and editor.grid_geometry == (160, 80, 8, 8)
+    created = editor.canvas.created
+    editor.redraw_if_resized()  # Same size again: no rebuild
+    assert editor.canvas.created == created
+
+
+def test_animation_import_off_tk_thread():
+    """Test the media import runs in a worker that reports progress through dialog.after"""
+    print("🧪 Testing threaded animation import...")
+    from PIL import Image
+    editor = make_editor(size=8, canvas_size=80)
+    editor.dialog = QueuedDialog()
+    editor.import_animation_button = StateButton()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        gif_path = os.path.join(temp_dir, "spin.gif")
+        images = [Image.new("RGB", (32, 32), (i * 10, 0, 255 - i * 10)) for i in range(20)]
+        images[0].save(gif_path, save_all=True, append_images=images[1:], duration=50, loop=0)
+        output = os.path.join(temp_dir, "spin.dat")
+
+        worker = threading.Thread(target=editor._import_animation_thread, name="import-worker",
+                                  args=(gif_path, output, led_layout.get_layout(8, 8)))
+        worker.start()
+        worker.join()
+        assert editor.dialog.threads == {"import-worker"}, "Worker must hand results back through after()"
+        progress = [args[0] for callback, args in editor.dialog.queue if callback == editor.status_var.set]
+        assert progress and progress[0] == "Importing animation... 10 frames", progress
+        editor.dialog.run_pending()
+        assert editor.status_var.get().startswith("Imported 20 frames"), editor.status_var.get()
+        assert editor.import_animation_button.state == "normal"
+        assert editor.pattern_data[0] == [0, 0, 255]
+    print(f"  ✅ {editor.status_var.get()}")
+
+
+if __name__ == "__main__":
+    test_painting_recolors_single_items()
+    test_fast_drag_fills_skipped_cells()
+    test_bulk_changes_and_resize()
+    test_animation_import_off_tk_thread()
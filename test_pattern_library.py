@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script for the vectorized pattern library
+"""
+
+import time
+
+import numpy as np
+
+import pattern_library
+import utils
+
+
+def walk_spiral(width, height):
+    """Reference spiral walk: the order the original loop generator visited LEDs"""
+    order = np.zeros((height, width), dtype=int)
+    visited = set()
+    x, y, dx, dy = 0, 0, 1, 0
+    for i in range(width * height):
+        order[y, x] = i
+        visited.add((x, y))
+        if not (0 <= x + dx < width and 0 <= y + dy < height) or (x + dx, y + dy) in visited:
+            dx, dy = -dy, dx
+        x, y = x + dx, y + dy
+    return order
+
+
+def test_8x8_matches_samples():
+    """Test 8x8 output matches the shipped sample files"""
+    print("🧪 Testing 8x8 patterns against SampleFirmware...")
+    for name in ["alternating_cols", "checkerboard", "rainbow", "pulse", "spiral",
+                 "heart", "cross", "border", "diagonal"]:
+        with open(f"SampleFirmware/{name}_8x8.dat", "rb") as f:
+            expected = f.read()
+        data = getattr(utils, f"create_{name}_pattern")()
+        assert isinstance(data, bytearray) and data == expected, name
+    print("  ✅ All 8x8 patterns match")
+
+
+def test_spiral_order():
+    """Test the ring formula visits LEDs in the same order as a spiral walk"""
+    for width, height in [(8, 8), (5, 3), (3, 5), (1, 4), (7, 1), (16, 9)]:
+        assert (pattern_library.spiral_order(width, height) == walk_spiral(width, height)).all(), (width, height)
+
+
+def test_arbitrary_sizes():
+    """Test every pattern produces one contiguous RGB buffer per size"""
+    for width, height in [(1, 1), (16, 16), (32, 8), (7, 13)]:
+        for name in pattern_library.PATTERNS:
+            data = pattern_library.generate(name, width, height)
+            assert len(data) == width * height * 3, (name, width, height)
+
+    frame = pattern_library.border(16, 16)
+    assert frame[0, 5].tolist() == [0, 0, 255] and frame[1, 1].tolist() == [0, 0, 255]
+    assert frame[2, 2].tolist() == [0, 0, 0]  # Two LEDs thick at 16x16
+
+    try:
+        pattern_library.generate("plasma")
+        assert False, "unknown pattern accepted"
+    except ValueError:
+        pass
+
+
+def test_large_matrix_speed():
+    """Test 128x128 patterns are generated in milliseconds"""
+    print("🧪 Testing 128x128 generation time...")
+    for name in pattern_library.PATTERNS:
+        start = time.perf_counter()
+        pattern_library.generate(name, 128, 128)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        assert elapsed_ms < 100, (name, elapsed_ms)
+    print("  ✅ All patterns generated quickly at 128x128")
+
+
+if __name__ == "__main__":
+    test_8x8_matches_samples()
+    test_spiral_order()
+    test_arbitrary_sizes()
+    test_large_matrix_speed()
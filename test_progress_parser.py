@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for the flash tool progress parser, ETA smoothing and throttling
+"""
+
+import progress_parser
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_tool_selection():
+    """Test flash commands map to their pattern tables"""
+    assert progress_parser.tool_for_command("python", ["-m", "esptool", "--port", "COM3"]) == "esptool"
+    assert progress_parser.tool_for_command("C:/tools/avrdude.exe", ["-c", "arduino"]) == "avrdude"
+    assert progress_parser.tool_for_command("arduino-cli", ["compile"]) == "arduino_cli"
+    assert progress_parser.tool_for_command("mplab_ipe", ["-TPICkit3"]) == "generic"
+
+
+def test_esptool_output():
+    """Test esptool v4 and v5 write progress become byte events with rate and ETA"""
+    print("🧪 Testing esptool output parsing...")
+    clock = FakeClock()
+    parser = progress_parser.ToolOutputParser("esptool", clock)
+    lines, events = parser.feed("Connecting....\nUploading stub...\nCompressed 40000 bytes to 20000...\n")
+    assert len(lines) == 3
+    assert [event["phase"] for event in events] == ["connect", "stub", "write"]
+    assert parser.total_bytes == 40000
+
+    # v4 redraws in place with \r
+    clock.now = 1.0
+    _, events = parser.feed("Writing at 0x00010000... (25 %)\r")
+    assert events[0]["done"] == 10000 and events[0]["unit"] == "bytes"
+    clock.now = 2.0
+    _, events = parser.feed("Writing at 0x00014000... (50 %)\r")
+    assert events[0]["rate_bps"] == 10000.0 and events[0]["eta_s"] == 2.0
+    _, events = parser.feed("Wrote 40000 bytes (20000 compressed) at 0x00010000 in 4.0 seconds\n")
+    assert events[0]["percent"] == 100.0
+
+    parser = progress_parser.ToolOutputParser("esptool", clock)
+    _, events = parser.feed("Writing at 0x00000000 [=====     ] 50.0% 512/1024 bytes...\n")
+    assert (events[0]["done"], events[0]["total"], events[0]["percent"]) == (512, 1024, 50.0)
+    print("  ✅ esptool v4/v5 progress parsed")
+
+
+def test_avrdude_partial_bar():
+    """Test the avrdude hash bar is read before its line ends"""
+    print("🧪 Testing avrdude progress bar...")
+    parser = progress_parser.ToolOutputParser("avrdude", FakeClock())
+    _, events = parser.feed("avrdude: AVR device initialized\nReading | ########################"
+                            "########################## | 100% 0.01s\n")
+    assert [event["phase"] for event in events] == ["connect", "connect"]
+    parser.feed("avrdude: writing flash (2000 bytes):\n\n")
+    _, events = parser.feed("Writing | #########################")
+    assert events[0]["phase"] == "write" and events[0]["done"] == 1000
+    assert parser.feed("")[1] == []  # Nothing new drawn
+    _, events = parser.feed("######################### | 100% 0.40s\n")
+    assert events[-1]["percent"] == 100.0
+    _, events = parser.feed("Reading | ##########")
+    assert events[0]["phase"] == "verify"
+
+
+def test_generic_and_stm32():
+    """Test stm32flash percent lines and the generic fallback"""
+    parser = progress_parser.ToolOutputParser("stm32flash", FakeClock())
+    parser.feed("Size          : 8192\n")
+    _, events = parser.feed("Wrote address 0x08000100 (3.12%) Done.\n")
+    assert events[0]["phase"] == "write" and events[0]["total"] == 8192
+
+    parser = progress_parser.ToolOutputParser("generic", FakeClock())
+    _, events = parser.feed("Programming... 40%\n")
+    assert events[0]["percent"] == 40.0 and events[0]["unit"] == "percent"
+    assert events[0]["rate_bps"] is None
+
+
+def test_ema_smoothing():
+    """Test the ETA follows a smoothed rate rather than the latest sample"""
+    clock = FakeClock()
+    estimator = progress_parser.RateEstimator(alpha=0.5, clock=clock)
+    clock.now = 1.0
+    assert estimator.update(100, 1000) == (100.0, 9.0)
+    clock.now = 2.0
+    rate, eta = estimator.update(400, 1000)  # 300/s sample
+    assert rate == 200.0 and eta == 3.0
+
+
+def test_throttle():
+    """Test events are limited to the display rate but phase ends always arrive"""
+    print("🧪 Testing progress throttling...")
+    clock = FakeClock()
+    delivered = []
+    throttle = progress_parser.ProgressThrottle(delivered.append, 0.033, clock)
+    tracker = progress_parser.ProgressTracker("test", clock=clock)
+    for step in range(1, 1001):
+        clock.now = step * 0.001  # A tool reporting every millisecond
+        throttle.submit(tracker.update("write", step, 1000))
+    throttle.flush()
+    assert 25 <= len(delivered) <= 40, len(delivered)
+    assert delivered[-1]["percent"] == 100.0
+    throttle.submit(tracker.enter("verify"))
+    assert delivered[-1]["phase"] == "verify"
+    print(f"  ✅ 1000 updates throttled to {len(delivered)}")
+
+
+if __name__ == "__main__":
+    test_tool_selection()
+    test_esptool_output()
+    test_avrdude_partial_bar()
+    test_generic_and_stm32()
+    test_ema_smoothing()
+    test_throttle()
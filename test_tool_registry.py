@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Test script for the persistent tool discovery registry
+Uses fake tools in a temp directory so nothing real is probed
+"""
+
+import os
+import stat
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import tool_registry
+
+
+def make_tool(directory, name):
+    """Create an executable script that prints a version"""
+    path = os.path.join(directory, name)
+    with open(path, "w") as f:
+        f.write(f"#!/bin/sh\necho '{name} version 1.0'\n")
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    return path
+
+
+def counting_finder(name, calls):
+    def find():
+        calls.append(name)
+        return name if tool_registry.shutil.which(name) else None
+    return find
+
+
+class PathOverride:
+    """Temporarily prepend a directory to PATH"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def __enter__(self):
+        self.original = os.environ.get("PATH", "")
+        os.environ["PATH"] = self.directory + os.pathsep + self.original
+
+    def __exit__(self, *exc):
+        os.environ["PATH"] = self.original
+
+
+def test_probe_once_and_persist():
+    """Test a tool is probed once and reused by a later run"""
+    print("🧪 Testing tool registry persistence...")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        bin_dir = os.path.join(temp_dir, "bin")
+        os.makedirs(bin_dir)
+        make_tool(bin_dir, "faketool")
+        registry_path = os.path.join(temp_dir, "registry.json")
+        calls = []
+        finders = {"faketool": counting_finder("faketool", calls), "missing": counting_finder("nope_tool", calls)}
+
+        with PathOverride(bin_dir):
+            registry = tool_registry.ToolRegistry(finders, registry_path, ttl_hours=1)
+            entry = registry.lookup("faketool")
+            assert entry["command"] == "faketool"
+            assert entry["binary"] == os.path.join(bin_dir, "faketool")
+            assert entry["version"] == "faketool version 1.0"
+            assert registry.get("missing") is None
+            assert registry.get("faketool") == "faketool"
+            assert calls == ["faketool", "nope_tool"]
+
+            # A new registry (next app start) reuses the stored results
+            second_run = tool_registry.ToolRegistry(finders, registry_path, ttl_hours=1)
+            assert second_run.is_available("faketool") and not second_run.is_available("missing")
+            assert calls == ["faketool", "nope_tool"]
+    print("  ✅ Second run did not re-probe")
+
+
+def test_invalidation():
+    """Test TTL expiry, PATH changes and binary replacement trigger a re-probe"""
+    print("🧪 Testing tool registry invalidation...")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        bin_dir = os.path.join(temp_dir, "bin")
+        os.makedirs(bin_dir)
+        tool_path = make_tool(bin_dir, "faketool")
+        calls = []
+        finders = {"faketool": counting_finder("faketool", calls)}
+
+        with PathOverride(bin_dir):
+            registry = tool_registry.ToolRegistry(finders, os.path.join(temp_dir, "registry.json"), ttl_hours=1)
+            registry.get("faketool")
+
+            # Binary replaced (upgrade) -> mtime differs
+            os.utime(tool_path, (time.time() - 100, time.time() - 100))
+            registry.get("faketool")
+            assert len(calls) == 2
+
+            # Expired entry
+            registry.entries["faketool"]["probed_at"] -= 2 * 3600
+            registry.get("faketool")
+            assert len(calls) == 3
+
+            registry.invalidate("faketool")
+            registry.get("faketool")
+            assert len(calls) == 4
+
+        # PATH no longer contains the tool directory
+        assert registry.get("faketool") is None
+        assert len(calls) == 5
+    print("  ✅ Stale entries re-probed")
+
+
+def test_concurrent_probes():
+    """Test slow probes overlap and each tool is probed once under contention"""
+    print("🧪 Testing concurrent tool probes...")
+    calls = []
+    lock = threading.Lock()
+
+    def slow_finder(name):
+        def find():
+            with lock:
+                calls.append(name)
+            time.sleep(0.2)
+            return None
+        return find
+
+    names = [f"tool{index}" for index in range(6)]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        registry = tool_registry.ToolRegistry({name: slow_finder(name) for name in names},
+                                              os.path.join(temp_dir, "registry.json"), ttl_hours=1)
+        start_time = time.monotonic()
+        with ThreadPoolExecutor(max_workers=12) as executor:
+            results = list(executor.map(registry.get, names + names))
+        elapsed = time.monotonic() - start_time
+
+    assert results == [None] * 12
+    assert sorted(calls) == sorted(names), "Each tool should be probed exactly once"
+    assert elapsed < 0.2 * len(names), f"Probes ran serially ({elapsed:.2f}s)"
+    print(f"  ✅ {len(names)} probes in {elapsed:.2f}s")
+
+
+def test_resolve_binary():
+    """Test module-style commands resolve to the interpreter"""
+    assert tool_registry.resolve_binary(None) is None
+    assert tool_registry.resolve_binary("definitely_not_a_tool_xyz") is None
+    python = tool_registry.resolve_binary("python -m esptool")
+    assert python is None or os.path.basename(python).startswith("python")
+
+
+if __name__ == "__main__":
+    test_probe_once_and_persist()
+    test_invalidation()
+    test_concurrent_probes()
+    test_resolve_binary()
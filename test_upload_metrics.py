@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for per-phase upload timing spans and metrics exporters
+"""
+
+import csv
+import os
+import tempfile
+
+import upload_metrics
+import upload_pipeline
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_timer():
+    """Timer with connect 1s, stub 0.5s, write 4s (2 spans, 8000 bytes), verify 0.5s"""
+    clock = FakeClock()
+    timer = upload_metrics.PhaseTimer(clock)
+    for phase, seconds in [("connect", 1.0), ("stub", 0.5), ("write", 3.0), ("write", 1.0), ("verify", 0.5)]:
+        timer.enter(phase)
+        clock.now += seconds
+    timer.stop()
+    timer.add_bytes("write", 8000)
+    return timer
+
+
+def test_phase_spans():
+    """Test transitions and explicit spans add up per phase"""
+    print("🧪 Testing phase timing spans...")
+    timer = make_timer()
+    totals = timer.totals()
+    assert list(totals) == ["connect", "stub", "write", "verify"]
+    assert totals["write"]["duration_s"] == 4.0 and totals["write"]["spans"] == 1
+    assert totals["write"]["throughput_bps"] == 2000.0
+    assert totals["connect"]["throughput_bps"] is None
+
+    with timer.span("convert_hex", 100):
+        timer.clock.now += 2.0
+    assert timer.totals()["convert_hex"]["duration_s"] == 2.0
+
+    table = timer.summary_table()
+    assert table[0].startswith("Phase") and table[-1].startswith("total")
+    assert any(line.startswith("write") and "2.0 KB/s" in line for line in table)
+    print("\n".join(f"  {line}" for line in table))
+
+
+def test_pipeline_stats():
+    """Test flash progress callbacks open phase spans on the pipeline"""
+    pipeline = upload_pipeline.UploadPipeline("ESP8266", "115200")
+    pipeline.timer = upload_metrics.PhaseTimer(FakeClock())
+    for phase in ["connect", "stub", "connect", "write", "write", "verify"]:
+        pipeline.on_flash_progress(phase, 0, 1)
+        pipeline.timer.clock.now += 1.0
+    pipeline.timer.stop()
+    pipeline.bytes_written = 4096
+    pipeline.timer.add_bytes("write", 4096)
+
+    stats = pipeline.stats()
+    assert stats["phases"] == {"connect": 2.0, "stub": 1.0, "write": 2.0, "verify": 1.0}
+    assert stats["throughput_bps"] == 2048 and stats["bytes_written"] == 4096
+
+
+def test_exporters():
+    """Test the Prometheus textfile and CSV exporters"""
+    record = {"timestamp": "2024-01-01T10:00:00", "started_at": 1704103200.0, "duration_s": 6.0,
+              "device": "ESP8266", "port": "COM3", "outcome": "success"}
+    phases = make_timer().totals()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        prom_path = os.path.join(temp_dir, "upload.prom")
+        exporter = upload_metrics.PrometheusTextfileExporter(prom_path)
+        exporter.export(record, phases)
+        exporter.export(dict(record, port="COM4", outcome="failed"), phases)
+        with open(prom_path, encoding="utf-8") as f:
+            text = f.read()
+        assert 'jtech_upload_phase_seconds{device="ESP8266",port="COM3",phase="write"} 4.000000' in text
+        assert 'jtech_upload_success{device="ESP8266",port="COM4"} 0' in text
+        # Every family is one contiguous block: HELP, TYPE, then all its samples
+        families = [line.split("{")[0] if not line.startswith("#") else line.split()[2]
+                    for line in text.splitlines()]
+        blocks = [family for i, family in enumerate(families) if i == 0 or families[i - 1] != family]
+        assert blocks == [family for family, _ in upload_metrics.PROMETHEUS_FAMILIES], blocks
+        assert not os.path.exists(prom_path + ".tmp")
+
+        csv_path = os.path.join(temp_dir, "phases.csv")
+        exporter = upload_metrics.CsvExporter(csv_path)
+        exporter.export(record, phases)
+        exporter.export(record, phases)
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 8
+        assert rows[2]["phase"] == "write" and rows[2]["throughput_bps"] == "2000"
+
+    calls = []
+
+    class ListExporter(upload_metrics.MetricsExporter):
+        def export(self, record, phases):
+            calls.append(record["port"])
+
+    upload_metrics.register_exporter("list", ListExporter)
+    exporters = upload_metrics.create_exporters(["list", "unknown"])
+    assert len(exporters) == 1
+    exporters[0].export(record, phases)
+    assert calls == ["COM3"]
+
+
+if __name__ == "__main__":
+    test_phase_spans()
+    test_pipeline_stats()
+    test_exporters()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test script for structured JSON-lines upload records
+"""
+
+import gzip
+import json
+import os
+import tempfile
+import time
+
+import upload_records
+
+
+def make_record(index, device="ESP8266", outcome=upload_records.OUTCOME_SUCCESS, started=None):
+    started = started if started is not None else time.time()
+    return {
+        "started_at": started,
+        "duration_s": 2.0,
+        "device": device,
+        "port": f"COM{index % 4}",
+        "phases": {"connect": 0.5, "write": 1.0},
+        "bytes_written": 1000,
+        "throughput_bps": 1000,
+        "retries": index % 2,
+        "outcome": outcome
+    }
+
+
+def test_append_and_rotate():
+    """Test records rotate by size and closed segments are gzipped"""
+    print("🧪 Testing upload record rotation...")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        writer = upload_records.UploadRecordWriter(temp_dir, max_bytes=2048)
+        for index in range(60):
+            writer.append(make_record(index))
+        writer.close()
+
+        segments = upload_records.list_segments(temp_dir)
+        assert len(segments) > 2
+        assert all(path.endswith(".gz") for path in segments[:-1])
+        assert segments[-1].endswith(".jsonl")
+        with gzip.open(segments[0], 'rt', encoding='utf-8') as f:
+            assert json.loads(f.readline())["port"] == "COM0"
+
+        records = list(upload_records.iter_records(temp_dir))
+        assert [record["port"] for record in records] == [f"COM{index % 4}" for index in range(60)]
+
+        # A new writer continues the open segment and compresses nothing else
+        writer = upload_records.UploadRecordWriter(temp_dir, max_bytes=2048)
+        writer.append(make_record(60))
+        writer.close()
+        assert writer.path == segments[-1]
+        assert len(list(upload_records.iter_records(temp_dir))) == 61
+    print(f"  ✅ 61 records in {len(segments)} segments")
+
+
+def test_day_rotation():
+    """Test a segment left from an earlier day is compressed on the next write"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        old_path = os.path.join(temp_dir, "uploads-20240101-001.jsonl")
+        with open(old_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(make_record(0, started=1704100000.0)) + "\n")
+            f.write("{truncated\n")
+
+        writer = upload_records.UploadRecordWriter(temp_dir)
+        writer.append(make_record(1))
+        writer.close()
+
+        assert not os.path.exists(old_path) and os.path.exists(old_path + ".gz")
+        assert os.path.basename(writer.path) == f"uploads-{time.strftime('%Y%m%d')}-001.jsonl"
+        assert len(list(upload_records.iter_records(temp_dir))) == 2
+        assert len(list(upload_records.iter_records(temp_dir, since=time.time() - 3600))) == 1
+
+
+def test_aggregate():
+    """Test streaming aggregation by device and outcome"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        writer = upload_records.UploadRecordWriter(temp_dir)
+        for index in range(10):
+            outcome = upload_records.OUTCOME_FAILED if index % 5 == 0 else upload_records.OUTCOME_SUCCESS
+            writer.append(make_record(index, device="ESP32" if index < 4 else "ESP8266", outcome=outcome))
+        writer.close()
+
+        summary = upload_records.aggregate_records(upload_records.iter_records(temp_dir))
+        assert summary["ESP32"]["count"] == 4 and summary["ESP32"]["failures"] == 1
+        assert summary["ESP8266"]["successes"] == 5 and summary["ESP8266"]["retries"] == 3
+        assert summary["ESP8266"]["bytes_written"] == 6000
+        assert summary["ESP8266"]["mean_duration_s"] == 2.0
+        assert summary["ESP8266"]["phases_s"] == {"connect": 3.0, "write": 6.0}
+
+        failed = list(upload_records.iter_records(temp_dir, outcome=upload_records.OUTCOME_FAILED))
+        assert len(failed) == 2
+
+
+def test_make_upload_record():
+    """Test the record carries the image digest and pipeline statistics"""
+    with tempfile.NamedTemporaryFile(suffix=".bin", delete=False) as f:
+        f.write(b"\x00" * 100)
+    try:
+        stats = {"phases": {"write": 0.5}, "bytes_written": 100, "throughput_bps": 200}
+        record = upload_records.make_upload_record("ESP8266", "COM3", f.name, "success",
+                                                   1000.0, 1003.5, stats=stats, retries=2, baud="115200")
+        assert record["image_bytes"] == 100 and len(record["image_sha256"]) == 64
+        assert record["duration_s"] == 3.5 and record["throughput_bps"] == 200
+        assert record["baud"] == "115200" and record["retries"] == 2
+    finally:
+        os.remove(f.name)
+
+
+if __name__ == "__main__":
+    test_append_and_rotate()
+    test_day_rotation()
+    test_aggregate()
+    test_make_upload_record()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Test script for the headless upload CLI and the shared upload pipeline
+A fake device whose flash command is a small Python script stands in for a board
+"""
+
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from contextlib import redirect_stdout
+
+import config
+import esp_flasher
+import upload_pipeline
+import uploader_cli
+from test_esp_flasher import SimulatedLoader
+
+FAKE_DEVICE = "CLI-Test-Device"
+
+# Prints esptool-style progress and fails when the port is named "bad"
+FAKE_FLASHER = (
+    "import sys\n"
+    "print('Writing at 0x00000000 [=====     ] 50.0% 512/1024 bytes...')\n"
+    "print('Writing at 0x00000400 [==========] 100.0% 1024/1024 bytes...')\n"
+    "sys.exit(1 if sys.argv[1] == 'bad' else 0)\n"
+)
+
+
+class FakeDevice:
+    """Temporarily add the fake device to config.DEVICE_CONFIGS"""
+
+    def __enter__(self):
+        config.DEVICE_CONFIGS[FAKE_DEVICE] = {
+            "command": sys.executable,
+            "args": ["-c", FAKE_FLASHER, "{port}", "{file}"],
+            "description": "Test device"
+        }
+
+    def __exit__(self, *exc):
+        config.DEVICE_CONFIGS.pop(FAKE_DEVICE, None)
+
+
+def run_cli(argv):
+    """Run the CLI in-process and return (exit_code, events)"""
+    output = io.StringIO()
+    with redirect_stdout(output):
+        exit_code = uploader_cli.main(argv)
+    events = [json.loads(line) for line in output.getvalue().splitlines()]
+    return exit_code, events
+
+
+class ChattyLoader(SimulatedLoader):
+    """Simulated ESP8266 that prints to stdout the way esptool does"""
+    IS_STUB = False
+    secure_download_mode = False
+    stub_is_disabled = False
+
+    class Port:
+        def close(self):
+            pass
+
+    def __init__(self, port, baud, trace):
+        super().__init__(flash_size=0x400000)
+        self._port = self.Port()
+
+    def connect(self, mode, attempts):
+        print("Connecting....")
+        print("Failed to get PID of a device on SIM, using standard reset sequence.")
+
+    def run_stub(self):
+        print("Uploading stub...")
+        self.IS_STUB = True
+        return self
+
+    def change_baud(self, baud):
+        print(f"Changing baud rate to {baud}")
+
+    def flash_id(self):
+        return 0x164020  # 4MB
+
+    def flash_set_parameters(self, size):
+        pass
+
+    def hard_reset(self):
+        print("Hard resetting via RTS pin...")
+
+
+def write_firmware(temp_dir):
+    path = os.path.join(temp_dir, "app.bin")
+    with open(path, "wb") as f:
+        f.write(b"\xe9" + b"\x00" * 2047)
+    return path
+
+
+def test_no_tkinter_import():
+    """Test the CLI never imports tkinter"""
+    print("🧪 Testing CLI import footprint...")
+    result = subprocess.run([sys.executable, "-c",
+                             "import sys, uploader_cli; print('tkinter' in sys.modules)"],
+                            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert result.stdout.strip() == "False", result.stdout + result.stderr
+    print("  ✅ tkinter not loaded")
+
+
+def test_single_port_upload():
+    """Test a successful upload emits progress, a result and exit code 0"""
+    print("🧪 Testing single-port CLI upload...")
+    with FakeDevice(), tempfile.TemporaryDirectory() as temp_dir:
+        firmware = write_firmware(temp_dir)
+        exit_code, events = run_cli(["--device", FAKE_DEVICE, "--port", "good", "--file", firmware])
+
+    assert exit_code == uploader_cli.EXIT_OK
+    kinds = [event["event"] for event in events]
+    assert kinds[0] == "start" and kinds[-1] == "done"
+    percents = [event["percent"] for event in events if event["event"] == "progress"]
+    assert percents == [50, 100], percents
+    result = next(event for event in events if event["event"] == "result")
+    assert result["success"] and result["port"] == "good"
+    print(f"  ✅ {len(events)} JSON events, exit code {exit_code}")
+
+
+def test_exit_codes():
+    """Test failed uploads, invalid files and missing arguments map to distinct exit codes"""
+    print("🧪 Testing CLI exit codes...")
+    with FakeDevice(), tempfile.TemporaryDirectory() as temp_dir:
+        firmware = write_firmware(temp_dir)
+        assert run_cli(["--device", FAKE_DEVICE, "--port", "bad", "--file", firmware])[0] == \
+            uploader_cli.EXIT_UPLOAD_FAILED
+        assert run_cli(["--device", "ESP32", "--port", "good", "--file",
+                        os.path.join(temp_dir, "missing.bin")])[0] == uploader_cli.EXIT_INVALID_FILE
+        assert run_cli(["--device", FAKE_DEVICE, "--file", firmware])[0] == uploader_cli.EXIT_USAGE
+
+        # Several ports go through the gang programmer; one failure fails the run
+        exit_code, events = run_cli(["--device", FAKE_DEVICE, "--port", "good", "--port", "bad",
+                                     "--retries", "0", "--file", firmware])
+    assert exit_code == uploader_cli.EXIT_UPLOAD_FAILED
+    results = {event["port"]: event["status"] for event in events if event["event"] == "result"}
+    assert results == {"good": "success", "bad": "failed"}
+    print("  ✅ Exit codes match outcomes")
+
+
+def test_inprocess_esp_upload_keeps_stdout_json():
+    """Test esptool's own prints during an in-process ESP upload stay off the JSON stream"""
+    print("🧪 Testing in-process ESP CLI upload...")
+    if not esp_flasher.is_available():
+        print("  ⏭ esptool not installed")
+        return
+    from esptool.targets import CHIP_DEFS
+    original = CHIP_DEFS["esp8266"]
+    CHIP_DEFS["esp8266"] = ChattyLoader
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            firmware = write_firmware(temp_dir)
+            # run_cli fails on any stdout line that isn't JSON
+            exit_code, events = run_cli(["--device", "ESP8266", "--port", "SIM", "--no-cache",
+                                         "--file", firmware])
+    finally:
+        CHIP_DEFS["esp8266"] = original
+
+    assert exit_code == uploader_cli.EXIT_OK, events
+    result = next(event for event in events if event["event"] == "result")
+    assert result["success"] and result["verified"]
+    print(f"  ✅ {len(events)} JSON events, no esptool chatter on stdout")
+
+
+def test_pipeline_flash_command():
+    """Test the pipeline builds commands and offsets from the device config"""
+    pipeline = upload_pipeline.UploadPipeline("ESP32", "921600", upload_pipeline.MODE_FIRMWARE)
+    command, args = pipeline.get_flash_command("COM3", "app.bin")
+    assert command == "python" and args[-2:] == ["0x1000", "app.bin"] and "921600" in args
+    assert pipeline.get_flash_offset() == 0x1000
+    filesystem = upload_pipeline.UploadPipeline("ESP8266", "115200", upload_pipeline.MODE_FILESYSTEM)
+    assert filesystem.get_flash_offset() == 0x300000
+    _, args = upload_pipeline.UploadPipeline("ESP32-S3", "115200", upload_pipeline.MODE_FILESYSTEM) \
+        .get_flash_command("COM3", "fs.img")
+    assert args[args.index("--chip") + 1] == "esp32s3", "Filesystem uploads need esptool's chip name"
+    assert upload_pipeline.UploadPipeline("AVR", "115200", upload_pipeline.MODE_FILESYSTEM) \
+        .get_flash_command("COM3", "x.img") == (None, None)
+
+
+if __name__ == "__main__":
+    test_no_tkinter_import()
+    test_single_port_upload()
+    test_exit_codes()
+    test_inprocess_esp_upload_keeps_stdout_json()
+    test_pipeline_flash_command()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test script for coalesced window-resize handling
+Uses stand-in root, style and frame objects so no display is needed
+"""
+
+from main import JTechPixelUploader
+
+
+class FakeRoot:
+    def __init__(self):
+        self.jobs = {}
+        self.next_id = 0
+
+    def after(self, ms, func):
+        self.next_id += 1
+        self.jobs[self.next_id] = func
+        return self.next_id
+
+    def after_cancel(self, job):
+        self.jobs.pop(job, None)
+
+    def run_pending(self):
+        jobs, self.jobs = self.jobs, {}
+        for func in jobs.values():
+            func()
+
+
+class CountingStyle:
+    def __init__(self):
+        self.calls = []
+
+    def configure(self, name, **options):
+        self.calls.append(name)
+
+
+class CountingFrame:
+    def __init__(self):
+        self.paddings = []
+
+    def configure(self, padding):
+        self.paddings.append(padding)
+
+
+class Event:
+    def __init__(self, widget, width, height):
+        self.widget = widget
+        self.width = width
+        self.height = height
+
+
+def make_app():
+    app = JTechPixelUploader.__new__(JTechPixelUploader)
+    app.root = FakeRoot()
+    app.style = CountingStyle()
+    app.main_frame = CountingFrame()
+    app.initial_width = 1400
+    app.initial_height = 900
+    app._window_size = None
+    app._resize_job = None
+    app._style_fonts = {}
+    app._main_padding = None
+    app.log_system = lambda message: None
+    return app
+
+
+def test_drag_is_coalesced():
+    """Test a drag of many <Configure> events triggers one layout pass"""
+    print("🧪 Testing resize debouncing...")
+    app = make_app()
+    for width in range(1400, 1600):
+        app.on_window_resize(Event(app.root, width, 900))
+        app.on_window_resize(Event(object(), width, 900))  # Child widget events are ignored
+    assert len(app.root.jobs) == 1
+    app.root.run_pending()
+    assert app._window_size == (1599, 900)
+    assert len(app.style.calls) == 6 and app.main_frame.paddings == [22]
+    print(f"  ✅ 400 events -> {len(app.style.calls)} style updates")
+
+
+def test_styles_only_change_with_bucket():
+    """Test a resize inside the same size bucket reconfigures nothing"""
+    app = make_app()
+    app.on_window_resize(Event(app.root, 1400, 900))
+    app.root.run_pending()
+    app.style.calls.clear()
+
+    app.on_window_resize(Event(app.root, 1420, 950))  # Same font sizes and padding
+    app.root.run_pending()
+    assert app.style.calls == [] and app.main_frame.paddings == [20]
+
+    app.on_window_resize(Event(app.root, 1420, 950))  # Window move: same size, nothing scheduled
+    assert app.root.jobs == {}
+
+    app.on_window_resize(Event(app.root, 2000, 950))
+    app.root.run_pending()
+    assert len(app.style.calls) == 6 and app.main_frame.paddings == [20, 28]
+
+
+def test_layout_presets_cached():
+    """Test re-applying the active layout preset is a no-op"""
+    app = make_app()
+    app.apply_compact_layout()
+    app.apply_compact_layout()
+    assert app.style.calls == ["Title.TLabel", "Subtitle.TLabel"]
+    assert app.main_frame.paddings == [10]
+    app.apply_expanded_layout()
+    assert len(app.style.calls) == 4 and app.main_frame.paddings == [10, 30]
+
+
+def test_layout_preset_after_resize():
+    """Test a preset is re-applied once a resize has changed the fonts and padding it set"""
+    app = make_app()
+    app.apply_compact_layout()
+    app.on_window_resize(Event(app.root, 2000, 950))
+    app.root.run_pending()
+    assert app.main_frame.paddings == [10, 28]
+    app.style.calls.clear()
+    app.apply_compact_layout()
+    assert app.style.calls == ["Title.TLabel", "Subtitle.TLabel"]
+    assert app.main_frame.paddings == [10, 28, 10]
+
+
+if __name__ == "__main__":
+    test_drag_is_coalesced()
+    test_styles_only_change_with_bucket()
+    test_layout_presets_cached()
+    test_layout_preset_after_resize()
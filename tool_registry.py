@@ -0,0 +1,163 @@
+# J Tech Pixel Uploader Tool Registry
+# Probes each external tool once and remembers the resolved command, binary
+# path and version across runs. Entries expire after a TTL and are dropped
+# early when PATH changes or the resolved binary is replaced (mtime change),
+# so startup doesn't re-spawn probes for tools resolved in the last run.
+
+import hashlib
+import json
+import os
+import shlex
+import shutil
+import subprocess
+import threading
+import time
+from typing import Callable, Dict, Optional, Sequence
+
+import config
+
+VERSION_TIMEOUT = 5
+
+Finder = Callable[[], Optional[str]]
+
+
+def path_fingerprint() -> str:
+    """Short hash of the current PATH"""
+    return hashlib.sha256(os.environ.get("PATH", "").encode("utf-8")).hexdigest()[:16]
+
+
+def resolve_binary(command: Optional[str]) -> Optional[str]:
+    """Absolute path of the executable a resolved tool command runs"""
+    if not command:
+        return None
+    if os.path.isabs(command) and os.path.exists(command):
+        return command
+    try:
+        program = shlex.split(command, posix=os.name != "nt")[0]
+    except (ValueError, IndexError):
+        return None
+    return shutil.which(program)
+
+
+def _mtime(path: Optional[str]) -> Optional[float]:
+    if not path:
+        return None
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def probe_version(command: str, args: Sequence[str] = ("--version",)) -> str:
+    """First non-empty output line of `command --version`, or "" """
+    try:
+        argv = shlex.split(command, posix=os.name != "nt") if not os.path.isabs(command) else [command]
+        result = subprocess.run(argv + list(args), capture_output=True, text=True, timeout=VERSION_TIMEOUT)
+    except (OSError, ValueError, subprocess.SubprocessError):
+        return ""
+    for line in (result.stdout + "\n" + result.stderr).splitlines():
+        if line.strip():
+            return line.strip()[:120]
+    return ""
+
+
+class ToolRegistry:
+    """Persistent cache of tool discovery results"""
+
+    def __init__(self, finders: Dict[str, Finder], path: Optional[str] = None,
+                 ttl_hours: Optional[float] = None, version_args: Optional[Dict[str, Sequence[str]]] = None):
+        settings = config.TOOL_REGISTRY_CONFIG
+        self.finders = dict(finders)
+        self.path = path or os.path.join(config.get_config_dir(), settings["file_name"])
+        self.ttl = (ttl_hours if ttl_hours is not None else settings["ttl_hours"]) * 3600
+        self.version_args = version_args or {}
+        self.lock = threading.Lock()
+        # One lock per tool so concurrent lookups of the same tool probe it once
+        self._probe_locks = {name: threading.Lock() for name in self.finders}
+        self.entries = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, 'r') as f:
+                entries = json.load(f)
+            return entries if isinstance(entries, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        # Write to a temp file first so a crash never leaves a truncated registry
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(temp_path, self.path)
+        except OSError:
+            pass
+
+    def is_fresh(self, entry: Optional[Dict]) -> bool:
+        """Check an entry is within its TTL and its PATH and binary are unchanged"""
+        if not entry:
+            return False
+        if time.time() - entry.get("probed_at", 0) > self.ttl:
+            return False
+        if entry.get("path_env") != path_fingerprint():
+            return False
+        if entry.get("binary") and _mtime(entry["binary"]) != entry.get("mtime"):
+            return False
+        return True
+
+    def lookup(self, name: str) -> Dict:
+        """
+        Get the registry entry for a tool, probing it if needed
+        Returns a dict with command (None if missing), binary, version, probed_at
+        """
+        with self.lock:
+            entry = self.entries.get(name)
+        if self.is_fresh(entry):
+            return dict(entry)
+
+        with self._probe_locks[name]:
+            # Another thread may have probed while we waited
+            with self.lock:
+                entry = self.entries.get(name)
+            if self.is_fresh(entry):
+                return dict(entry)
+            entry = self._probe(name)
+            with self.lock:
+                self.entries[name] = entry
+                self._save()
+        return dict(entry)
+
+    def _probe(self, name: str) -> Dict:
+        try:
+            command = self.finders[name]()
+        except Exception:
+            command = None
+        binary = resolve_binary(command)
+        version = ""
+        if command and binary:
+            version = probe_version(command, self.version_args.get(name, ("--version",)))
+        return {
+            "command": command,
+            "binary": binary,
+            "mtime": _mtime(binary),
+            "version": version,
+            "path_env": path_fingerprint(),
+            "probed_at": time.time()
+        }
+
+    def get(self, name: str) -> Optional[str]:
+        """Resolved command for a tool, or None if it isn't installed"""
+        return self.lookup(name)["command"]
+
+    def is_available(self, name: str) -> bool:
+        return self.get(name) is not None
+
+    def invalidate(self, name: Optional[str] = None):
+        """Forget one tool (or all) so the next lookup re-probes it"""
+        with self.lock:
+            if name is None:
+                self.entries = {}
+            else:
+                self.entries.pop(name, None)
+            self._save()
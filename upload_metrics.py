@@ -0,0 +1,217 @@
+# J Tech Pixel Uploader Upload Metrics
+# Per-phase timing spans for an upload (HEX conversion, FS image build,
+# bootloader sync, stub, erase, write, verify) on a monotonic clock, the
+# summary table logged after each upload, and pluggable exporters that hand
+# the same numbers to a Prometheus textfile collector or a CSV file.
+
+import csv
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+import config
+
+
+def throughput(byte_count: int, seconds: float) -> Optional[float]:
+    """Bytes per second, or None when there is nothing to measure"""
+    if not byte_count or seconds <= 0:
+        return None
+    return byte_count / seconds
+
+
+def format_bytes(byte_count: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if byte_count < 1024 or unit == "MB":
+            return f"{byte_count:.0f} {unit}" if unit == "B" else f"{byte_count:.1f} {unit}"
+        byte_count /= 1024
+
+
+class PhaseTimer:
+    """
+    Ordered timing spans for the phases of one upload
+    Spans are opened explicitly (span) or by phase transitions (enter), e.g.
+    from flash progress callbacks or tool output; a phase may have several spans.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.spans: List[Dict] = []  # {"phase", "start", "end", "bytes"}
+        self.current: Optional[Dict] = None
+        self.lock = threading.Lock()
+
+    def enter(self, phase: str, bytes_processed: int = 0):
+        """Start a span for phase, closing the current one; no-op if already in it"""
+        with self.lock:
+            if self.current and self.current["phase"] == phase:
+                return
+            self._close()
+            self.current = {"phase": phase, "start": self.clock(), "end": None, "bytes": bytes_processed}
+            self.spans.append(self.current)
+
+    def stop(self):
+        """Close the current span"""
+        with self.lock:
+            self._close()
+
+    def _close(self):
+        if self.current:
+            self.current["end"] = self.clock()
+            self.current = None
+
+    @contextmanager
+    def span(self, phase: str, bytes_processed: int = 0):
+        """Time the block as one span of phase"""
+        self.enter(phase, bytes_processed)
+        try:
+            yield
+        finally:
+            self.stop()
+
+    def add_bytes(self, phase: str, byte_count: int):
+        """Credit bytes to the most recent span of phase"""
+        with self.lock:
+            for span in reversed(self.spans):
+                if span["phase"] == phase:
+                    span["bytes"] += byte_count
+                    return
+
+    def totals(self) -> Dict[str, Dict]:
+        """
+        Per-phase totals in the order phases first ran
+        Returns: {phase: {"duration_s", "bytes", "throughput_bps", "spans"}}
+        """
+        now = self.clock()
+        totals: Dict[str, Dict] = {}
+        with self.lock:
+            for span in self.spans:
+                phase = totals.setdefault(span["phase"], {"duration_s": 0.0, "bytes": 0, "spans": 0})
+                phase["duration_s"] += (span["end"] if span["end"] is not None else now) - span["start"]
+                phase["bytes"] += span["bytes"]
+                phase["spans"] += 1
+        for phase in totals.values():
+            phase["throughput_bps"] = throughput(phase["bytes"], phase["duration_s"])
+        return totals
+
+    def summary_table(self) -> List[str]:
+        """Fixed-width summary lines: phase, time, share of total, bytes and throughput"""
+        totals = self.totals()
+        if not totals:
+            return []
+        overall = sum(phase["duration_s"] for phase in totals.values())
+        lines = [f"{'Phase':<16}{'Time':>9}{'Share':>8}{'Bytes':>12}{'Throughput':>14}"]
+        for name, phase in totals.items():
+            share = phase["duration_s"] / overall * 100 if overall else 0.0
+            byte_text = format_bytes(phase["bytes"]) if phase["bytes"] else "-"
+            rate = phase["throughput_bps"]
+            rate_text = f"{format_bytes(rate)}/s" if rate else "-"
+            lines.append(f"{name:<16}{phase['duration_s']:>8.2f}s{share:>7.0f}%{byte_text:>12}{rate_text:>14}")
+        lines.append(f"{'total':<16}{overall:>8.2f}s")
+        return lines
+
+
+# --- exporters ----------------------------------------------------------
+
+class MetricsExporter:
+    """Base class: receives the upload record and its per-phase totals after each upload"""
+
+    def export(self, record: Dict, phases: Dict[str, Dict]):
+        raise NotImplementedError
+
+
+def _metrics_path(file_name: str) -> str:
+    return file_name if os.path.isabs(file_name) else os.path.join(config.get_config_dir(), file_name)
+
+
+def _label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+# Gauges written by PrometheusTextfileExporter: (name, help text)
+PROMETHEUS_FAMILIES = [
+    ("jtech_upload_phase_seconds", "Time spent in each phase of the last upload"),
+    ("jtech_upload_phase_bytes", "Bytes processed in each phase of the last upload"),
+    ("jtech_upload_duration_seconds", "Total duration of the last upload"),
+    ("jtech_upload_success", "Whether the last upload succeeded"),
+    ("jtech_upload_timestamp_seconds", "Start time of the last upload"),
+]
+
+
+class PrometheusTextfileExporter(MetricsExporter):
+    """
+    Writes the latest upload per device and port in the node_exporter textfile
+    collector format, replacing the file atomically so scrapes never see half a file
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or _metrics_path(config.METRICS_CONFIG["prometheus_file"])
+        self.latest: Dict[tuple, tuple] = {}
+        self.lock = threading.Lock()
+
+    def export(self, record: Dict, phases: Dict[str, Dict]):
+        with self.lock:
+            self.latest[(record.get("device"), record.get("port"))] = (record, phases)
+            samples = {family: [] for family, _ in PROMETHEUS_FAMILIES}
+            for (device, port), (last, last_phases) in sorted(self.latest.items(), key=str):
+                labels = f'device="{_label(device)}",port="{_label(port)}"'
+                for name, phase in last_phases.items():
+                    phase_labels = f'{labels},phase="{_label(name)}"'
+                    samples["jtech_upload_phase_seconds"].append((phase_labels, f"{phase['duration_s']:.6f}"))
+                    samples["jtech_upload_phase_bytes"].append((phase_labels, phase["bytes"]))
+                samples["jtech_upload_duration_seconds"].append((labels, last.get("duration_s", 0)))
+                samples["jtech_upload_success"].append((labels, int(last.get("outcome") == "success")))
+                samples["jtech_upload_timestamp_seconds"].append((labels, last.get("started_at", 0)))
+
+            # Text exposition format: each family's HELP, TYPE and samples must be contiguous
+            lines = []
+            for family, help_text in PROMETHEUS_FAMILIES:
+                lines.append(f"# HELP {family} {help_text}")
+                lines.append(f"# TYPE {family} gauge")
+                lines.extend(f"{family}{{{labels}}} {value}" for labels, value in samples[family])
+
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write("\n".join(lines) + "\n")
+            os.replace(temp_path, self.path)
+
+
+class CsvExporter(MetricsExporter):
+    """Appends one row per phase of every upload"""
+
+    FIELDS = ["timestamp", "device", "port", "outcome", "phase", "duration_s", "bytes", "throughput_bps"]
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or _metrics_path(config.METRICS_CONFIG["csv_file"])
+        self.lock = threading.Lock()
+
+    def export(self, record: Dict, phases: Dict[str, Dict]):
+        with self.lock:
+            new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            with open(self.path, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                if new_file:
+                    writer.writerow(self.FIELDS)
+                for name, phase in phases.items():
+                    rate = phase["throughput_bps"]
+                    writer.writerow([record.get("timestamp"), record.get("device"), record.get("port"),
+                                     record.get("outcome"), name, f"{phase['duration_s']:.3f}",
+                                     phase["bytes"], f"{rate:.0f}" if rate else ""])
+
+
+# Exporter name -> factory; register_exporter() adds more
+EXPORTERS: Dict[str, Callable[[], MetricsExporter]] = {
+    "prometheus": PrometheusTextfileExporter,
+    "csv": CsvExporter
+}
+
+
+def register_exporter(name: str, factory: Callable[[], MetricsExporter]):
+    """Make an exporter selectable by name in METRICS_CONFIG["exporters"]"""
+    EXPORTERS[name] = factory
+
+
+def create_exporters(names: Optional[List[str]] = None) -> List[MetricsExporter]:
+    """Instantiate the configured exporters, skipping unknown names"""
+    names = config.METRICS_CONFIG["exporters"] if names is None else names
+    return [EXPORTERS[name]() for name in names if name in EXPORTERS]
@@ -0,0 +1,259 @@
+# J Tech Pixel Uploader Upload Records
+# One JSON object per upload appended to JSON-lines segment files in the
+# UploadLogs directory. Segments rotate by size and by day, and closed
+# segments are gzip-compressed. The reader side streams records one line at
+# a time, so aggregating months of history never loads a whole file.
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import config
+
+DIGEST_CHUNK_SIZE = 1024 * 1024
+
+# uploads-YYYYMMDD-NNN.jsonl (active) or .jsonl.gz (closed)
+SEGMENT_PATTERN = re.compile(r"^uploads-(\d{8})-(\d{3})\.jsonl(\.gz)?$")
+
+# Upload outcomes
+OUTCOME_SUCCESS = "success"
+OUTCOME_VERIFY_FAILED = "verify_failed"
+OUTCOME_FAILED = "failed"
+OUTCOME_PROCESSING_FAILED = "processing_failed"
+OUTCOME_ERROR = "error"
+OUTCOME_CANCELLED = "cancelled"
+
+
+def get_upload_log_dir() -> str:
+    """Directory holding the upload record segments"""
+    return os.path.join(config.get_config_dir(), config.UPLOAD_RECORDS_CONFIG["dir_name"])
+
+
+def file_digest(path: str) -> Optional[str]:
+    """SHA-256 of a file as a hex string, or None if it can't be read"""
+    try:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(DIGEST_CHUNK_SIZE), b""):
+                sha.update(chunk)
+        return sha.hexdigest()
+    except OSError:
+        return None
+
+
+def make_upload_record(device: str, port: str, firmware: str, outcome: str, started: float,
+                       finished: Optional[float] = None, stats: Optional[Dict] = None, retries: int = 0,
+                       **extra) -> Dict:
+    """
+    Build one upload record
+    started/finished: unix times of the run (finished defaults to now)
+    stats: pipeline statistics (phases, bytes_written, throughput_bps)
+    retries: flash attempts after the first (gang uploads retry failed ports)
+    """
+    stats = stats or {}
+    finished = finished or time.time()
+    record = {
+        "timestamp": datetime.fromtimestamp(started).isoformat(),
+        "started_at": round(started, 3),
+        "duration_s": round(finished - started, 3),
+        "device": device,
+        "port": port,
+        "firmware": firmware,
+        "image_sha256": file_digest(firmware) if firmware else None,
+        "image_bytes": os.path.getsize(firmware) if firmware and os.path.isfile(firmware) else None,
+        "phases": stats.get("phases", {}),
+        "bytes_written": stats.get("bytes_written", 0),
+        "throughput_bps": stats.get("throughput_bps"),
+        "retries": retries,
+        "outcome": outcome
+    }
+    record.update(extra)
+    return record
+
+
+def compress_segment(path: str) -> Optional[str]:
+    """Gzip a closed segment next to itself and remove the original"""
+    compressed_path = path + ".gz"
+    temp_path = compressed_path + ".tmp"
+    try:
+        with open(path, 'rb') as source, gzip.open(temp_path, 'wb') as target:
+            shutil.copyfileobj(source, target)
+        os.replace(temp_path, compressed_path)
+        os.remove(path)
+        return compressed_path
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        return None
+
+
+def list_segments(directory: Optional[str] = None) -> List[str]:
+    """Segment paths in chronological order (compressed and active)"""
+    directory = directory or get_upload_log_dir()
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    segments = []
+    for name in names:
+        match = SEGMENT_PATTERN.match(name)
+        if match:
+            segments.append((match.group(1), int(match.group(2)), name))
+    return [os.path.join(directory, name) for _, _, name in sorted(segments)]
+
+
+class UploadRecordWriter:
+    """Append-only, buffered JSON-lines writer with size/day rotation"""
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None,
+                 flush_every: Optional[int] = None):
+        settings = config.UPLOAD_RECORDS_CONFIG
+        self.directory = directory or get_upload_log_dir()
+        self.max_bytes = max_bytes or settings["segment_size_kb"] * 1024
+        self.flush_every = max(1, flush_every or settings["flush_every"])
+        self.lock = threading.Lock()
+        self.path = None
+        self._file = None
+        self._day = None
+        self._size = 0
+        self._pending = 0
+
+    def _open(self, day: str):
+        """Open today's newest segment, or start a new one; compress every other plain segment"""
+        os.makedirs(self.directory, exist_ok=True)
+        sequence = 0
+        plain = []
+        for path in list_segments(self.directory):
+            match = SEGMENT_PATTERN.match(os.path.basename(path))
+            if match.group(1) == day:
+                sequence = max(sequence, int(match.group(2)))
+            if not match.group(3):
+                plain.append(path)
+
+        self.path = os.path.join(self.directory, f"uploads-{day}-{sequence:03d}.jsonl")
+        if self.path not in plain or os.path.getsize(self.path) >= self.max_bytes:
+            self.path = os.path.join(self.directory, f"uploads-{day}-{sequence + 1:03d}.jsonl")
+        for path in plain:
+            if path != self.path:
+                # Left over from an earlier day or run
+                compress_segment(path)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._size = os.path.getsize(self.path)
+        self._day = day
+
+    def _rotate(self, day: str):
+        self._close_file()
+        if self.path:
+            compress_segment(self.path)
+        self._open(day)
+
+    def _close_file(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+            self._pending = 0
+
+    def append(self, record: Dict):
+        """Append one record, rotating first if the segment is full or the day changed"""
+        line = json.dumps(record, separators=(",", ":"), default=str) + "\n"
+        size = len(line.encode("utf-8"))
+        day = time.strftime("%Y%m%d")
+        with self.lock:
+            if self._file is None:
+                self._open(day)
+            elif day != self._day or (self._size and self._size + size > self.max_bytes):
+                self._rotate(day)
+            self._file.write(line)
+            self._size += size
+            self._pending += 1
+            if self._pending >= self.flush_every:
+                self._file.flush()
+                self._pending = 0
+
+    def flush(self):
+        with self.lock:
+            if self._file:
+                self._file.flush()
+                self._pending = 0
+
+    def close(self):
+        with self.lock:
+            self._close_file()
+
+
+def iter_records(directory: Optional[str] = None, since: Optional[float] = None,
+                 until: Optional[float] = None, device: Optional[str] = None,
+                 outcome: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Stream upload records oldest first, optionally filtered
+    since/until are unix times; segments written before `since` are skipped by name
+    """
+    first_day = time.strftime("%Y%m%d", time.localtime(since)) if since is not None else None
+    for path in list_segments(directory):
+        if first_day and SEGMENT_PATTERN.match(os.path.basename(path)).group(1) < first_day:
+            continue
+        opener = gzip.open if path.endswith(".gz") else open
+        try:
+            with opener(path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Partially written line from a crash
+                    started = record.get("started_at", 0)
+                    if since is not None and started < since:
+                        continue
+                    if until is not None and started >= until:
+                        continue
+                    if device and record.get("device") != device:
+                        continue
+                    if outcome and record.get("outcome") != outcome:
+                        continue
+                    yield record
+        except (OSError, EOFError):
+            continue  # Segment being rotated or truncated gzip
+
+
+def aggregate_records(records: Iterable[Dict], key: str = "device") -> Dict[str, Dict]:
+    """
+    Summarize records grouped by a field (device, port, outcome, ...)
+    Returns: {group: {count, successes, failures, retries, bytes_written,
+              mean_duration_s, mean_throughput_bps, phases_s}}
+    """
+    groups: Dict[str, Dict] = {}
+    for record in records:
+        group = groups.setdefault(str(record.get(key)), {
+            "count": 0, "successes": 0, "failures": 0, "retries": 0, "bytes_written": 0,
+            "duration_s": 0.0, "throughput_sum": 0.0, "throughput_count": 0, "phases_s": {}
+        })
+        group["count"] += 1
+        if record.get("outcome") == OUTCOME_SUCCESS:
+            group["successes"] += 1
+        else:
+            group["failures"] += 1
+        group["retries"] += record.get("retries") or 0
+        group["bytes_written"] += record.get("bytes_written") or 0
+        group["duration_s"] += record.get("duration_s") or 0.0
+        if record.get("throughput_bps"):
+            group["throughput_sum"] += record["throughput_bps"]
+            group["throughput_count"] += 1
+        for phase, seconds in (record.get("phases") or {}).items():
+            group["phases_s"][phase] = group["phases_s"].get(phase, 0.0) + seconds
+
+    for group in groups.values():
+        count = group["count"]
+        throughput_count = group.pop("throughput_count")
+        throughput_sum = group.pop("throughput_sum")
+        group["mean_duration_s"] = round(group.pop("duration_s") / count, 3)
+        group["mean_throughput_bps"] = round(throughput_sum / throughput_count) if throughput_count else None
+        group["phases_s"] = {phase: round(seconds, 3) for phase, seconds in group["phases_s"].items()}
+    return groups
@@ -0,0 +1,215 @@
+# J Tech Pixel Uploader Command Line Interface
+# Headless flashing for scripts and line stations: runs the same upload
+# pipeline as the GUI without importing tkinter, prints one JSON object per
+# line on stdout and exits with a status code describing the outcome.
+# Anything else that prints during the run (esptool's chatter) goes to stderr.
+#
+#   python -m uploader_cli --device ESP32 --port COM3 --file pattern.dat --mode filesystem
+#   python -m uploader_cli --device ESP8266 --port /dev/ttyUSB0 --port /dev/ttyUSB1 --file app.bin
+
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from typing import List, Optional
+
+import config
+import upload_pipeline
+import utils
+
+# Exit codes
+EXIT_OK = 0
+EXIT_UPLOAD_FAILED = 1
+EXIT_USAGE = 2              # Same as argparse errors
+EXIT_INVALID_FILE = 3       # Validation or processing failed, nothing was flashed
+EXIT_VERIFY_FAILED = 4      # Written, but the flash didn't verify
+EXIT_INTERRUPTED = 130
+
+
+class JsonReporter:
+    """Writes events as JSON lines; progress is only emitted when the whole percent changes"""
+
+    def __init__(self, stream=None):
+        # Bound now: main() points sys.stdout elsewhere while the upload runs
+        self.stream = stream or sys.stdout
+        self.lock = threading.Lock()
+        self.start_time = time.monotonic()
+        self._last_percent = {}
+
+    def emit(self, event: str, **fields):
+        record = {"event": event, "time": round(time.monotonic() - self.start_time, 3)}
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False)
+        with self.lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def log(self, message: str, level: str = "info", port: Optional[str] = None):
+        self.emit("log", level=level, message=message, port=port)
+
+    def progress(self, percent: float, port: Optional[str] = None, phase: str = "", **fields):
+        percent = int(max(0.0, min(100.0, percent)))
+        with self.lock:
+            if self._last_percent.get(port) == percent:
+                return
+            self._last_percent[port] = percent
+        self.emit("progress", port=port, percent=percent, phase=phase, **fields)
+
+
+def build_parser():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="uploader_cli",
+        description="J Tech Pixel Uploader - headless firmware and data upload (JSON lines output)")
+    parser.add_argument("--device", "-d", choices=sorted(config.DEVICE_CONFIGS),
+                        help="Target device type")
+    parser.add_argument("--port", "-p", action="append", default=[],
+                        help="Serial port; repeat to flash several ports at once")
+    parser.add_argument("--baud", "-b", default=config.DEFAULT_BAUD_RATE,
+                        help=f"Baud rate (default: {config.DEFAULT_BAUD_RATE})")
+    parser.add_argument("--mode", "-m", choices=[upload_pipeline.MODE_FIRMWARE, upload_pipeline.MODE_FILESYSTEM],
+                        default=upload_pipeline.MODE_FIRMWARE, help="Upload mode (default: firmware)")
+    parser.add_argument("--file", "-f", help="Firmware (.bin/.hex, .elf for ESP8266) or data (.dat) file")
+    parser.add_argument("--no-verify", action="store_true", help="Skip verification after writing")
+    parser.add_argument("--erase", action="store_true", help="Erase the whole flash before writing")
+    parser.add_argument("--delta", action="store_true", help="Only write sectors that changed (ESP)")
+    parser.add_argument("--skip-identical", action="store_true",
+                        help="Skip the write if the device already has this image (ESP)")
+    parser.add_argument("--no-cache", action="store_true", help="Don't reuse processed file artifacts")
+    parser.add_argument("--workers", type=int, default=None, help="Parallel ports for multi-port uploads")
+    parser.add_argument("--retries", type=int, default=None, help="Retries per port for multi-port uploads")
+    parser.add_argument("--list-devices", action="store_true", help="Print supported devices and exit")
+    parser.add_argument("--list-ports", action="store_true", help="Print detected serial ports and exit")
+    return parser
+
+
+def create_pipeline(args, reporter: JsonReporter) -> upload_pipeline.UploadPipeline:
+    flash_cache = None
+    if args.skip_identical:
+        import flash_cache as flash_cache_module
+        flash_cache = flash_cache_module.FlashCache()
+
+    artifact_cache = None
+    if not args.no_cache and config.ARTIFACT_CACHE_CONFIG["enabled"]:
+        import artifact_cache as artifact_cache_module
+        artifact_cache = artifact_cache_module.ArtifactCache()
+
+    return upload_pipeline.UploadPipeline(
+        args.device, args.baud, args.mode,
+        verify=not args.no_verify, erase=args.erase, delta=args.delta,
+        flash_cache=flash_cache, artifact_cache=artifact_cache,
+        log_callback=reporter.log,
+        progress_callback=reporter.progress)
+
+
+def flash_single(pipeline: upload_pipeline.UploadPipeline, port: str, processed_file: str,
+                 reporter: JsonReporter) -> int:
+    pipeline.log_callback = lambda message, level="info": reporter.log(message, level, port)
+    pipeline.progress_callback = None
+
+    def on_progress_event(event):
+        if event["overall"] is not None:
+            rate = event["rate_bps"]
+            reporter.progress(event["overall"], port, event["phase"],
+                              kbps=round(rate / 1024, 1) if rate else None, eta_s=event["eta_s"])
+
+    pipeline.progress_event_callback = on_progress_event
+
+    success, verify_success = pipeline.flash(port, processed_file)
+    reporter.emit("result", port=port, success=bool(success), verified=verify_success, **pipeline.stats())
+    if not success:
+        return EXIT_UPLOAD_FAILED
+    if verify_success is False:
+        return EXIT_VERIFY_FAILED
+    return EXIT_OK
+
+
+def flash_many(pipeline: upload_pipeline.UploadPipeline, ports: List[str], processed_file: str,
+               args, reporter: JsonReporter) -> int:
+    import gang_flasher
+
+    def on_update(port, state):
+        reporter.progress(state["progress"], port, state["phase"])
+
+    programmer = gang_flasher.GangProgrammer(
+        ports, pipeline.create_gang_flash_function(processed_file),
+        max_workers=args.workers or gang_flasher.DEFAULT_MAX_WORKERS,
+        retries=args.retries if args.retries is not None else gang_flasher.DEFAULT_RETRIES,
+        update_callback=on_update,
+        log_callback=lambda port, message: reporter.log(message, port=port))
+    try:
+        states = programmer.run()
+    except KeyboardInterrupt:
+        programmer.cancel()
+        states = programmer.wait()
+
+    for port, state in states.items():
+        reporter.emit("result", port=port, success=state["status"] == gang_flasher.STATE_SUCCESS,
+                      status=state["status"], attempts=state["attempts"], error=state["error"],
+                      elapsed=round(state["elapsed"], 3))
+    if all(state["status"] == gang_flasher.STATE_SUCCESS for state in states.values()):
+        return EXIT_OK
+    return EXIT_UPLOAD_FAILED
+
+
+def run(args, reporter: JsonReporter) -> int:
+    if args.list_devices:
+        for name, device_config in config.DEVICE_CONFIGS.items():
+            reporter.emit("device", name=name, description=device_config.get("description", ""),
+                          inprocess=upload_pipeline.use_inprocess_esptool(name))
+        return EXIT_OK
+    if args.list_ports:
+        for port in utils.list_serial_ports():
+            reporter.emit("port", port=port)
+        return EXIT_OK
+
+    missing = [flag for flag, value in (("--device", args.device), ("--port", args.port), ("--file", args.file))
+               if not value]
+    if missing:
+        reporter.log(f"Missing required argument(s): {', '.join(missing)}", "error")
+        return EXIT_USAGE
+
+    ports = list(dict.fromkeys(args.port))
+    reporter.emit("start", device=args.device, ports=ports, baud=str(args.baud), mode=args.mode,
+                  file=os.path.abspath(args.file))
+
+    valid, message = utils.validate_firmware_file(args.file, args.device)
+    if not valid:
+        reporter.log(message, "error")
+        return EXIT_INVALID_FILE
+
+    pipeline = create_pipeline(args, reporter)
+    processed_file = pipeline.process_file(args.file)
+    if not processed_file:
+        return EXIT_INVALID_FILE
+
+    try:
+        if len(ports) == 1:
+            return flash_single(pipeline, ports[0], processed_file, reporter)
+        return flash_many(pipeline, ports, processed_file, args, reporter)
+    finally:
+        pipeline.cleanup()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point; returns the process exit code"""
+    args = build_parser().parse_args(argv)
+    reporter = JsonReporter()
+    try:
+        # In-process esptool prints its own progress chatter; keep stdout pure JSON lines
+        with contextlib.redirect_stdout(sys.stderr):
+            exit_code = run(args, reporter)
+    except KeyboardInterrupt:
+        exit_code = EXIT_INTERRUPTED
+    except Exception as e:
+        reporter.log(f"Unexpected error: {str(e)}", "error")
+        exit_code = EXIT_UPLOAD_FAILED
+    reporter.emit("done", exit_code=exit_code)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,10 +7,15 @@ import platform
 import shutil
 import hashlib
 import tempfile
+import threading
 from typing import List, Dict, Optional, Tuple
 from pathlib import Path
-import urllib.request
-import zipfile
+
+import config
+import elf_reader
+import fs_image
+import intel_hex
+import tool_registry
 
 def check_command_available(command: str) -> bool:
     """Check if a command is available in the system PATH"""
@@ -132,6 +137,12 @@ def find_lpc21isp() -> Optional[str]:
         return "lpc21isp"
     return None
 
+def find_ffmpeg() -> Optional[str]:
+    """Find ffmpeg, used to decode video for animation import"""
+    if check_command_available("ffmpeg"):
+        return "ffmpeg"
+    return None
+
 def find_hex_converter() -> Optional[str]:
     """Find a HEX to BIN converter tool"""
     # Try srec_cat first (most reliable)
@@ -153,6 +164,10 @@ def download_and_install_fs_tools() -> Tuple[bool, str]:
     Automatically download and install filesystem tools (mkspiffs/mklittlefs)
     Returns: (success, message)
     """
+    # Only needed for the download, so kept out of the startup import path
+    import urllib.request
+    import zipfile
+    
     try:
         system = platform.system().lower()
         machine = platform.machine().lower()
@@ -283,90 +298,130 @@ def find_fs_builder() -> Optional[str]:
         print(f"❌ {message}")
         return None
 
+def get_fs_builder() -> Optional[str]:
+    """Get the filesystem image builder for the configured filesystem"""
+    if config.FS_IMAGE_CONFIG["filesystem"] == "littlefs":
+        return "built-in littlefs"
+    return find_fs_builder()
+
+# Registry name -> finder for every external tool the uploader can use
+TOOL_FINDERS = {
+    "esptool": find_esptool,              # ESP Series
+    "avrdude": find_avrdude,              # AVR Series
+    "stm32flash": find_stm32flash,        # STM32 Series
+    "mplab_ipe": find_mplab_ipe,          # PIC Series
+    "rp2040": find_rp2040_tool,           # RP2040 Series
+    "arduino_cli": find_arduino_cli,      # Arduino Variants
+    "teensy_loader": find_teensy_loader,  # Teensy Series
+    "mspdebug": find_mspdebug,            # MSP430 Series
+    "commander": find_commander,          # EFM32 Series
+    "lpc21isp": find_lpc21isp,            # LPC Series
+    # Utility Tools
+    "hex_converter": find_hex_converter,
+    "fs_builder": get_fs_builder,
+    "ffmpeg": find_ffmpeg
+}
+
+# Tools that don't understand --version
+TOOL_VERSION_ARGS = {
+    "esptool": ("version",),
+    "arduino_cli": ("version",),
+    "avrdude": ("-?",),
+    "stm32flash": ("-h",),
+    "teensy_loader": ("--help",),
+    "ffmpeg": ("-version",)
+}
+
+_tool_registry = None
+_tool_registry_lock = threading.Lock()
+
+def get_tool_registry() -> tool_registry.ToolRegistry:
+    """Shared tool registry, loaded from the config directory on first use"""
+    global _tool_registry
+    with _tool_registry_lock:
+        if _tool_registry is None:
+            _tool_registry = tool_registry.ToolRegistry(TOOL_FINDERS, version_args=TOOL_VERSION_ARGS)
+    return _tool_registry
+
 def get_available_tools() -> Dict[str, bool]:
     """Get a dictionary of available flashing tools for all 25 IC families"""
-    return {
-        # ESP Series
-        "esptool": find_esptool() is not None,
-        
-        # AVR Series
-        "avrdude": find_avrdude() is not None,
-        
-        # STM32 Series
-        "stm32flash": find_stm32flash() is not None,
-        
-        # PIC Series
-        "mplab_ipe": find_mplab_ipe() is not None,
-        
-        # RP2040 Series
-        "rp2040": find_rp2040_tool() is not None,
-        
-        # Arduino Variants
-        "arduino_cli": find_arduino_cli() is not None,
-        
-        # Teensy Series
-        "teensy_loader": find_teensy_loader() is not None,
-        
-        # MSP430 Series
-        "mspdebug": find_mspdebug() is not None,
-        
-        # EFM32 Series
-        "commander": find_commander() is not None,
-        
-        # LPC Series
-        "lpc21isp": find_lpc21isp() is not None,
-        
-        # Utility Tools
-        "hex_converter": find_hex_converter() is not None,
-        "fs_builder": find_fs_builder() is not None
-    }
+    registry = get_tool_registry()
+    return {name: registry.is_available(name) for name in TOOL_FINDERS}
 
-def convert_hex_to_bin(hex_file_path: str) -> Tuple[bool, str, str]:
+def convert_hex_to_bin(hex_file_path: str, output_path: Optional[str] = None) -> Tuple[bool, str, str]:
     """
-    Convert HEX file to BIN format
+    Convert HEX file to BIN format using the built-in Intel HEX parser
+    Writes to a new temporary file unless output_path is given, so the
+    firmware's folder (possibly read-only or shared) is never touched
     Returns: (success, output_path, error_message)
     """
+    temp_path = None
     try:
         if not os.path.exists(hex_file_path):
             return False, "", "HEX file does not exist"
         
-        # Find converter tool
-        converter = find_hex_converter()
-        if not converter:
-            return False, "", "No HEX to BIN converter found. Install srec_cat, objcopy, or hex2bin"
+        hex_image = intel_hex.load_hex(hex_file_path)
+        if not hex_image.segments:
+            return False, "", "HEX file contains no data records"
         
         # Create output path
-        output_path = os.path.splitext(hex_file_path)[0] + ".bin"
-        
-        # Run conversion
-        if converter == "srec_cat":
-            cmd = ["srec_cat", hex_file_path, "-Intel", "-o", output_path, "-Binary"]
-        elif converter == "objcopy":
-            cmd = ["objcopy", "-I", "ihex", "-O", "binary", hex_file_path, output_path]
-        elif converter == "hex2bin":
-            cmd = ["hex2bin", hex_file_path]
-            output_path = os.path.splitext(hex_file_path)[0] + ".bin"
+        if not output_path:
+            name = os.path.splitext(os.path.basename(hex_file_path))[0]
+            fd, temp_path = tempfile.mkstemp(prefix=f"{name}_", suffix=".bin")
+            os.close(fd)
+            output_path = temp_path
         
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-        
-        if result.returncode == 0 and os.path.exists(output_path):
-            return True, output_path, f"Successfully converted to {os.path.basename(output_path)}"
-        else:
-            error_msg = result.stderr or result.stdout or "Unknown conversion error"
-            return False, "", f"Conversion failed: {error_msg}"
+        size = intel_hex.write_bin(hex_image, output_path)
+        temp_path = None
+        return True, output_path, (f"Successfully converted to {os.path.basename(output_path)} "
+                                   f"({size} bytes from 0x{hex_image.min_address:08X})")
             
+    except intel_hex.IntelHexError as e:
+        return False, "", f"Conversion failed: {str(e)}"
     except Exception as e:
         return False, "", f"Conversion error: {str(e)}"
+    finally:
+        if temp_path:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
 
-def create_fs_image(dat_file_path: str, fs_size_mb: int = 1) -> Tuple[bool, str, str]:
+def load_segmented_image(file_path: str):
+    """
+    Load a HEX or ELF file as a sparse image of (address, data) segments
+    Raises intel_hex.IntelHexError / elf_reader.ElfError for malformed files
+    """
+    if os.path.splitext(file_path)[1].lower() == ".elf":
+        return elf_reader.load_elf(file_path)
+    return intel_hex.load_hex(file_path)
+
+def create_fs_image(dat_file_path: str, fs_size_mb: int = 1,
+                    output_path: Optional[str] = None) -> Tuple[bool, str, str]:
     """
     Create a file system image from DAT file
+    Writes next to the source file unless output_path is given
     Returns: (success, output_path, error_message)
     """
     try:
         if not os.path.exists(dat_file_path):
             return False, "", "DAT file does not exist"
         
+        # Create output path
+        output_path = output_path or os.path.splitext(dat_file_path)[0] + "_fs.img"
+        fs_size_bytes = fs_size_mb * 1024 * 1024
+        fs_config = config.FS_IMAGE_CONFIG
+        
+        if fs_config["filesystem"] == "littlefs":
+            # Build the LittleFS image in memory - no external tool needed
+            with open(dat_file_path, 'rb') as f:
+                files = {os.path.basename(dat_file_path): f.read()}
+            image = fs_image.build_littlefs_image(files, fs_size_bytes,
+                                                  fs_config["block_size"], fs_config["page_size"])
+            with open(output_path, 'wb') as f:
+                f.write(image)
+            return True, output_path, f"Successfully created LittleFS image: {os.path.basename(output_path)}"
+        
         # Find FS builder tool
         builder = find_fs_builder()
         if not builder:
@@ -382,18 +437,9 @@ def create_fs_image(dat_file_path: str, fs_size_mb: int = 1) -> Tuple[bool, str,
         fs_dat_path = os.path.join(fs_root, dat_filename)
         shutil.copy2(dat_file_path, fs_dat_path)
         
-        # Create output path
-        output_path = os.path.splitext(dat_file_path)[0] + "_fs.img"
-        fs_size_bytes = fs_size_mb * 1024 * 1024
-        
         # Build FS image
-        if "mkspiffs" in builder.lower():
-            cmd = [builder, "-c", fs_root, "-b", "4096", "-p", "256", "-s", str(fs_size_bytes), output_path]
-        elif "mklittlefs" in builder.lower():
-            cmd = [builder, "-c", fs_root, "-b", "4096", "-p", "256", "-s", str(fs_size_bytes), output_path]
-        else:
-            # Fallback for other tools
-            cmd = [builder, "-c", fs_root, "-b", "4096", "-p", "256", "-s", str(fs_size_bytes), output_path]
+        cmd = [builder, "-c", fs_root, "-b", str(fs_config["block_size"]), "-p", str(fs_config["page_size"]),
+               "-s", str(fs_size_bytes), output_path]
         
         result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
         
@@ -409,6 +455,8 @@ def create_fs_image(dat_file_path: str, fs_size_mb: int = 1) -> Tuple[bool, str,
             error_msg = result.stderr or result.stdout or "Unknown FS creation error"
             return False, "", f"FS image creation failed: {error_msg}"
             
+    except fs_image.FsImageError as e:
+        return False, "", f"FS image creation failed: {str(e)}"
     except Exception as e:
         return False, "", f"FS image creation error: {str(e)}"
 
@@ -428,18 +476,14 @@ def validate_firmware_file(file_path: str, device_type: str) -> Tuple[bool, str]
     file_ext = os.path.splitext(file_path)[1].lower()
     
     if device_type in ["ESP8266", "ESP32"]:
-        if file_ext not in [".bin", ".hex", ".dat"]:
-            return False, f"ESP devices require .bin, .hex, or .dat files, got {file_ext}"
+        supported = [".bin", ".hex", ".dat", ".elf"] if device_type == "ESP8266" else [".bin", ".hex", ".dat"]
+        if file_ext not in supported:
+            return False, f"{device_type} requires {', '.join(supported)} files, got {file_ext}"
         
         # Additional validation for ESP devices
-        if file_ext == ".hex":
-            # Check if converter is available
-            if not find_hex_converter():
-                return False, "HEX files require a converter tool (srec_cat, objcopy, or hex2bin). Install one to continue."
-        
         if file_ext == ".dat":
             # Check if FS builder is available
-            if not find_fs_builder():
+            if not get_fs_builder():
                 return False, "DAT files require a file system builder (mkspiffs or mklittlefs). Install one to continue."
             
         elif file_ext == ".bin":
@@ -491,21 +535,16 @@ def get_file_type_info(file_path: str) -> Dict[str, str]:
         info["type"] = "intel_hex"
         info["status"] = "needs_conversion"
         info["processing_required"] = True
-        info["processing_tool"] = find_hex_converter()
+        info["processing_tool"] = "built-in"
         info["output_format"] = "binary"
-        
-        if info["processing_tool"]:
-            info["status"] = "can_convert"
-            info["notes"].append(f"Will convert to .bin using {info['processing_tool']}")
-        else:
-            info["status"] = "converter_missing"
-            info["notes"].append("No HEX converter tool found")
+        info["status"] = "can_convert"
+        info["notes"].append("Will convert to .bin with the built-in HEX parser")
             
     elif file_ext == ".dat":
         info["type"] = "data_file"
         info["status"] = "needs_fs_image"
         info["processing_required"] = True
-        info["processing_tool"] = find_fs_builder()
+        info["processing_tool"] = get_fs_builder()
         info["output_format"] = "filesystem_image"
         
         if info["processing_tool"]:
@@ -524,17 +563,12 @@ def get_file_type_info(file_path: str) -> Dict[str, str]:
     
     elif file_ext == ".elf":
         info["type"] = "elf_debug"
-        info["status"] = "needs_conversion"
+        info["status"] = "can_convert"
         info["processing_required"] = True
-        info["processing_tool"] = find_hex_converter()
-        info["output_format"] = "binary"
-        
-        if info["processing_tool"]:
-            info["status"] = "can_convert"
-            info["notes"].append(f"Will convert ELF to binary using {info['processing_tool']}")
-        else:
-            info["status"] = "converter_missing"
-            info["notes"].append("No ELF converter tool found")
+        info["processing_tool"] = "built-in"
+        info["output_format"] = "segments"
+        info["notes"].append("ESP8266: loadable segments are laid out as a flash image in memory "
+                             "by the built-in ELF reader")
     
     return info
 
@@ -590,6 +624,12 @@ def is_port_available(port: str) -> bool:
     except:
         return False
 
+def list_serial_ports() -> List[str]:
+    """Device names of the serial ports currently present"""
+    # Imported here; list_ports pulls in platform-specific enumeration code
+    import serial.tools.list_ports
+    return [port.device for port in serial.tools.list_ports.comports()]
+
 def get_port_info(port: str) -> Dict[str, str]:
     """Get information about a COM port"""
     try:
@@ -667,156 +707,47 @@ def create_sample_led_patterns():
     
     return created_files
 
-def create_alternating_cols_pattern():
-    """Create alternating columns pattern for 8x8 LED matrix"""
-    pattern = bytearray()
-    for y in range(8):
-        for x in range(8):
-            if x % 2 == 0:
-                pattern.extend([255, 0, 0])  # Red
-            else:
-                pattern.extend([0, 0, 255])  # Blue
-    return pattern
+def _generate_pattern(name: str, width: int, height: int) -> bytearray:
+    """Pattern bytes in the LED wiring and color order from LED_LAYOUT_CONFIG"""
+    import led_layout
+    import pattern_library
+    return pattern_library.generate(name, width, height, led_layout.configured_layout(width, height))
 
-def create_checkerboard_pattern():
-    """Create checkerboard pattern for 8x8 LED matrix"""
-    pattern = bytearray()
-    for y in range(8):
-        for x in range(8):
-            if (x + y) % 2 == 0:
-                pattern.extend([255, 255, 255])  # White
-            else:
-                pattern.extend([0, 0, 0])  # Black
-    return pattern
+def create_alternating_cols_pattern(width: int = 8, height: int = 8) -> bytearray:
+    """Create alternating columns pattern (red/blue) for a width x height LED matrix"""
+    return _generate_pattern("alternating_cols", width, height)
 
-def create_rainbow_pattern():
-    """Create rainbow pattern for 8x8 LED matrix"""
-    pattern = bytearray()
-    for y in range(8):
-        for x in range(8):
-            # Create rainbow effect
-            hue = (x + y) * 32  # 32 steps per color
-            if hue < 256:
-                # Red to Green
-                pattern.extend([255 - hue, hue, 0])
-            elif hue < 512:
-                # Green to Blue
-                pattern.extend([0, 255 - (hue - 256), hue - 256])
-            else:
-                # Blue to Red
-                pattern.extend([hue - 512, 0, 255 - (hue - 512)])
-    return pattern
+def create_checkerboard_pattern(width: int = 8, height: int = 8) -> bytearray:
+    """Create checkerboard pattern (white/black) for a width x height LED matrix"""
+    return _generate_pattern("checkerboard", width, height)
 
-def create_pulse_pattern():
-    """Create pulsing pattern for 8x8 LED matrix"""
-    pattern = bytearray()
-    center_x, center_y = 4, 4
-    for y in range(8):
-        for x in range(8):
-            # Calculate distance from center
-            distance = ((x - center_x) ** 2 + (y - center_y) ** 2) ** 0.5
-            # Create pulsing effect
-            intensity = max(0, 255 - int(distance * 40))
-            pattern.extend([intensity, intensity, intensity])
-    return pattern
+def create_rainbow_pattern(width: int = 8, height: int = 8) -> bytearray:
+    """Create rainbow pattern for a width x height LED matrix"""
+    return _generate_pattern("rainbow", width, height)
 
-def create_spiral_pattern():
-    """Create spiral pattern for 8x8 LED matrix"""
-    pattern = bytearray()
-    # Create spiral coordinates
-    spiral_coords = []
-    x, y = 0, 0
-    dx, dy = 1, 0
-    for i in range(64):
-        spiral_coords.append((x, y))
-        if (x + dx < 0 or x + dx >= 8 or y + dy < 0 or y + dy >= 8 or 
-            (x + dx, y + dy) in spiral_coords):
-            # Turn right
-            dx, dy = -dy, dx
-        x, y = x + dx, y + dy
-    
-    # Fill pattern with rainbow colors
-    for i, (x, y) in enumerate(spiral_coords):
-        hue = i * 4  # 4 steps per LED
-        if hue < 256:
-            pattern.extend([255 - hue, hue, 0])
-        elif hue < 512:
-            pattern.extend([0, 255 - (hue - 256), hue - 256])
-        else:
-            pattern.extend([hue - 512, 0, 255 - (hue - 512)])
-    
-    return pattern
+def create_pulse_pattern(width: int = 8, height: int = 8) -> bytearray:
+    """Create pulsing pattern for a width x height LED matrix"""
+    return _generate_pattern("pulse", width, height)
 
-def create_heart_pattern():
-    """Create heart pattern (8x8 matrix)"""
-    # 8x8 matrix, 3 bytes per LED (RGB), heart shape
-    pattern = bytearray()
-    
-    # Heart pattern matrix (1 = red, 0 = black)
-    heart_matrix = [
-        [0,0,0,0,0,0,0,0],
-        [0,1,1,0,0,1,1,0],
-        [1,1,1,1,1,1,1,1],
-        [1,1,1,1,1,1,1,1],
-        [1,1,1,1,1,1,1,1],
-        [0,1,1,1,1,1,1,0],
-        [0,0,1,1,1,1,0,0],
-        [0,0,0,1,1,0,0,0]
-    ]
-    
-    for row in range(8):
-        for col in range(8):
-            if heart_matrix[row][col]:
-                pattern.extend([255, 0, 0])  # Red
-            else:
-                pattern.extend([0, 0, 0])    # Black
-    
-    return pattern
+def create_spiral_pattern(width: int = 8, height: int = 8) -> bytearray:
+    """Create spiral pattern for a width x height LED matrix"""
+    return _generate_pattern("spiral", width, height)
 
-def create_cross_pattern():
-    """Create cross pattern (8x8 matrix)"""
-    # 8x8 matrix, 3 bytes per LED (RGB), cross shape
-    pattern = bytearray()
-    
-    for row in range(8):
-        for col in range(8):
-            # Create cross pattern
-            if row == 3 or row == 4 or col == 3 or col == 4:
-                pattern.extend([0, 255, 0])  # Green
-            else:
-                pattern.extend([0, 0, 0])    # Black
-    
-    return pattern
+def create_heart_pattern(width: int = 8, height: int = 8) -> bytearray:
+    """Create heart pattern for a width x height LED matrix"""
+    return _generate_pattern("heart", width, height)
 
-def create_border_pattern():
-    """Create border pattern (8x8 matrix)"""
-    # 8x8 matrix, 3 bytes per LED (RGB), border only
-    pattern = bytearray()
-    
-    for row in range(8):
-        for col in range(8):
-            # Create border pattern
-            if row == 0 or row == 7 or col == 0 or col == 7:
-                pattern.extend([0, 0, 255])  # Blue
-            else:
-                pattern.extend([0, 0, 0])    # Black
-    
-    return pattern
+def create_cross_pattern(width: int = 8, height: int = 8) -> bytearray:
+    """Create cross pattern for a width x height LED matrix"""
+    return _generate_pattern("cross", width, height)
 
-def create_diagonal_pattern():
-    """Create diagonal pattern (8x8 matrix)"""
-    # 8x8 matrix, 3 bytes per LED (RGB), diagonal lines
-    pattern = bytearray()
-    
-    for row in range(8):
-        for col in range(8):
-            # Create diagonal pattern
-            if row == col or row + col == 7:
-                pattern.extend([255, 255, 0])  # Yellow
-            else:
-                pattern.extend([0, 0, 0])      # Black
-    
-    return pattern
+def create_border_pattern(width: int = 8, height: int = 8) -> bytearray:
+    """Create border pattern for a width x height LED matrix"""
+    return _generate_pattern("border", width, height)
+
+def create_diagonal_pattern(width: int = 8, height: int = 8) -> bytearray:
+    """Create diagonal pattern for a width x height LED matrix"""
+    return _generate_pattern("diagonal", width, height)
 
 def create_sample_dat_files():
     """Create sample .dat files specifically for LED patterns"""
@@ -845,8 +776,13 @@ def create_sample_dat_files():
     
     return created_files
 
-def validate_dat_file(file_path: str) -> Tuple[bool, str]:
-    """Validate if a .dat file contains valid LED pattern data"""
+def validate_dat_file(file_path: str, frame_size: Optional[int] = None) -> Tuple[bool, str]:
+    """
+    Validate if a .dat file contains valid LED pattern data (frames or animation)
+    frame_size: bytes per frame of a flat file; inferred from the configured
+    matrix sizes when not given, and read as one frame when that's ambiguous. Flat files have 3 or 4 bytes per LED, following
+    LED_LAYOUT_CONFIG's color order
+    """
     try:
         if not os.path.exists(file_path):
             return False, "File does not exist"
@@ -854,83 +790,73 @@ def validate_dat_file(file_path: str) -> Tuple[bool, str]:
         if not file_path.lower().endswith('.dat'):
             return False, "File is not a .dat file"
         
-        file_size = os.path.getsize(file_path)
-        if file_size == 0:
-            return False, "File is empty"
-        
-        # Check if file size is reasonable for LED patterns
-        if file_size > 10240:  # 10KB max for LED patterns
-            return False, f"File too large ({file_size} bytes) for LED pattern data"
-        
-        # Read file and check if it's binary data
-        with open(file_path, 'rb') as f:
-            data = f.read()
-        
-        # Check if data size is a multiple of 3 (RGB values)
-        if len(data) % 3 != 0:
-            return False, f"Data size ({len(data)} bytes) is not a multiple of 3 (RGB values)"
-        
-        # Check if this looks like RGB data
-        led_count = len(data) // 3
-        if led_count < 1:
-            return False, "No LED data found"
-        
-        # Validate RGB values (should be 0-255)
-        for i in range(0, len(data), 3):
-            r, g, b = data[i:i+3]
-            if not (0 <= r <= 255 and 0 <= g <= 255 and 0 <= b <= 255):
-                return False, f"Invalid RGB values at position {i//3}"
+        # One streaming pass: geometry, channel ranges, black frames and digest
+        import animation_dat
+        import dat_stats
+        import led_layout
+        channels = led_layout.configured_channels()
+        try:
+            stats = dat_stats.scan_dat_file(
+                file_path, frame_size or dat_stats.infer_frame_size(os.path.getsize(file_path), channels),
+                channels)
+        except animation_dat.AnimationDatError as e:
+            return False, f"Invalid animation .dat file: {e}"
+        except dat_stats.DatStatsError as e:
+            return False, str(e)
         
-        # Determine matrix size
-        if led_count == 64:
-            matrix_size = "8x8"
-        elif led_count == 256:
-            matrix_size = "16x16"
+        if stats["format"] == "animation":
+            ratio = stats["file_size"] / stats["raw_size"] * 100
+            message = (f"Valid LED animation: {stats['matrix_size']} matrix, "
+                       f"{stats['frame_count']} frames, {stats['encoding']} encoded, "
+                       f"{stats['file_size']} bytes ({ratio:.0f}% of raw)")
+        elif stats["frame_count"] > 1:
+            message = (f"Valid LED pattern data: {stats['matrix_size']} matrix, "
+                       f"{stats['frame_count']} frames, {stats['file_size']} bytes")
         else:
-            matrix_size = f"{led_count} LEDs"
+            message = f"Valid LED pattern data: {stats['matrix_size']} matrix, {stats['file_size']} bytes"
         
-        return True, f"Valid LED pattern data: {matrix_size} matrix, {len(data)} bytes"
+        if stats["black_frames"] == stats["frame_count"]:
+            message += " - all LEDs are off"
+        elif stats["black_frames"]:
+            message += f" - {stats['black_frames']} all-black frame(s)"
+        if stats.get("ambiguous_frame_sizes"):
+            message += (f" - frame size is ambiguous ({' / '.join(stats['ambiguous_frame_sizes'])}); "
+                        f"set DAT_VALIDATION_CONFIG matrix_size to split it into frames")
+        return True, message
         
     except Exception as e:
         return False, f"Error validating .dat file: {str(e)}"
 
-def get_dat_file_info(file_path: str) -> Dict[str, any]:
-    """Get detailed information about a .dat file"""
+def get_dat_file_info(file_path: str, frame_size: Optional[int] = None) -> Dict[str, any]:
+    """
+    Get detailed information about a .dat file, including brightness and channel statistics
+    frame_size is inferred from the configured matrix sizes when not given
+    """
     try:
         if not os.path.exists(file_path):
             return {"error": "File does not exist"}
         
-        file_size = os.path.getsize(file_path)
-        
-        with open(file_path, 'rb') as f:
-            data = f.read()
-        
-        led_count = len(data) // 3 if len(data) % 3 == 0 else 0
-        
-        info = {
-            "file_size": file_size,
-            "data_size": len(data),
-            "led_count": led_count,
-            "is_valid_rgb": len(data) % 3 == 0,
-            "matrix_size": None,
-            "rgb_values": []
-        }
-        
-        if info["is_valid_rgb"]:
-            if led_count == 64:
-                info["matrix_size"] = "8x8"
-            elif led_count == 256:
-                info["matrix_size"] = "16x16"
-            else:
-                info["matrix_size"] = f"{led_count} LEDs"
-            
-            # Sample first few RGB values
-            sample_count = min(10, led_count)
-            for i in range(0, sample_count * 3, 3):
-                if i + 2 < len(data):
-                    r, g, b = data[i:i+3]
-                    info["rgb_values"].append((r, g, b))
+        import dat_stats
+        import led_layout
+        channels = led_layout.configured_channels()
+        try:
+            info = dat_stats.scan_dat_file(
+                file_path, frame_size or dat_stats.infer_frame_size(os.path.getsize(file_path), channels),
+                channels)
+        except dat_stats.DatStatsError:
+            # Not whole RGB/RGBW frames: report the size only
+            file_size = os.path.getsize(file_path)
+            return {
+                "format": "frame",
+                "file_size": file_size,
+                "data_size": file_size,
+                "led_count": 0,
+                "is_valid_rgb": False,
+                "matrix_size": None,
+                "rgb_values": []
+            }
         
+        info["is_valid_rgb"] = True
         return info
         
     except Exception as e: